@@ -7,6 +7,13 @@
 import os, json, math, time, requests, pandas as pd, numpy as np, streamlit as st
 from datetime import date, timedelta
 from typing import Optional, Dict, List
+from src.engine.scan_rules import compute_indicators as indicators
+from src.engine.screen_dsl import compile_screen, ScreenError, SCREENS
+from src.engine import pop, risk_plan
+from src.engine.scan_presets import LABEL_TO_PRESET
+from src.scanner.patterns import best_wedge
+from src.engine.scan_snapshots import load_latest
+from src.engine.scan_diff import diff_latest, summarize
 
 # ---------- Page ----------
 st.set_page_config(page_title="USA Scanner", page_icon="🛰️", layout="wide")
@@ -14,7 +21,7 @@ st.title("🛰️ USA Scanner (EMAs + Wedges + Momentum)")
 
 # ---------- Optional integrations ----------
 try:
-    from src.engine.smart_money import passes_rules as sm_passes, make_light_badge
+    from src.engine.smart_money import passes_rules_batch, make_light_badge
     HAS_SM = True
 except Exception:
     HAS_SM = False
@@ -89,82 +96,6 @@ def fetch_ohlcv(symbol_eod: str, start: str, end: str, token: str) -> pd.DataFra
     except Exception:
         return pd.DataFrame()
 
-def ema(series: pd.Series, length:int) -> pd.Series:
-    return series.ewm(span=length, adjust=False).mean()
-
-def rsi(series: pd.Series, length:int=14) -> pd.Series:
-    delta = series.diff()
-    up = np.where(delta>0, delta, 0.0)
-    down = np.where(delta<0, -delta, 0.0)
-    roll_up = pd.Series(up).rolling(length).mean()
-    roll_down = pd.Series(down).rolling(length).mean()
-    rs = roll_up / (roll_down.replace(0, np.nan))
-    return pd.Series(100 - (100/(1+rs)), index=series.index)
-
-def atr(df: pd.DataFrame, length:int=14) -> pd.Series:
-    hl = (df["High"] - df["Low"]).abs()
-    hc = (df["High"] - df["Close"].shift()).abs()
-    lc = (df["Low"] - df["Close"].shift()).abs()
-    tr = pd.concat([hl, hc, lc], axis=1).max(axis=1)
-    return tr.rolling(length).mean()
-
-def indicators(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    out["EMA20"]  = ema(out["Close"], 20)
-    out["EMA50"]  = ema(out["Close"], 50)
-    out["EMA200"] = ema(out["Close"], 200)
-    out["RSI14"]  = rsi(out["Close"], 14)
-    out["ATR14"]  = atr(out, 14)
-    out["AvgVol20"]= out["Volume"].rolling(20).mean()
-    out["High20"] = out["High"].rolling(20).max()
-    out["Low20"]  = out["Low"].rolling(20).min()
-    return out
-
-# Linear regression helpers for wedge detection
-def _linreg(x, y):
-    x = np.asarray(x, dtype=float); y = np.asarray(y, dtype=float)
-    n = len(x); 
-    if n < 2: return (0.0, 0.0)
-    A = np.vstack([x, np.ones(n)]).T
-    m, b = np.linalg.lstsq(A, y, rcond=None)[0]
-    return (m, b)
-
-def _channel_slope_quality(highs, lows):
-    idx = np.arange(len(highs))
-    m_hi, b_hi = _linreg(idx, highs)
-    m_lo, b_lo = _linreg(idx, lows)
-    fit_hi = -np.mean(np.abs((m_hi*idx + b_hi) - highs))
-    fit_lo = -np.mean(np.abs((m_lo*idx + b_lo) - lows))
-    fit = (fit_hi + fit_lo) / 2.0
-    return (m_hi, b_hi, m_lo, b_lo, fit)
-
-def is_rising_wedge(df: pd.DataFrame):
-    highs = df["High"].values; lows = df["Low"].values
-    m_hi, b_hi, m_lo, b_lo, fit = _channel_slope_quality(highs, lows)
-    cond = (m_hi > 0) and (m_lo > 0) and (m_hi < m_lo)   # both rising, narrowing
-    score = float(fit + (m_lo - m_hi))
-    return cond, score
-
-def is_falling_wedge(df: pd.DataFrame):
-    highs = df["High"].values; lows = df["Low"].values
-    m_hi, b_hi, m_lo, b_lo, fit = _channel_slope_quality(highs, lows)
-    cond = (m_hi < 0) and (m_lo < 0) and (m_lo > m_hi)   # both falling, narrowing
-    score = float(fit + (m_lo - m_hi))
-    return cond, score
-
-# Strategy taggers (USA only)
-def tag_long(row):
-    return bool(row["EMA20"] > row["EMA50"] > row["EMA200"] and row["Close"] > row["EMA20"] and row["RSI14"] >= 50)
-
-def tag_short(row):
-    return bool(row["EMA20"] < row["EMA50"] < row["EMA200"] and row["Close"] < row["EMA20"] and row["RSI14"] <= 50)
-
-def tag_momentum(row):
-    return bool(row["EMA20"] > row["EMA50"] > row["EMA200"]
-                and row["RSI14"] >= 60
-                and row["Close"] >= 0.98*(row["High20"] or row["Close"])
-                and row["Volume"] >= 1.2*(row["AvgVol20"] or 1))
-
 # ---------- UI: Controls (inline, no sidebar) ----------
 left, right = st.columns([3,2], gap="large")
 
@@ -172,9 +103,13 @@ with left:
     st.subheader("Scanner & Chart (USA only)")
     scan_type = st.radio(
         "Scan type",
-        ["Rising Wedge","Falling Wedge","Long Stock","Short Stock","High Momentum Stock"],
+        ["Rising Wedge","Falling Wedge","Long Stock","Short Stock","High Momentum Stock","Custom Screen"],
         horizontal=True,
     )
+    screen_txt = ""
+    if scan_type == "Custom Screen":
+        screen_txt = st.text_input("Screen expression (columns: Close, Volume, EMA20/50/200, RSI14, ATR14, AvgVol20/30, High20, Low20)",
+                                   value=SCREENS["high_momentum"])
     default_symbol = st.text_input("Chart symbol (TradingView format)", value="NASDAQ:QQQ")
     st.link_button("🔗 Open in TradingView", f"https://www.tradingview.com/chart/?symbol={default_symbol}", use_container_width=True)
 
@@ -194,49 +129,59 @@ with right:
     apply_sm = st.checkbox("Apply Smart Money pre-filter (if available)", value=True)
 
     run_col, clear_col = st.columns([2,1])
-    if run_col.button("🚀 Run USA Scanner", use_container_width=True):
+    if run_col.button("🚀 Re-run live", use_container_width=True):
         st.session_state["scan_go"] = True
     if clear_col.button("🧹 Clear"):
         st.session_state["scan_go"] = False
         st.session_state["scan_df"] = pd.DataFrame()
+        st.session_state["scan_kind"] = None
 
 # ---------- Scan ----------
 go = st.session_state.get("scan_go", False)
 start = (date.today() - timedelta(days=int(max(lookback*1.2, 200)))).strftime("%Y-%m-%d")
 end   = date.today().strftime("%Y-%m-%d")
 
-def run_scan(symbols: List[str], kind: str) -> pd.DataFrame:
-    rows = []
+KIND_SCREEN = {"Long Stock": "long_stock", "Short Stock": "short_stock", "High Momentum Stock": "high_momentum"}
+
+def run_scan(symbols: List[str], kind: str, screen_txt: str = "") -> pd.DataFrame:
+    frames = {}
     for sym in symbols:
         df = fetch_ohlcv(_eod_symbol(sym), start, end, TOKEN)
         if df.empty or len(df) < 120: 
             continue
-        df = indicators(df).tail(lookback)
-        row = df.iloc[-1].copy()
-        # Wedges evaluated on last N bars window
+        frames[sym] = indicators(df).tail(lookback)
+    if not frames:
+        return pd.DataFrame()
+    latest = pd.DataFrame([d.iloc[-1] for d in frames.values()], index=list(frames))
+    # EMA / momentum / custom: one compiled screen over the latest-bar matrix of the whole list
+    if kind not in ("Rising Wedge", "Falling Wedge"):
+        flags = compile_screen(screen_txt if kind == "Custom Screen" else KIND_SCREEN[kind])(latest)
+        rsi = latest["RSI14"].fillna(0).to_numpy()
+        scores = 100 - rsi if kind == "Short Stock" else rsi
+    # Stop / target / R/R and Monte Carlo POP for the whole list, then the Smart Money gate on those
+    plans = risk_plan.plan(latest.rename_axis("Symbol"), is_long=kind not in ("Short Stock", "Rising Wedge"))
+    close = pd.concat({s: (d.set_index("date") if "date" in d.columns else d)["Close"] for s, d in frames.items()}, axis=1)
+    pops = pop.estimate(plans, close)["POP"].to_numpy(dtype=float)
+    sm_ok = np.ones(len(frames), dtype=bool)
+    if apply_sm and HAS_SM:
+        try:
+            sm_ok, _ = passes_rules_batch(list(frames), "USA", rr=plans["RR"].to_numpy(dtype=float), pop=pops)
+        except Exception:
+            pass  # don't block if engine errors
+    rows = []
+    for i, (sym, df) in enumerate(frames.items()):
+        row, pl = latest.iloc[i], plans.iloc[i]
+        # Wedges: best channel fit over 40..120-bar windows ending today (scored by slope-convergence t)
         if kind == "Rising Wedge" or kind == "Falling Wedge":
-            W = min(120, len(df))
-            dwindow = df.tail(W)
-            ok, sc = (is_rising_wedge(dwindow) if kind=="Rising Wedge" else is_falling_wedge(dwindow))
-            flag = ok
-        elif kind == "Long Stock":
-            flag, sc = tag_long(row), float(row.get("RSI14", 0))
-        elif kind == "Short Stock":
-            flag, sc = tag_short(row), float(100 - row.get("RSI14", 0))
-        else:  # High Momentum
-            flag, sc = tag_momentum(row), float(row.get("RSI14", 0))
+            w = best_wedge(df, kind)
+            flag, sc = (w is not None), (float(w["score"]) if w is not None else 0.0)
+        else:
+            flag, sc = bool(flags[i]), float(scores[i])
 
         if not flag:
             continue
 
-        sm_ok = True
-        if apply_sm and HAS_SM:
-            try:
-                sm_ok = bool(sm_passes(df))  # pass full df to your engine
-            except Exception:
-                sm_ok = True  # don't block if engine errors
-
-        if not sm_ok:
+        if not sm_ok[i]:
             continue
 
         rows.append({
@@ -251,6 +196,7 @@ def run_scan(symbols: List[str], kind: str) -> pd.DataFrame:
             "AvgVol20": int(row["AvgVol20"]),
             "High20": round(float(row["High20"]), 4),
             "Low20": round(float(row["Low20"]), 4),
+            "Stop": pl["Stop"], "Target": pl["Target"], "R/R": pl["RR"], "POP": pops[i], "Shares": int(pl["Shares"]),
             "Score": round(float(sc), 4),
             "Tag": kind,
         })
@@ -259,12 +205,30 @@ def run_scan(symbols: List[str], kind: str) -> pd.DataFrame:
 if go:
     with st.spinner("Scanning USA symbols…"):
         symbols = parse_symbols(symbols_txt)
-        df_out = run_scan(symbols, scan_type)
+        try:
+            df_out = run_scan(symbols, scan_type, screen_txt)
+        except ScreenError as e:
+            st.error(f"Screen expression: {e}")
+            df_out = pd.DataFrame()
         st.session_state["scan_df"] = df_out
+        st.session_state["scan_kind"] = scan_type
         st.success(f"Done. Matches: {len(df_out)}")
 
 # ---------- Display ----------
-df_out = st.session_state.get("scan_df", pd.DataFrame())
+# Live results for the selected scan type win; otherwise open on the latest precomputed snapshot
+if st.session_state.get("scan_kind") == scan_type or scan_type not in LABEL_TO_PRESET:
+    df_out = st.session_state.get("scan_df", pd.DataFrame()) if st.session_state.get("scan_kind") == scan_type else pd.DataFrame()
+else:
+    df_out, snap_meta = load_latest(LABEL_TO_PRESET[scan_type])
+    if snap_meta:
+        st.caption(f"📦 Snapshot {snap_meta.get('created','')} • {snap_meta.get('processed') or 0} symbols • "
+                   f"{len(df_out)} matches — press **Re-run live** to scan your own list.")
+        delta, _, prev_meta = diff_latest(LABEL_TO_PRESET[scan_type])
+        moves = summarize(delta)
+        if moves:
+            with st.expander(f"Δ since {prev_meta.get('created','')}: {moves.get('new',0)} new • "
+                             f"{moves.get('dropped',0)} dropped • {moves.get('changed',0)} changed"):
+                st.dataframe(delta, use_container_width=True, hide_index=True)
 if not df_out.empty:
     st.markdown("#### 📋 Results")
     df_out = df_out.sort_values(["Score","RSI14"], ascending=[False, False]).reset_index(drop=True)
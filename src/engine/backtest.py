@@ -0,0 +1,201 @@
+# src/engine/backtest.py
+# Vectorized backtest of the A/B scanner rules over the local price store.
+#
+# Indicators (EMA20/50/200, RSI14, ATR14, High20/Low20) and the Vector RT / RS / VST
+# scores are computed for every date and symbol at once on wide panels (dates x symbols),
+# so each rule variant becomes one boolean signal matrix. Every signal is a trade:
+#   entry   close of the signal day (or next day's open)
+#   stop    EMA50 - 2·ATR14 at the signal (compute_stop; mirrored above for shorts)
+#   target  entry + target_r · R, where R = |entry - stop|
+#   exit    first bar that touches stop or target within `hold` bars (stop first when a
+#           bar touches both; gaps fill at the open), otherwise the close of the last bar
+# Exits are found with one gather of the next `hold` bars per signal, not a day loop.
+# Symbols are processed in column chunks to bound memory; results are per variant:
+# trades, hit rate, stop / target / timeout shares, expectancy in R and in %.
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+from src.engine import price_store
+
+FIELDS = ("Open", "High", "Low", "Close", "Volume")
+WARMUP = 200                      # bars before EMA200 (and the scores) are meaningful
+REPORT_COLS = ["trades", "hit_rate", "target_rate", "stop_rate", "timeout_rate",
+               "avg_r", "median_r", "expectancy_pct", "avg_bars", "symbols"]
+
+Rule = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+# ============================ Panels & indicators ============================
+
+def load_panels(region: str, symbols: Optional[Iterable[str]] = None, start=None) -> Dict[str, pd.DataFrame]:
+    """{Open, High, Low, Close, Volume: dates x symbols} from the price store (one read per symbol)."""
+    syms = list(symbols) if symbols is not None else price_store.list_symbols(region)
+    frames = price_store.load_many(syms, region)
+    out = {}
+    for f in FIELDS:
+        cols = {s: pd.to_numeric(df[f.lower()], errors="coerce") for s, df in frames.items() if f.lower() in df.columns}
+        p = pd.concat(cols, axis=1).sort_index() if cols else pd.DataFrame()
+        out[f] = p.loc[pd.Timestamp(start):] if start is not None and not p.empty else p
+    cols = out["Close"].columns
+    return {f: p.reindex(index=out["Close"].index, columns=cols) for f, p in out.items()}
+
+def indicators(panels: Dict[str, pd.DataFrame]) -> Dict[str, np.ndarray]:
+    """scan_rules.compute_indicators + vector_metrics RT / RS / VST for every date, as
+    T x N float arrays. Rows before a symbol's WARMUP-th bar are NaN."""
+    c, h, l = panels["Close"], panels["High"], panels["Low"]
+    ema = lambda n: c.ewm(span=n, adjust=False).mean()
+    d = c.diff()
+    up, dn = d.clip(lower=0).fillna(0.0), (-d).clip(lower=0).fillna(0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs_ = up.rolling(14).mean() / dn.rolling(14).mean().replace(0, np.nan)
+    prev = c.shift()
+    tr = np.fmax(np.fmax((h - l).abs().to_numpy(), (h - prev).abs().to_numpy()), (l - prev).abs().to_numpy())
+    ret = c / c.shift() - 1.0
+    vol = ret.rolling(20).std().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rt = np.maximum(0.0, 1.0 + 0.6 * (c / c.shift(19) - 1.0).to_numpy() + 0.4 * (c / c.shift(59) - 1.0).to_numpy())
+        rs = np.clip(1.0 / (np.where(vol == 0, 1e-9, vol) * 15.0), 0.1, 2.0)
+    rt, rs = np.round(rt, 3), np.round(rs, 3)
+    out = {
+        "Open": panels["Open"].to_numpy(dtype=float), "High": h.to_numpy(dtype=float),
+        "Low": l.to_numpy(dtype=float), "Close": c.to_numpy(dtype=float),
+        "EMA20": ema(20).to_numpy(), "EMA50": ema(50).to_numpy(), "EMA200": ema(200).to_numpy(),
+        "RSI14": (100 - 100 / (1 + rs_)).to_numpy(),
+        "ATR14": pd.DataFrame(tr).rolling(14).mean().to_numpy(),
+        "High20": h.rolling(20).max().to_numpy(), "Low20": l.rolling(20).min().to_numpy(),
+        "RT": rt, "RS": rs, "VST": np.round(0.4 * rt + 0.3 * 1.0 + 0.3 * rs, 3),   # RV neutral offline
+    }
+    seen = np.cumsum(~np.isnan(out["Close"]), axis=0)
+    warm = seen < WARMUP
+    for k in ("EMA20", "EMA50", "EMA200", "RSI14", "ATR14", "High20", "Low20", "RT", "RS", "VST"):
+        out[k] = np.where(warm, np.nan, out[k])
+    return out
+
+# ============================ Rules (scan_rules.py as matrices) ============================
+
+def _ok_now_long(x):
+    return (x["EMA20"] >= x["EMA50"]) & (x["RSI14"] >= 50) & (x["Close"] >= 0.97 * x["High20"])
+
+def _almost_long(x):
+    return (x["EMA20"] >= x["EMA50"]) & (x["RSI14"] >= 45)
+
+def _ok_now_short(x):
+    return (x["EMA20"] <= x["EMA50"]) & (x["RSI14"] <= 50) & (x["Close"] <= 1.03 * x["Low20"])
+
+def _almost_short(x):
+    return (x["EMA20"] <= x["EMA50"]) & (x["RSI14"] <= 55)
+
+def gate_long(x):
+    return ((x["EMA20"] >= x["EMA50"]) | (x["Close"] >= x["EMA20"])) & (x["RSI14"] >= 40)
+
+def gate_short(x):
+    return ((x["EMA20"] <= x["EMA50"]) | (x["Close"] <= x["EMA20"])) & (x["RSI14"] <= 60)
+
+def buy_today(x, is_long=True):
+    ok = _ok_now_long(x) if is_long else _ok_now_short(x)
+    return ok & (x["RT"] >= 1.0) & (x["VST"] >= 0.9)
+
+def buy_soon(x, is_long=True):
+    almost = _almost_long(x) if is_long else _almost_short(x)
+    return almost & (x["RT"] >= 0.9) & (x["VST"] >= 0.85) & ~buy_today(x, is_long)
+
+# variant name -> (is_long, rule); the A/B scan requires the gate and a non-"Wait" label
+VARIANTS: Dict[str, tuple] = {
+    "long_gate":            (True,  gate_long),
+    "long_buy_today":       (True,  lambda x: gate_long(x) & buy_today(x, True)),
+    "long_buy_in_2_3_days": (True,  lambda x: gate_long(x) & buy_soon(x, True)),
+    "short_gate":           (False, gate_short),
+    "short_buy_today":      (False, lambda x: gate_short(x) & buy_today(x, False)),
+    "short_buy_in_2_3_days": (False, lambda x: gate_short(x) & buy_soon(x, False)),
+}
+
+# ============================ Simulation ============================
+
+def simulate(x: Dict[str, np.ndarray], signal: np.ndarray, is_long: bool = True, hold: int = 20,
+             target_r: float = 3.0, entry: str = "close", stop_atr: float = 2.0) -> pd.DataFrame:
+    """Trades for every True cell of `signal` (T x N). -> DataFrame(row, col, entry, stop,
+    exit, r, ret_pct, bars, outcome) with outcome in {target, stop, timeout}."""
+    T = signal.shape[0]
+    sig = signal & np.isfinite(x["ATR14"]) & np.isfinite(x["EMA50"])
+    sig[max(T - 1, 0):] = False                               # needs at least one bar after the signal
+    r_idx, c_idx = np.nonzero(sig)
+    if not len(r_idx):
+        return pd.DataFrame(columns=["row", "col", "entry", "stop", "exit", "r", "ret_pct", "bars", "outcome"])
+    s = 1.0 if is_long else -1.0
+    stop = x["EMA50"][r_idx, c_idx] - s * stop_atr * x["ATR14"][r_idx, c_idx]
+    px = x["Close"][r_idx, c_idx] if entry == "close" else x["Open"][r_idx + 1, c_idx]
+    risk = s * (px - stop)
+    ok = np.isfinite(px) & (risk > 0)                          # stop on the wrong side: no trade
+    r_idx, c_idx, stop, px, risk = r_idx[ok], c_idx[ok], stop[ok], px[ok], risk[ok]
+    target = px + s * target_r * risk
+    # next `hold` bars of each trade (NaN past the end of the panel)
+    steps = np.arange(1, hold + 1)
+    rows = r_idx[:, None] + steps[None, :]
+    inside = rows < T
+    rows_c = np.minimum(rows, T - 1)
+    g = lambda k: np.where(inside, x[k][rows_c, c_idx[:, None]], np.nan)
+    o, hi, lo, cl = g("Open"), g("High"), g("Low"), g("Close")
+    with np.errstate(invalid="ignore"):
+        hit_stop = (lo <= stop[:, None]) if is_long else (hi >= stop[:, None])
+        hit_tgt = (hi >= target[:, None]) if is_long else (lo <= target[:, None])
+    first = lambda m: np.where(m.any(axis=1), m.argmax(axis=1), hold)
+    k_stop, k_tgt = first(hit_stop), first(hit_tgt)
+    last = np.maximum(inside.sum(axis=1) - 1, 0)
+    n = np.arange(len(px))
+    outcome = np.where(k_stop <= k_tgt, "stop", "target")
+    outcome = np.where((k_stop == hold) & (k_tgt == hold), "timeout", outcome)
+    k = np.where(outcome == "stop", k_stop, np.where(outcome == "target", k_tgt, last))
+    open_k = o[n, k]
+    with np.errstate(invalid="ignore"):
+        stop_fill = np.fmin(open_k, stop) if is_long else np.fmax(open_k, stop)      # gap through the stop
+        tgt_fill = np.fmax(open_k, target) if is_long else np.fmin(open_k, target)
+    exit_px = np.where(outcome == "stop", stop_fill, np.where(outcome == "target", tgt_fill, cl[n, k]))
+    r = s * (exit_px - px) / risk
+    return pd.DataFrame({"row": r_idx, "col": c_idx, "entry": px, "stop": stop, "exit": exit_px, "r": r,
+                         "ret_pct": s * (exit_px / px - 1.0) * 100.0, "bars": k + 1, "outcome": outcome})
+
+def summarize(trades: pd.DataFrame) -> dict:
+    t = trades.dropna(subset=["r"])
+    n = len(t)
+    if not n:
+        return {c: (0 if c in ("trades", "symbols") else np.nan) for c in REPORT_COLS}
+    share = lambda o: float((t["outcome"] == o).mean())
+    return {"trades": n, "hit_rate": float((t["r"] > 0).mean()), "target_rate": share("target"),
+            "stop_rate": share("stop"), "timeout_rate": share("timeout"),
+            "avg_r": float(t["r"].mean()), "median_r": float(t["r"].median()),
+            "expectancy_pct": float(t["ret_pct"].mean()), "avg_bars": float(t["bars"].mean()),
+            "symbols": int(t["col"].nunique())}
+
+def run(panels: Dict[str, pd.DataFrame], variants: Optional[Dict[str, tuple]] = None, hold: int = 20,
+        target_r: float = 3.0, entry: str = "close", fresh_only: bool = True, chunk: int = 500,
+        return_trades: bool = False):
+    """Backtest every variant over the panels, `chunk` symbols at a time.
+    fresh_only: trade only the first day of a signal run (False = every signal day).
+    -> report DataFrame indexed by variant (and {variant: trades with Symbol/date} when
+    return_trades)."""
+    variants = variants or VARIANTS
+    close = panels["Close"]
+    syms, dates = close.columns, close.index
+    acc = {v: [] for v in variants}
+    for c0 in range(0, len(syms), max(int(chunk), 1)):
+        cols = syms[c0:c0 + chunk]
+        x = indicators({f: p[cols] for f, p in panels.items()})
+        for name, (is_long, rule) in variants.items():
+            with np.errstate(invalid="ignore"):
+                sig = np.asarray(rule(x), dtype=bool)
+            if fresh_only:
+                sig = sig & ~np.vstack([np.zeros((1, sig.shape[1]), dtype=bool), sig[:-1]])
+            tr = simulate(x, sig, is_long=is_long, hold=hold, target_r=target_r, entry=entry)
+            tr["col"] = tr["col"].astype(int) + c0
+            acc[name].append(tr)
+    trades = {v: pd.concat(parts, ignore_index=True) if parts else pd.DataFrame() for v, parts in acc.items()}
+    report = pd.DataFrame({v: summarize(t) for v, t in trades.items()}).T.reindex(columns=REPORT_COLS)
+    report.index.name = "variant"
+    if not return_trades:
+        return report
+    for t in trades.values():
+        if not t.empty:
+            t.insert(0, "Symbol", np.asarray(syms)[t["col"].to_numpy(dtype=int)])
+            t.insert(1, "date", np.asarray(dates)[t["row"].to_numpy(dtype=int)])
+    return report, trades
@@ -0,0 +1,116 @@
+# src/engine/compact.py
+# Opt-in compact dtypes for panels and scan tables.
+#   float64 -> float32 for prices / indicators / scores
+#   int64 / integral float volumes -> int32 when every value fits and none is missing
+#   repeated strings (Symbol, Sector, Reason, ...) -> pandas categorical
+# Enable globally with VEGA_COMPACT_DTYPES=1, or call compact_frame() directly.
+#
+# Precision budget (what float32 storage is allowed to cost; maybe_compact / compact_panel
+# check it with check_precision and keep float64 wherever it would be exceeded):
+#   prices / indicators : relative error <= 1e-6   (float32 keeps ~7 significant digits)
+#   scores (RT, RS, ...): absolute error <= 5e-4   (they are rounded to 3 decimals anyway)
+#   volumes             : exact (int32 is only used when lossless)
+# All computation still happens in float64; compaction is applied to what gets stored.
+from __future__ import annotations
+import os
+import numpy as np
+import pandas as pd
+
+ENABLED = os.getenv("VEGA_COMPACT_DTYPES", "0") == "1"
+
+CATEGORICAL_COLS = {"symbol", "sector", "reason", "side", "tag", "buy today", "region", "exchange", "label", "preset"}
+SCORE_COLS = {"rt", "rv", "rs", "ci", "vst", "score"}
+VOLUME_HINTS = ("volume", "vol30", "vol20", "avgvol")
+
+PRECISION_BUDGET = {"price_rel": 1e-6, "score_abs": 5e-4}
+
+_INT32_MAX = np.iinfo(np.int32).max
+
+def _is_volume(name: str) -> bool:
+    n = str(name).lower()
+    return any(h in n for h in VOLUME_HINTS)
+
+def _int32_safe(s: pd.Series) -> bool:
+    if s.isna().any():
+        return False
+    v = s.to_numpy()
+    if np.issubdtype(v.dtype, np.floating) and not np.all(np.mod(v, 1) == 0):
+        return False
+    return bool(v.size == 0 or (v.min() >= -_INT32_MAX and v.max() <= _INT32_MAX))
+
+def compact_frame(df: pd.DataFrame, categorical=None) -> pd.DataFrame:
+    """Return a copy of df with compact dtypes (see module header)."""
+    if df is None or df.empty:
+        return df
+    cats = {c.lower() for c in (categorical or CATEGORICAL_COLS)}
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if str(c).lower() in cats and (s.dtype == object or pd.api.types.is_string_dtype(s)):
+            out[c] = s.astype("category")
+        elif _is_volume(c) and pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s) and _int32_safe(s):
+            out[c] = s.astype(np.int32)
+        elif pd.api.types.is_float_dtype(s):
+            with np.errstate(over="ignore"):                 # overflow -> inf, caught by check_precision
+                out[c] = s.astype(np.float32)
+        else:
+            out[c] = s
+    return pd.DataFrame(out, index=df.index)
+
+def compact_panel(panel: pd.DataFrame, budget: dict = None) -> pd.DataFrame:
+    """Wide numeric panel (dates x symbols) -> float32, or unchanged when float32 would
+    exceed the price budget anywhere (e.g. values beyond float32 range)."""
+    if panel is None or panel.empty:
+        return panel
+    with np.errstate(over="ignore"):
+        out = panel.astype(np.float32)
+    ov, kv = panel.to_numpy(dtype=float), out.to_numpy(dtype=float)
+    if not np.array_equal(np.isnan(ov), np.isnan(kv)):
+        return panel
+    both = np.isfinite(ov)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        rel = np.abs(ov[both] - kv[both]) / np.maximum(np.abs(ov[both]), np.finfo(float).tiny)
+    ok = np.array_equal(np.isfinite(kv), both) and float(np.max(rel, initial=0.0)) <= dict(PRECISION_BUDGET, **(budget or {}))["price_rel"]
+    return out if ok else panel
+
+def maybe_compact(df: pd.DataFrame, enabled: bool = None, budget: dict = None) -> pd.DataFrame:
+    """compact_frame() when enabled (defaults to VEGA_COMPACT_DTYPES), else df unchanged.
+    Columns whose compacted values miss the precision budget keep their original dtype."""
+    if not (ENABLED if enabled is None else enabled) or df is None or df.empty:
+        return df
+    out = compact_frame(df)
+    for c, r in check_precision(df, out, budget).items():
+        if not r["ok"]:
+            out[c] = df[c]
+    return out
+
+def check_precision(original: pd.DataFrame, compacted: pd.DataFrame, budget: dict = None) -> dict:
+    """Measure per-column error of a compacted frame against the float64 original.
+
+    Returns {column: {"err": float, "limit": float, "ok": bool}} for numeric columns;
+    categorical / int columns must round-trip exactly (limit 0).
+    """
+    b = dict(PRECISION_BUDGET, **(budget or {}))
+    report = {}
+    for c in original.columns:
+        o, k = original[c], compacted[c]
+        if not pd.api.types.is_numeric_dtype(o) or pd.api.types.is_bool_dtype(o):
+            same = bool((o.astype(object).fillna("\0") == k.astype(object).fillna("\0")).all())
+            report[c] = {"err": 0.0 if same else np.inf, "limit": 0.0, "ok": same}
+            continue
+        ov = o.to_numpy(dtype=float); kv = k.to_numpy(dtype=float)
+        both = np.isfinite(ov) & np.isfinite(kv)
+        nan_ok = bool(np.array_equal(np.isnan(ov), np.isnan(kv)) and np.array_equal(np.isfinite(ov), np.isfinite(kv)))
+        if str(c).lower() in SCORE_COLS:
+            err = float(np.max(np.abs(ov[both] - kv[both]), initial=0.0)); limit = b["score_abs"]
+        elif pd.api.types.is_integer_dtype(k):
+            err = float(np.max(np.abs(ov[both] - kv[both]), initial=0.0)); limit = 0.0
+        else:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rel = np.abs(ov[both] - kv[both]) / np.maximum(np.abs(ov[both]), np.finfo(float).tiny)
+            err = float(np.max(rel, initial=0.0)); limit = b["price_rel"]
+        report[c] = {"err": err, "limit": limit, "ok": nan_ok and err <= limit}
+    return report
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum()) if isinstance(df, pd.DataFrame) else 0
@@ -0,0 +1,73 @@
+# src/engine/dedup.py
+# Correlation-aware de-duplication of scan results: names whose recent daily returns move
+# together (e.g. ten semiconductors) are one trade. Returns over the last `window` bars are
+# standardized per symbol and the whole correlation matrix comes from one matrix product;
+# clusters are formed greedily in rank order — the best-ranked unassigned name leads and
+# takes every unassigned name correlated with it at or above `threshold`.
+from __future__ import annotations
+from typing import Optional, Tuple
+import numpy as np
+import pandas as pd
+
+DEFAULT_THRESHOLD = 0.80
+DEFAULT_WINDOW = 60
+MIN_OVERLAP = 20                  # fewer shared return days than this -> treated as uncorrelated
+
+def correlation_matrix(close: pd.DataFrame, window: int = DEFAULT_WINDOW) -> pd.DataFrame:
+    """Pearson correlation of daily returns over the last `window` rows of a close panel
+    (dates x symbols). Missing days count as zero-deviation, pairs with too little overlap
+    get 0, the diagonal is 1."""
+    if close is None or close.empty:
+        return pd.DataFrame()
+    r = close.apply(pd.to_numeric, errors="coerce").sort_index().pct_change(fill_method=None).iloc[1:].tail(int(window))
+    a = r.to_numpy(dtype=float)
+    ok = np.isfinite(a)
+    n = ok.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = np.where(n > 0, np.where(ok, a, 0.0).sum(axis=0) / np.maximum(n, 1), 0.0)
+        z = np.where(ok, a - mu, 0.0)
+        sd = np.sqrt((z * z).sum(axis=0) / np.maximum(n - 1, 1))
+        z = np.where(sd > 0, z / sd, 0.0)
+        overlap = ok.T.astype(float) @ ok.astype(float)
+        c = (z.T @ z) / np.maximum(overlap - 1, 1)                 # one BLAS call for every pair
+    c = np.where(overlap >= MIN_OVERLAP, np.clip(c, -1.0, 1.0), 0.0)
+    np.fill_diagonal(c, 1.0)
+    return pd.DataFrame(c, index=close.columns, columns=close.columns)
+
+def leader_clusters(corr: np.ndarray, threshold: float = DEFAULT_THRESHOLD) -> np.ndarray:
+    """Cluster id per row of `corr` (rows in rank order): each id is the index of its leader."""
+    k = len(corr)
+    label = np.full(k, -1)
+    for i in range(k):
+        if label[i] >= 0:
+            continue
+        take = (label < 0) & (corr[i] >= threshold)
+        take[i] = True
+        label[take] = i
+    return label
+
+def dedupe(results: pd.DataFrame, close: pd.DataFrame, threshold: float = DEFAULT_THRESHOLD,
+           window: int = DEFAULT_WINDOW, symbol_col: str = "Symbol") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """results must already be ranked best-first. -> (all rows with Cluster / Leader /
+    ClusterSize / Members, one representative row per cluster). Symbols without prices
+    form their own cluster."""
+    if results is None or results.empty:
+        return results, results
+    syms = results[symbol_col].astype(str).str.upper().tolist()
+    panel = close.rename(columns=lambda c: str(c).upper()) if close is not None else pd.DataFrame()
+    panel = panel.loc[:, ~panel.columns.duplicated()] if not panel.empty else panel
+    have = [s for s in dict.fromkeys(syms) if s in panel.columns]
+    c = correlation_matrix(panel[have], window) if have else pd.DataFrame()
+    m = c.reindex(index=syms, columns=syms).to_numpy(dtype=float) if not c.empty else np.full((len(syms), len(syms)), np.nan)
+    m = np.where(np.isnan(m), 0.0, m)
+    np.fill_diagonal(m, 1.0)
+    label = leader_clusters(m, threshold)
+    out = results.copy()
+    leaders = np.asarray(syms, dtype=object)[label]
+    out["Cluster"] = pd.factorize(label)[0] + 1
+    out["Leader"] = leaders
+    out["ClusterSize"] = pd.Series(label).map(pd.Series(label).value_counts()).to_numpy()
+    members = pd.Series(syms).groupby(label).agg(", ".join)
+    out["Members"] = pd.Series(label).map(members).to_numpy()
+    reps = out[label == np.arange(len(label))].reset_index(drop=True)
+    return out, reps
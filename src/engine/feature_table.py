@@ -0,0 +1,146 @@
+# src/engine/feature_table.py
+# Materialized latest-bar feature table: one row per symbol per exchange with every
+# value the scans read from df.iloc[-1] (EMAs, RSI, ATR, average volumes, 20-bar range),
+# plus % changes, 52-week high/low, opening-gap stats, RVOL and the Vector scores.
+#
+# Built nightly from the local price store (tools/build_feature_table.py) and stored
+# columnar in data/vega/features/<region>.parquet (pickle when no parquet engine is
+# installed). load_table() keeps one copy per process and only re-reads when the file
+# changes, so screens (src/engine/screen_dsl.py), the stage-1 pre-filter and dashboards
+# query it in memory instead of recomputing from history.
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+
+from src.engine import price_store
+from src.engine.scan_rules import to_title, compute_indicators
+from src.engine.vector_metrics import compute_panel, SCORE_COLS
+
+FEATURE_ROOT = os.getenv("VEGA_FEATURE_ROOT", "data/vega/features")
+INDICATOR_COLS = ["Open", "High", "Low", "Close", "Volume", "EMA20", "EMA50", "EMA200", "RSI14", "ATR14",
+                  "AvgVol20", "AvgVol30", "High20", "Low20"]
+FEATURE_COLS = (["Symbol", "Exchange", "Date", "Bars"] + INDICATOR_COLS +
+                ["Chg1D", "Chg5D", "Chg20D", "High52W", "Low52W", "Off52WHigh", "Off52WLow",
+                 "Gap", "GapAvg20", "GapMax20", "RVOL"] + SCORE_COLS)
+
+try:
+    import pyarrow  # noqa: F401
+    _EXT = ".parquet"
+except Exception:
+    try:
+        import fastparquet  # noqa: F401
+        _EXT = ".parquet"
+    except Exception:
+        _EXT = ".pkl"
+
+# path -> (mtime_ns, size, DataFrame)
+_CACHE: Dict[str, tuple] = {}
+
+# ============================ Features ============================
+
+def _pct(a: float, b: float) -> float:
+    return float((a / b - 1.0) * 100.0) if b and np.isfinite(a) and np.isfinite(b) else np.nan
+
+def symbol_features(symbol: str, bars: pd.DataFrame) -> Optional[dict]:
+    """Latest-bar features of one daily OHLCV frame (any column case); None when empty."""
+    df = to_title(bars)
+    if df.empty or "Close" not in df.columns:
+        return None
+    ind = compute_indicators(df)
+    last = ind.iloc[-1]
+    close = ind["Close"].to_numpy(dtype=float)
+    c = close[-1]
+    yr = ind.tail(252)
+    prev = np.r_[np.nan, close[:-1]]
+    gaps = (ind["Open"].to_numpy(dtype=float) / prev - 1.0) * 100.0 if "Open" in ind else np.full(len(ind), np.nan)
+    g20 = gaps[-20:]
+    hi52, lo52 = float(yr["High"].max()), float(yr["Low"].min())
+    back = lambda k: close[-1 - k] if len(close) > k else np.nan
+    row = {"Symbol": str(symbol).upper(), "Date": pd.to_datetime(df["date"].iloc[-1]) if "date" in df.columns else pd.NaT,
+           "Bars": int(len(ind))}
+    row.update({k: float(last[k]) if k in last.index else np.nan for k in INDICATOR_COLS})
+    row.update({
+        "Chg1D": _pct(c, back(1)), "Chg5D": _pct(c, back(5)), "Chg20D": _pct(c, back(20)),
+        "High52W": hi52, "Low52W": lo52, "Off52WHigh": _pct(c, hi52), "Off52WLow": _pct(c, lo52),
+        "Gap": float(gaps[-1]),
+        "GapAvg20": float(np.nanmean(np.abs(g20))) if np.isfinite(g20).any() else np.nan,
+        "GapMax20": float(np.nanmax(np.abs(g20))) if np.isfinite(g20).any() else np.nan,
+        "RVOL": row["Volume"] / row["AvgVol20"] if row["AvgVol20"] else np.nan,
+    })
+    return row
+
+def build_table(region: str, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Feature rows for every symbol of a price-store region; Vector scores are computed
+    for the whole universe in one panel pass."""
+    region = region.lower()
+    syms = list(symbols) if symbols is not None else price_store.list_symbols(region)
+    rows, closes = [], {}
+    for sym in syms:
+        bars = price_store.load_bars(sym, region)
+        r = symbol_features(sym, bars)
+        if r is None:
+            continue
+        rows.append(r)
+        closes[r["Symbol"]] = pd.Series(pd.to_numeric(bars["close"], errors="coerce").to_numpy(),
+                                        index=pd.to_datetime(bars["date"]))
+    if not rows:
+        return pd.DataFrame(columns=FEATURE_COLS)
+    out = pd.DataFrame(rows)
+    out["Exchange"] = price_store.REGION_EXCHANGE.get(region, region.upper())
+    scores = compute_panel(pd.concat(closes, axis=1).sort_index())
+    out = out.join(scores, on="Symbol")
+    return out.reindex(columns=FEATURE_COLS)
+
+# ============================ Storage ============================
+
+def table_path(region: str) -> str:
+    return os.path.join(FEATURE_ROOT, f"{region.lower()}{_EXT}")
+
+def save_table(df: pd.DataFrame, region: str) -> str:
+    path = table_path(region)
+    Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+    tmp = path + ".tmp"
+    if _EXT == ".parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+    return path
+
+def load_table(region: str) -> pd.DataFrame:
+    """The region's feature table (empty when not built yet), cached per process until
+    the file changes. Callers get the shared frame — copy before mutating."""
+    path = table_path(region)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return pd.DataFrame(columns=FEATURE_COLS)
+    hit = _CACHE.get(path)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2]
+    try:
+        df = pd.read_parquet(path) if _EXT == ".parquet" else pd.read_pickle(path)
+    except Exception:
+        return pd.DataFrame(columns=FEATURE_COLS)
+    _CACHE[path] = (st.st_mtime_ns, st.st_size, df)
+    return df
+
+def features(region: str, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Rows of the region's table indexed by Symbol, optionally limited to `symbols`
+    (in that order; unknown symbols are skipped)."""
+    df = load_table(region)
+    if df.empty:
+        return df.set_index("Symbol") if "Symbol" in df.columns else df
+    df = df.set_index("Symbol")
+    if symbols is None:
+        return df
+    want = [str(s).upper() for s in symbols]
+    return df.reindex([s for s in want if s in df.index])
+
+def refresh(region: str, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    df = build_table(region, symbols)
+    save_table(df, region)
+    return df
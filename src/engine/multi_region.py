@@ -0,0 +1,113 @@
+# src/engine/multi_region.py
+# One scan engine for every region: each region runs the same pipeline
+#   symbol master -> stage-1 liquidity pre-filter -> run_presets (+ Smart Money gate)
+# parameterized by its adapter (src/engine/regions.py), in its own worker process.
+# Results come back region-tagged and are combined per preset, so a cross-region run
+# takes as long as the slowest region rather than the sum of all of them.
+from __future__ import annotations
+import os, time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional
+import pandas as pd
+
+from src.engine import feature_table, pop, price_store, regions, risk_plan, scan_pipeline
+from src.engine.scan_presets import PRESETS, run_presets
+from src.engine.scan_rules import to_title
+
+ALL_REGIONS = tuple(regions.REGIONS)
+
+def smart_money_check(region: str, symbols: List[str]):
+    """Smart Money gate for the A/B presets (risk_plan.lazy_gate): R/R, Monte Carlo POP and
+    rules are evaluated per symbol when it first reaches the gate, so only symbols that clear
+    the setup checks are simulated; symbols it cannot judge fail as "sm_gate_error". None
+    when the engine is unavailable."""
+    try:
+        return risk_plan.lazy_gate(region, regions.get(region)["sm_region"], symbols)
+    except ImportError:
+        return None
+
+def _with_plan(df: pd.DataFrame, region: str, preset: dict) -> pd.DataFrame:
+    """A/B results + Target / R/R / POP / Shares from risk_plan and pop (the row's own Stop is kept)."""
+    if preset.get("kind") != "ab":
+        return df
+    p = risk_plan.plan(feature_table.features(region, df["Symbol"]), preset["is_long"])
+    close = price_store.load_panel(p["Symbol"].tolist(), region).tail(pop.LOOKBACK + 1)
+    p = p.assign(POP=pop.estimate(p, close)["POP"].to_numpy()).set_index("Symbol")
+    return df.join(p[["Target", "RR", "POP", "Shares"]].rename(columns={"RR": "R/R"}), on="Symbol")
+
+def scan_region(region: str, presets=None, lookback: int = 420, smart_money: bool = True,
+                symbols: Optional[Iterable[str]] = None, token: Optional[str] = None) -> dict:
+    """Run the presets over one region's local bars. The universe is `symbols`, else the
+    EODHD symbol master when a token is given, else the local price store; master symbols
+    without local bars are counted under stage 1 "no_local_bars" rather than scanned.
+    -> {"region", "results": {preset: DataFrame with a Region column}, "reasons": {preset: Counter},
+        "processed", "stage1": Counter, "seconds"}"""
+    t0 = time.time()
+    ad = regions.get(region)
+    k = ad["key"]
+    syms = list(symbols) if symbols is not None else regions.symbol_master(k, token)
+    local = set(price_store.list_symbols(k))
+    missing = sum(1 for s in syms if s not in local)
+    syms = [s for s in syms if s in local]
+    survivors, s1 = scan_pipeline.prefilter(syms, scan_pipeline.local_snapshot(k, syms),
+                                            min_avg_volume=ad["min_avg_volume"], min_price=ad["min_price"])
+    if missing:
+        s1["no_local_bars"] += missing
+    gate = smart_money_check(k, survivors) if smart_money else None
+    frames = ((s, to_title(price_store.load_bars(s, k))) for s in survivors)
+    out = run_presets(frames, presets, lookback=lookback, sm_check=gate, min_avg_volume=ad["min_avg_volume"])
+    results = {p: _with_plan(res["results"], k, PRESETS[p]).assign(Region=ad["name"])
+               if not res["results"].empty else res["results"] for p, res in out.items()}
+    processed = next(iter(out.values()))["processed"] if out else 0
+    return {"region": k, "results": results, "reasons": {p: res["reasons"] for p, res in out.items()},
+            "processed": processed, "stage1": s1, "seconds": round(time.time() - t0, 2)}
+
+def _worker(region, presets, lookback, smart_money, token=None):
+    # module-level so the pool can pickle it; environment (VEGA_EOD_ROOT, ...) is inherited
+    return scan_region(region, presets, lookback, smart_money, token=token)
+
+def combine(per_region: Dict[str, dict], presets=None) -> Dict[str, pd.DataFrame]:
+    """{preset: one region-tagged DataFrame}, regions in adapter order."""
+    keys = list(presets or PRESETS)
+    out = {}
+    for p in keys:
+        parts = [per_region[r]["results"].get(p) for r in ALL_REGIONS if r in per_region and "results" in per_region[r]]
+        parts = [x for x in parts if x is not None and not x.empty]
+        out[p] = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    return out
+
+def scan_all(region_keys: Iterable[str] = ALL_REGIONS, presets=None, lookback: int = 420,
+             smart_money: bool = True, workers: Optional[int] = None, token: Optional[str] = None) -> dict:
+    """Every region in its own process. A region that fails reports {"error": ...} instead
+    of sinking the run. token: EODHD key for the symbol masters (default EODHD_API_TOKEN; none
+    -> each region's local price store). -> {"regions": {key: scan_region result},
+    "combined": {preset: DataFrame}, "seconds"}"""
+    t0 = time.time()
+    keys = [regions.key(r) for r in region_keys]
+    per_region = {}
+    token = token if token is not None else os.getenv("EODHD_API_TOKEN")
+    workers = workers or min(len(keys), os.cpu_count() or 1)
+    if workers <= 1 or len(keys) <= 1:
+        for k in keys:
+            try:
+                per_region[k] = scan_region(k, presets, lookback, smart_money, token=token)
+            except Exception as e:
+                per_region[k] = {"region": k, "error": str(e)}
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futs = {pool.submit(_worker, k, presets, lookback, smart_money, token): k for k in keys}
+            for fut in as_completed(futs):
+                k = futs[fut]
+                try:
+                    per_region[k] = fut.result()
+                except Exception as e:
+                    per_region[k] = {"region": k, "error": str(e)}
+    per_region = {k: per_region[k] for k in keys}
+    return {"regions": per_region, "combined": combine(per_region, presets), "seconds": round(time.time() - t0, 2)}
+
+def reasons_total(per_region: Dict[str, dict], preset: str) -> Counter:
+    total = Counter()
+    for r in per_region.values():
+        total.update(r.get("reasons", {}).get(preset, Counter()))
+    return total
@@ -0,0 +1,85 @@
+# src/engine/pop.py
+# Monte Carlo probability of profit for a batch of trade plans (src/engine/risk_plan.py).
+# Each symbol's last `lookback` daily log returns are bootstrapped into forward close
+# paths — one (symbols x paths x horizon) tensor per chunk of symbols, chunk size capped
+# by MAX_CELLS — and a path is a win when it reaches the target before the stop within
+# the horizon. Close-to-close paths: intraday touches are not modelled. The RNG is seeded,
+# so the same inputs always give the same POP.
+from __future__ import annotations
+import os
+from typing import Iterable, Optional, Union
+import numpy as np
+import pandas as pd
+
+PATHS = 1000
+HORIZON = 20                      # bars, same as the backtester's default hold
+LOOKBACK = 250                    # returns bootstrapped per symbol (about one year)
+MIN_RETURNS = 60                  # fewer valid returns than this -> POP is NaN
+MAX_CELLS = int(os.getenv("VEGA_POP_MAX_CELLS", "1000000"))     # floats per chunk tensor (~8 MB, cache-friendly)
+SEED = 7
+
+POP_COLS = ["Symbol", "POP", "PStop", "PTimeout", "Returns"]
+
+def log_returns(close: pd.DataFrame, lookback: int = LOOKBACK) -> np.ndarray:
+    """N x lookback array of the last daily log returns per column of a close panel
+    (dates x symbols), valid values packed to the front, NaN after."""
+    c = close.apply(pd.to_numeric, errors="coerce").sort_index()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = np.log(c / c.shift()).to_numpy(dtype=float)[1:]
+    r = np.where(np.isfinite(r), r, np.nan)
+    r = r[-int(lookback):].T if len(r) else np.empty((c.shape[1], 0))
+    order = np.argsort(np.isnan(r), axis=1, kind="stable")       # valid first, date order kept
+    return np.take_along_axis(r, order, axis=1)
+
+def _first_hit(hit: np.ndarray) -> np.ndarray:
+    """Index of the first True along the last axis; horizon when never."""
+    return np.where(hit.any(axis=-1), hit.argmax(axis=-1), hit.shape[-1])
+
+def simulate(returns: np.ndarray, entry, stop, target, is_long: Union[bool, Iterable[bool]] = True,
+             paths: int = PATHS, horizon: int = HORIZON, seed: Optional[int] = SEED,
+             max_cells: int = MAX_CELLS) -> dict:
+    """returns: N x L (log_returns); entry / stop / target / is_long: scalars or length N.
+    -> {"pop", "p_stop", "p_timeout", "n"}: arrays of length N (NaN where there are fewer
+    than MIN_RETURNS returns or the plan is not a valid long / short)."""
+    r = np.asarray(returns, dtype=float)
+    n = r.shape[0]
+    b = lambda x, dt=float: np.broadcast_to(np.asarray(x, dtype=dt), (n,))
+    entry, stop, target, long_ = b(entry), b(stop), b(target), b(is_long, bool)
+    s = np.where(long_, 1.0, -1.0)
+    count = np.isfinite(r).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        up, dn = np.log(target / entry) * s, np.log(stop / entry) * s    # in "profit" log units
+    ok = (count >= MIN_RETURNS) & np.isfinite(up) & np.isfinite(dn) & (up > 0) & (dn < 0)
+    pop, p_stop, p_out = (np.full(n, np.nan) for _ in range(3))
+    rng = np.random.default_rng(seed)
+    idx = np.flatnonzero(ok)
+    step = max(int(max_cells) // max(paths * horizon, 1), 1)
+    for a in range(0, len(idx), step):
+        i = idx[a:a + step]
+        k = count[i][:, None, None]
+        draw = (rng.random((len(i), paths, horizon)) * k).astype(np.intp)              # bootstrap indices
+        steps = np.take_along_axis(r[i], draw.reshape(len(i), -1), axis=1).reshape(len(i), paths, horizon)
+        path = np.cumsum(steps, axis=2) * s[i][:, None, None]                         # profit-side log P&L
+        t_win = _first_hit(path >= up[i][:, None, None])
+        t_loss = _first_hit(path <= dn[i][:, None, None])
+        win = t_win < t_loss
+        loss = t_loss < t_win
+        pop[i], p_stop[i] = win.mean(axis=1), loss.mean(axis=1)
+        p_out[i] = 1.0 - pop[i] - p_stop[i]
+    return {"pop": pop, "p_stop": p_stop, "p_timeout": p_out, "n": count}
+
+def estimate(plans: pd.DataFrame, close: pd.DataFrame, paths: int = PATHS, horizon: int = HORIZON,
+             lookback: int = LOOKBACK, seed: Optional[int] = SEED) -> pd.DataFrame:
+    """POP per row of a risk_plan.plan frame, returns from the matching close-panel column
+    (symbols without one get NaN)."""
+    if plans is None or plans.empty:
+        return pd.DataFrame(columns=POP_COLS)
+    syms = plans["Symbol"].astype(str).str.upper().tolist()
+    panel = close.rename(columns=lambda c: str(c).upper()) if close is not None else pd.DataFrame()
+    panel = panel.loc[:, ~panel.columns.duplicated()].reindex(columns=syms) if not panel.empty else pd.DataFrame(columns=syms)
+    r = log_returns(panel, lookback) if len(panel) else np.full((len(syms), 0), np.nan)
+    out = simulate(r, plans["Entry"].to_numpy(dtype=float), plans["Stop"].to_numpy(dtype=float),
+                   plans["Target"].to_numpy(dtype=float), plans["Side"].astype(str).eq("LONG").to_numpy(),
+                   paths=paths, horizon=horizon, seed=seed)
+    return pd.DataFrame({"Symbol": syms, "POP": np.round(out["pop"], 3), "PStop": np.round(out["p_stop"], 3),
+                         "PTimeout": np.round(out["p_timeout"], 3), "Returns": out["n"]}, columns=POP_COLS)
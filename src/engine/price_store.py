@@ -0,0 +1,146 @@
+# src/engine/price_store.py
+# Local EOD price store: data/eod/<region>/<SYMBOL>.csv (daily) plus materialized
+# weekly and monthly bars in data/eod/<region>/W/ and data/eod/<region>/M/.
+#
+# Higher-timeframe bars are rebuilt incrementally: only the last stored period and
+# anything after it are re-aggregated when new daily bars arrive. Periods close on
+# the exchange's last scheduled session (e.g. Thursday in a Good Friday week), so
+# weekly analytics read precomputed bars instead of resampling in the hot path.
+from __future__ import annotations
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from src.engine import trading_calendar as tcal
+
+EOD_ROOT = os.getenv("VEGA_EOD_ROOT", "data/eod")
+REGION_EXCHANGE = {"us": "NYSE", "ca": "TSX", "mx": "BMV", "latam": "BYMA"}
+OHLCV = ["date", "open", "high", "low", "close", "volume"]
+
+# ============================ Paths & I/O ============================
+
+def region_dir(region: str) -> str:
+    return os.path.join(EOD_ROOT, region.lower())
+
+def bar_path(symbol: str, region: str, freq: str = "D") -> str:
+    f = freq.upper()[0]
+    sub = "" if f == "D" else f
+    return os.path.join(region_dir(region), sub, f"{symbol}.csv")
+
+def list_symbols(region: str) -> list:
+    d = Path(region_dir(region))
+    return sorted(p.stem for p in d.glob("*.csv")) if d.exists() else []
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case OHLCV columns (build_eod_csvs writes Title case), parsed & sorted dates."""
+    df = df.rename(columns={c: str(c).lower() for c in df.columns})
+    if "date" not in df.columns:
+        return pd.DataFrame(columns=OHLCV)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    try:
+        df["date"] = df["date"].dt.tz_localize(None)
+    except Exception:
+        pass
+    df = df.dropna(subset=["date"]).sort_values("date")
+    return df.drop_duplicates("date", keep="last").reset_index(drop=True)
+
+def _read(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=OHLCV)
+    try:
+        return _normalize(pd.read_csv(path))
+    except Exception:
+        return pd.DataFrame(columns=OHLCV)
+
+def _write(df: pd.DataFrame, path: str) -> str:
+    Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+    tmp = path + ".tmp"
+    df.to_csv(tmp, index=False, date_format="%Y-%m-%d")
+    os.replace(tmp, path)
+    return path
+
+# ============================ Aggregation ============================
+
+def _period_start(dates: np.ndarray, freq: str) -> np.ndarray:
+    d = dates.astype("datetime64[D]")
+    if freq == "W":
+        return d - ((d.astype("int64") + 3) % 7)      # Monday of the week
+    return d.astype("datetime64[M]").astype("datetime64[D]")
+
+def _period_end_session(starts: np.ndarray, freq: str, exchange: str) -> np.ndarray:
+    """Last scheduled session of each period (label of the aggregated bar)."""
+    nxt = starts + 7 if freq == "W" else (starts.astype("datetime64[M]") + 1).astype("datetime64[D]")
+    return tcal.sessions_ago(exchange, nxt - 1, 0)
+
+def aggregate(daily: pd.DataFrame, freq: str, exchange: str) -> pd.DataFrame:
+    """Daily OHLCV -> weekly ('W') or monthly ('M') bars labelled by the period's last session."""
+    f = freq.upper()[0]
+    if daily.empty:
+        return pd.DataFrame(columns=OHLCV)
+    starts = _period_start(daily["date"].values, f)
+    g = daily.assign(_p=starts).groupby("_p", sort=True)
+    agg = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    out = g.agg({k: v for k, v in agg.items() if k in daily.columns})
+    labels = _period_end_session(out.index.values.astype("datetime64[D]"), f, exchange)
+    out.insert(0, "date", pd.to_datetime(labels))
+    return out.reset_index(drop=True)
+
+def update_higher(symbol: str, region: str, freqs=("W", "M"), full: bool = False) -> dict:
+    """Bring the W/M files of one symbol up to date with its daily file.
+
+    Incremental by default: the last stored period is dropped and re-aggregated
+    together with every daily bar after its start.
+    """
+    exchange = REGION_EXCHANGE.get(region.lower(), "NYSE")
+    daily = _read(bar_path(symbol, region, "D"))
+    written = {}
+    for f in freqs:
+        path = bar_path(symbol, region, f)
+        old = pd.DataFrame(columns=OHLCV) if full else _read(path)
+        if old.empty or daily.empty:
+            new = aggregate(daily, f, exchange)
+        else:
+            cut = _period_start(np.array([old["date"].iloc[-1].to_datetime64()]), f)[0]
+            tail = daily[daily["date"].values.astype("datetime64[D]") >= cut]
+            keep = old[old["date"].values.astype("datetime64[D]") < cut]
+            new = pd.concat([keep, aggregate(tail, f, exchange)], ignore_index=True)
+        written[f] = _write(new, path)
+    return written
+
+def append_daily(symbol: str, region: str, bars: pd.DataFrame) -> str:
+    """Merge new daily bars (newer rows win) and refresh the W/M bars incrementally."""
+    path = bar_path(symbol, region, "D")
+    merged = _normalize(pd.concat([_read(path), _normalize(bars)], ignore_index=True))
+    _write(merged, path)
+    update_higher(symbol, region)
+    return path
+
+# ============================ Loader ============================
+
+def load_bars(symbol: str, region: str, freq: str = "D", index: bool = False) -> pd.DataFrame:
+    """Bars of one symbol at D / W / M. Higher timeframes are refreshed first when
+    their file is missing or older than the daily file."""
+    f = freq.upper()[0]
+    if f != "D":
+        d_path, h_path = bar_path(symbol, region, "D"), bar_path(symbol, region, f)
+        if os.path.exists(d_path) and (not os.path.exists(h_path) or os.path.getmtime(h_path) < os.path.getmtime(d_path)):
+            update_higher(symbol, region, freqs=(f,))
+    df = _read(bar_path(symbol, region, f))
+    return df.set_index("date") if index else df
+
+def load_many(symbols, region: str, freq: str = "D") -> dict:
+    """{symbol: date-indexed frame} — the shape risk_scoring.batch_score expects."""
+    out = {}
+    for s in symbols:
+        df = load_bars(s, region, freq, index=True)
+        if not df.empty:
+            out[s] = df
+    return out
+
+def load_panel(symbols, region: str, field: str = "close", freq: str = "D") -> pd.DataFrame:
+    frames = load_many(symbols, region, freq)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat({s: pd.to_numeric(df[field], errors="coerce") for s, df in frames.items() if field in df.columns},
+                     axis=1).sort_index()
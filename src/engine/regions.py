@@ -0,0 +1,128 @@
+# src/engine/regions.py
+# Region adapters: everything the scan engine needs to know about a market.
+#   exchange        trading-calendar code (src/engine/trading_calendar.py)
+#   eod_exchanges   EODHD exchange codes for the symbol master (first one is the ticker suffix)
+#   benchmark       index proxy in the local price store (no suffix = US-listed)
+#   min_avg_volume  30-day average volume floor (stage 1 and the A/B presets)
+#   min_price       price floor for stage 1 (None = no floor)
+#   sm_region       region name used by src/engine/smart_money.py
+# Keys match the price-store regions (data/eod/<region>/).
+from __future__ import annotations
+from datetime import date, timedelta
+from typing import List, Optional
+import pandas as pd
+
+from src.engine import price_store, trading_calendar as tcal
+
+REGIONS = {
+    "us":    {"name": "USA",    "exchange": "NYSE", "eod_exchanges": ("US",),      "benchmark": "SPY",
+              "min_avg_volume": 100_000, "min_price": 1.0,  "sm_region": "USA"},
+    "ca":    {"name": "Canada", "exchange": "TSX",  "eod_exchanges": ("TO", "V"),  "benchmark": "XIU.TO",
+              "min_avg_volume": 50_000,  "min_price": 1.0,  "sm_region": "Canada"},
+    "mx":    {"name": "Mexico", "exchange": "BMV",  "eod_exchanges": ("MX",),      "benchmark": "NAFTRAC.MX",
+              "min_avg_volume": 20_000,  "min_price": None, "sm_region": "Mexico"},
+    "latam": {"name": "LATAM",  "exchange": "BYMA", "eod_exchanges": ("BA",),      "benchmark": "ILF",
+              "min_avg_volume": 20_000,  "min_price": None, "sm_region": "LATAM"},
+}
+EXCLUDE_TYPES = "ETF|ETN|FUND|PREF|ADR|RIGHT|WARRANT"
+
+def key(region: str) -> str:
+    """'us' / 'USA' / 'Canada' ... -> adapter key."""
+    r = str(region).strip().lower()
+    if r in REGIONS:
+        return r
+    for k, v in REGIONS.items():
+        if v["name"].lower() == r:
+            return k
+    raise ValueError(f"Unknown region: {region}")
+
+def get(region: str) -> dict:
+    k = key(region)
+    return {"key": k, **REGIONS[k]}
+
+def eod_symbol(symbol: str, region: str) -> str:
+    """Ticker in EODHD form (AAPL -> AAPL.US); explicit suffixes are kept."""
+    s = symbol.strip().upper()
+    return s if "." in s else f"{s}.{REGIONS[key(region)]['eod_exchanges'][0]}"
+
+def symbol_master(region: str, token: Optional[str] = None) -> List[str]:
+    """Common-stock tickers of the region: the EODHD exchange lists when a token is given
+    (ETFs, funds, preferreds etc. dropped), otherwise — or when the lists can't be
+    fetched — whatever the local price store holds."""
+    k = key(region)
+    if not token:
+        return price_store.list_symbols(k)
+    import requests
+    out = []
+    for ex in REGIONS[k]["eod_exchanges"]:
+        try:
+            r = requests.get(f"https://eodhd.com/api/exchange-symbol-list/{ex}",
+                             params={"api_token": token, "fmt": "json"}, timeout=30)
+            df = pd.DataFrame(r.json() if r.status_code == 200 else [])
+        except Exception:
+            df = pd.DataFrame()
+        if df.empty or "Code" not in df.columns:
+            continue
+        if "Type" in df.columns:
+            df = df[~df["Type"].astype(str).str.upper().str.contains(EXCLUDE_TYPES, na=False)]
+        out += df["Code"].astype(str).str.upper().tolist()
+    return list(dict.fromkeys(out)) or price_store.list_symbols(k)
+
+# ============================ Local bar refresh ============================
+
+def _eod_json(path: str, token: str, timeout: int = 60, **params):
+    import requests
+    try:
+        r = requests.get(f"https://eodhd.com/api/{path}", params={"api_token": token, "fmt": "json", **params}, timeout=timeout)
+        return r.json() if r.status_code == 200 else []
+    except Exception:
+        return []
+
+def _bars(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows)
+    return df.reindex(columns=price_store.OHLCV) if not df.empty and "date" in df.columns else pd.DataFrame(columns=price_store.OHLCV)
+
+def refresh_bars(region: str, token: str, backfill: int = 200, years: float = 2.0) -> dict:
+    """Bring the region's local price store up to date from EODHD.
+    One eod-bulk-last-day call per exchange appends the latest bar to every stored symbol;
+    up to `backfill` symbol-master names missing from the store — liquid ones only (50-day
+    average volume above the adapter floor), highest dollar volume first — get `years` of
+    history, so a new region fills in over a few nights. The benchmark is refreshed by
+    symbol. -> {"appended", "backfilled", "benchmark"}"""
+    k = key(region); ad = REGIONS[k]
+    local = set(price_store.list_symbols(k))
+    master = set(symbol_master(k, token))
+    appended, cands = 0, []
+    for ex in ad["eod_exchanges"]:
+        d = pd.DataFrame(_eod_json(f"eod-bulk-last-day/{ex}", token, filter="extended"))
+        if d.empty or "code" not in d.columns or "date" not in d.columns:
+            continue
+        d["code"] = d["code"].astype(str).str.upper()
+        for rec in d.to_dict("records"):
+            sym = rec["code"]
+            if sym in local:
+                price_store.append_daily(sym, k, _bars([rec]))
+                appended += 1
+            elif sym in master:
+                px, av = pd.to_numeric(rec.get("close"), errors="coerce"), pd.to_numeric(rec.get("avgvol_50d"), errors="coerce")
+                if pd.notna(av) and av >= ad["min_avg_volume"] and (ad["min_price"] is None or px >= ad["min_price"]):
+                    cands.append((float(px * av), sym, ex))
+    start = (date.today() - timedelta(days=int(years * 365.25))).isoformat()
+    backfilled = 0
+    for _, sym, ex in sorted(cands, reverse=True)[:max(int(backfill), 0)]:
+        bars = _bars(_eod_json(f"eod/{sym}.{ex}", token, timeout=30, period="d", **{"from": start}))
+        if not bars.empty:
+            price_store.append_daily(sym, k, bars)
+            backfilled += 1
+    bm = ad["benchmark"]
+    recent = _bars(_eod_json(f"eod/{bm if '.' in bm else bm + '.US'}", token, timeout=30, period="d",
+                             **{"from": start if bm not in local else (date.today() - timedelta(days=10)).isoformat()}))
+    if not recent.empty:
+        price_store.append_daily(bm, k, recent)
+    return {"appended": appended, "backfilled": backfilled, "benchmark": len(recent)}
+
+def sessions(region: str, start=None, end=None):
+    return tcal.sessions(REGIONS[key(region)]["exchange"], start, end)
+
+def benchmark_bars(region: str) -> pd.DataFrame:
+    return price_store.load_bars(REGIONS[key(region)]["benchmark"], key(region))
@@ -0,0 +1,148 @@
+# src/engine/risk_plan.py
+# Trade plans for a whole candidate list at once, from latest-bar features (the feature
+# table, or any frame with the same columns):
+#   stop    the tighter of the ATR stop (EMA50 ∓ 2·ATR14, as compute_stop) and the structure
+#           stop (20-day low / high ∓ a quarter ATR) that is on the right side of the entry;
+#           entry ∓ 2·ATR14 when neither is
+#   target  nearest resistance above the entry (20-day, then 52-week high) for longs,
+#           nearest support below (20-day, then 52-week low) for shorts; entry ± 3·ATR14
+#           when price is already beyond both
+#   R/R     reward / risk per share;  Shares  sized so a stop-out costs risk_pct of the account,
+#           capped at max_position_pct of the account
+# The R/R column is what the Smart Money gate (passes_rules_batch) should see instead of
+# a constant 3.0; gate_inputs adds a Monte Carlo POP (src/engine/pop.py) for the same plans,
+# and lazy_gate runs both per symbol, only for the symbols a scan actually brings to the gate.
+from __future__ import annotations
+import os
+from typing import Iterable, Optional, Union
+import numpy as np
+import pandas as pd
+
+ACCOUNT_SIZE = float(os.getenv("VEGA_ACCOUNT_SIZE", "100000"))
+RISK_PCT = float(os.getenv("VEGA_RISK_PCT", "0.01"))
+MAX_POSITION_PCT = float(os.getenv("VEGA_MAX_POSITION_PCT", "0.20"))
+STOP_ATR = 2.0
+STRUCTURE_BUFFER_ATR = 0.25
+FALLBACK_TARGET_ATR = 3.0
+GATE_ERROR = "sm_gate_error"        # lazy_gate's reason when a symbol could not be judged
+
+PLAN_COLS = ["Symbol", "Side", "Entry", "Stop", "StopType", "Target", "TargetType",
+             "Risk", "Reward", "RR", "Shares", "PositionValue"]
+
+def _col(df: pd.DataFrame, name: str) -> np.ndarray:
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float) if name in df.columns else np.full(len(df), np.nan)
+
+def plan(features: pd.DataFrame, is_long: Union[bool, Iterable[bool]] = True, account: float = ACCOUNT_SIZE,
+         risk_pct: float = RISK_PCT, max_position_pct: float = MAX_POSITION_PCT, stop_atr: float = STOP_ATR,
+         buffer_atr: float = STRUCTURE_BUFFER_ATR, fallback_atr: float = FALLBACK_TARGET_ATR) -> pd.DataFrame:
+    """features: one row per symbol (Symbol column or index) with Close, EMA50, ATR14,
+    High20, Low20 and optionally High52W / Low52W. is_long: one flag or one per row."""
+    if features is None or features.empty:
+        return pd.DataFrame(columns=PLAN_COLS)
+    f = features.reset_index() if "Symbol" not in features.columns else features.reset_index(drop=True)
+    if "Symbol" not in f.columns:
+        f = f.rename(columns={f.columns[0]: "Symbol"})
+    n = len(f)
+    long_ = np.broadcast_to(np.asarray(is_long, dtype=bool), (n,))
+    s = np.where(long_, 1.0, -1.0)                       # +1 long, -1 short: "below" = s·(x - entry) < 0
+    entry, ema50, atr = _col(f, "Close"), _col(f, "EMA50"), _col(f, "ATR14")
+    with np.errstate(invalid="ignore"):
+        # ---- stops: candidates on the loss side of the entry; keep the one closest to it
+        atr_stop = ema50 - s * stop_atr * atr
+        struct = np.where(long_, _col(f, "Low20") - buffer_atr * atr, _col(f, "High20") + buffer_atr * atr)
+        cands = np.stack([atr_stop, struct])
+        dist = s * (entry - cands)                       # > 0 when on the loss side
+        dist = np.where(np.isfinite(dist) & (dist > 0), dist, np.inf)
+        k = dist.argmin(axis=0)
+        has = np.isfinite(dist.min(axis=0))
+        stop = np.where(has, cands[k, np.arange(n)], entry - s * stop_atr * atr)
+        stop_type = np.where(has, np.where(k == 0, "atr", "structure"), "atr_fallback")
+        # ---- targets: nearest level on the profit side
+        lv = np.stack([np.where(long_, _col(f, "High20"), _col(f, "Low20")),
+                       np.where(long_, _col(f, "High52W"), _col(f, "Low52W"))])
+        gain = s * (lv - entry)
+        gain = np.where(np.isfinite(gain) & (gain > 0), gain, np.inf)
+        j = gain.argmin(axis=0)
+        hit = np.isfinite(gain.min(axis=0))
+        target = np.where(hit, lv[j, np.arange(n)], entry + s * fallback_atr * atr)
+        target_type = np.where(hit, np.where(j == 0, "20d", "52w"), "atr_projection")
+        risk = s * (entry - stop)
+        reward = s * (target - entry)
+        rr = np.where(risk > 0, reward / risk, np.nan)
+        shares = np.floor(np.minimum(account * risk_pct / np.where(risk > 0, risk, np.nan),
+                                     account * max_position_pct / np.where(entry > 0, entry, np.nan)))
+    shares = np.where(np.isfinite(shares), shares, 0).astype(int)
+    return pd.DataFrame({
+        "Symbol": f["Symbol"].astype(str).str.upper().to_numpy(), "Side": np.where(long_, "LONG", "SHORT"),
+        "Entry": entry, "Stop": np.round(stop, 4), "StopType": stop_type,
+        "Target": np.round(target, 4), "TargetType": target_type,
+        "Risk": np.round(risk, 4), "Reward": np.round(reward, 4), "RR": np.round(rr, 2),
+        "Shares": shares, "PositionValue": np.round(shares * entry, 2),
+    }, columns=PLAN_COLS)
+
+def rr_for(symbols: Iterable[str], features: pd.DataFrame, is_long: bool = True) -> np.ndarray:
+    """R/R per symbol in `symbols` order; NaN where the features have no row (the gate
+    then has nothing to judge and lets the R/R check pass)."""
+    syms = [str(x).upper() for x in symbols]
+    if features is None or features.empty:
+        return np.full(len(syms), np.nan)
+    p = plan(features, is_long).drop_duplicates("Symbol").set_index("Symbol")
+    return p["RR"].reindex(syms).to_numpy(dtype=float)
+
+def gate_inputs(symbols: Iterable[str], region: str, is_long: bool = True, features: Optional[pd.DataFrame] = None,
+                close: Optional[pd.DataFrame] = None, min_rr: Optional[float] = None):
+    """(rr, pop) arrays in `symbols` order for passes_rules_batch. Plans come from `features`
+    (default: the region's feature table), returns from `close` (default: the local price
+    store). POP is only simulated where R/R clears `min_rr` (the gate fails the rest on R/R
+    before it looks at POP); NaN where either input is missing."""
+    from src.engine import feature_table, pop as pop_engine, price_store
+    syms = [str(x).upper() for x in symbols]
+    feats = feature_table.features(region, syms) if features is None else features
+    p = plan(feats, is_long).drop_duplicates("Symbol").set_index("Symbol").reindex(syms)
+    rr = p["RR"].to_numpy(dtype=float)
+    need = np.isfinite(rr) & (rr >= (min_rr if min_rr is not None else -np.inf))
+    pop = np.full(len(syms), np.nan)
+    if need.any():
+        cand = p[need].reset_index()
+        if close is None:
+            close = price_store.load_panel(cand["Symbol"].tolist(), region).tail(pop_engine.LOOKBACK + 1)
+        pop[need] = pop_engine.estimate(cand, close)["POP"].to_numpy(dtype=float)
+    return rr, pop
+
+def lazy_gate(region: str, sm_region: str, symbols: Optional[Iterable[str]] = None,
+              features: Optional[pd.DataFrame] = None):
+    """sm_check(sym, is_long) -> (ok, [reason]) for scan_presets / the A/B page scans. A symbol's
+    R/R, POP (gate_inputs) and rules (passes_rules_batch) are evaluated the first time it reaches
+    the gate — after the cheaper setup checks — and memoized per side, so a capped or resumed
+    scan never plans, loads or simulates symbols it does not judge. The feature table is read
+    once (`features`, else the region's table limited to `symbols`). A symbol that cannot be
+    judged (feature table, price store or rules error) fails with reason GATE_ERROR rather than
+    passing ungated; check.error keeps the first such error. Raises ImportError when the Smart
+    Money engine is missing."""
+    from src.engine import feature_table
+    from src.engine.smart_money import load_config, passes_rules_batch, reason_text
+    loaded, memo = {}, {}
+    def check(sym: str, is_long: bool = True):
+        key = (str(sym).upper(), bool(is_long))
+        if key not in memo:
+            try:
+                if "features" not in loaded:
+                    loaded["features"] = feature_table.features(region, symbols) if features is None else features
+                feats = loaded["features"]
+                row = feats.loc[[key[0]]] if key[0] in feats.index else feats.iloc[0:0]
+                rr, pop = gate_inputs([key[0]], region, key[1], features=row, min_rr=float(load_config()["min_rr_ratio"]))
+                ok, codes = passes_rules_batch([key[0]], sm_region, rr=rr, pop=pop)
+                memo[key] = (bool(ok[0]), [] if ok[0] else [reason_text(codes[0])])
+            except Exception as e:
+                memo[key] = (False, [GATE_ERROR])
+                check.error = check.error or f"{type(e).__name__}: {e}"
+        return memo[key]
+    check.error = None
+    return check
+
+def gate(plans: pd.DataFrame, region: str, pop=0.60) -> pd.DataFrame:
+    """plans + SM_Pass / SM_Reason from passes_rules_batch fed with each plan's real R/R
+    (and `pop`, e.g. pop.estimate(plans, close)["POP"])."""
+    from src.engine.smart_money import passes_rules_batch
+    ok, codes = passes_rules_batch(plans["Symbol"].tolist(), region, rr=plans["RR"].to_numpy(dtype=float), pop=pop)
+    return plans.assign(SM_Pass=ok, SM_Reason=codes)
@@ -1,6 +1,8 @@
 
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
 
 # ============================ Helpers ============================
 
@@ -176,12 +178,132 @@ def metrics_to_row(symbol: str, metrics: dict) -> pd.DataFrame:
     row.update({k: metrics.get(k) for k in ["score","sharpe","sortino","beta","alpha","vol","mdd","cvar","cagr"]})
     return pd.DataFrame([row])
 
-def batch_score(symbol_to_df: dict, benchmark: pd.DataFrame = None, price_col: str = "close", rf: float = 0.0, freq: str = "D", weights: dict = None) -> pd.DataFrame:
+_RESULT_COLS = ["score","sharpe","sortino","beta","alpha","vol","mdd","cvar","cagr"]
+
+def _nan_row(symbol: str) -> dict:
+    row = {"symbol": symbol}
+    row.update({k: np.nan for k in _RESULT_COLS})
+    return row
+
+def batch_score(symbol_to_df: dict, benchmark: pd.DataFrame = None, price_col: str = "close", rf: float = 0.0, freq: str = "D", weights: dict = None,
+                workers: int = 0, chunk_size: int = 500, max_chunk_mb: float = 256.0) -> pd.DataFrame:
+    """Score every symbol. With workers > 1 the symbols are sharded across a process pool
+    (see _batch_score_pool); results always come back in input order."""
+    if workers and workers > 1 and len(symbol_to_df) > 1:
+        return _batch_score_pool(symbol_to_df, benchmark=benchmark, price_col=price_col, rf=rf, freq=freq, weights=weights,
+                                 workers=workers, chunk_size=chunk_size, max_chunk_mb=max_chunk_mb)
     rows = []
     for sym, df in symbol_to_df.items():
         try:
             m = score_from_prices(df=df, benchmark=benchmark, price_col=price_col, rf=rf, freq=freq, weights=weights)
             rows.append(metrics_to_row(sym, m).iloc[0].to_dict())
         except Exception:
-            rows.append({"symbol": sym, "score": np.nan, "sharpe": np.nan, "sortino": np.nan, "beta": np.nan, "alpha": np.nan, "vol": np.nan, "mdd": np.nan, "cvar": np.nan, "cagr": np.nan})
+            rows.append(_nan_row(sym))
     return pd.DataFrame(rows)
+
+# ============================ Process-pool mode ============================
+# Each chunk of symbols is packed into one shared-memory block laid out as
+# [closes float64 | dates int64]; workers attach by name and rebuild the
+# per-symbol frames, so no DataFrame is ever pickled across the pool.
+
+def _pack_series(df: pd.DataFrame, price_col: str):
+    vals = pd.to_numeric(df[price_col], errors="coerce").to_numpy(dtype=np.float64)
+    if isinstance(df.index, pd.DatetimeIndex):
+        # pandas 3 indexes default to [us]; the block always carries nanoseconds
+        return vals, df.index.as_unit("ns").asi8.astype(np.int64), True
+    # non-datetime indexes align positionally against the benchmark
+    return vals, np.arange(len(vals), dtype=np.int64), False
+
+def _to_shm(vals: np.ndarray, dates: np.ndarray):
+    n = len(vals)
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 16, 16))
+    np.ndarray((n,), dtype=np.float64, buffer=shm.buf)[:] = vals
+    np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=n * 8)[:] = dates
+    return shm
+
+def _from_shm(name: str, n: int, lo: int, hi: int, is_dt: bool, price_col: str):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        vals = np.ndarray((n,), dtype=np.float64, buffer=shm.buf)[lo:hi].copy()
+        dates = np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=n * 8)[lo:hi].copy()
+    finally:
+        shm.close()
+    idx = pd.DatetimeIndex(dates.view("datetime64[ns]")) if is_dt else pd.Index(dates)
+    return pd.DataFrame({price_col: vals}, index=idx)
+
+def _score_chunk(shm_name, n_total, layout, bench, price_col, rf, freq, weights):
+    """Worker entry point: layout is [(symbol, lo, hi, is_dt), ...] slices of the chunk block."""
+    bench_df = _from_shm(*bench, price_col) if bench is not None else None
+    rows = []
+    for sym, lo, hi, is_dt in layout:
+        if is_dt is None:
+            rows.append(_nan_row(sym)); continue
+        try:
+            df = _from_shm(shm_name, n_total, lo, hi, is_dt, price_col)
+            m = score_from_prices(df=df, benchmark=bench_df, price_col=price_col, rf=rf, freq=freq, weights=weights)
+            rows.append(metrics_to_row(sym, m).iloc[0].to_dict())
+        except Exception:
+            rows.append(_nan_row(sym))
+    return rows
+
+def _plan_chunks(symbol_to_df: dict, price_col: str, chunk_size: int, max_chunk_mb: float):
+    """Group symbols into chunks bounded by count and by packed size (16 bytes per bar)."""
+    budget = int(max_chunk_mb * 1024 * 1024)
+    chunks, cur, cur_bytes = [], [], 0
+    for sym, df in symbol_to_df.items():
+        try:
+            packed = _pack_series(df, price_col)
+        except Exception:
+            packed = None
+        nbytes = len(packed[0]) * 16 if packed is not None else 0
+        if nbytes > budget:
+            raise ValueError(f"{sym}: {nbytes/1e6:.1f} MB of prices exceeds max_chunk_mb={max_chunk_mb}")
+        if cur and (len(cur) >= max(int(chunk_size), 1) or cur_bytes + nbytes > budget):
+            chunks.append(cur); cur, cur_bytes = [], 0
+        cur.append((sym, packed)); cur_bytes += nbytes
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+def _batch_score_pool(symbol_to_df, benchmark, price_col, rf, freq, weights, workers, chunk_size, max_chunk_mb):
+    chunks = _plan_chunks(symbol_to_df, price_col, chunk_size, max_chunk_mb)
+    bench_shm, bench = None, None
+    if benchmark is not None:
+        b_vals, b_dates, b_dt = _pack_series(benchmark, price_col)
+        bench_shm = _to_shm(b_vals, b_dates)
+        bench = (bench_shm.name, len(b_vals), 0, len(b_vals), b_dt)
+
+    results, live = {}, {}   # live: future -> (chunk index, shm block)
+    try:
+        with ProcessPoolExecutor(max_workers=int(workers)) as pool:
+            pending = list(enumerate(chunks))
+            while pending or live:
+                # keep at most two chunks per worker resident in shared memory
+                while pending and len(live) < 2 * int(workers):
+                    i, chunk = pending.pop(0)
+                    packed = [p for _, p in chunk if p is not None]
+                    vals = np.concatenate([p[0] for p in packed]) if packed else np.empty(0)
+                    dates = np.concatenate([p[1] for p in packed]) if packed else np.empty(0, dtype=np.int64)
+                    layout, pos = [], 0
+                    for sym, p in chunk:
+                        n = len(p[0]) if p is not None else 0
+                        # is_dt=None marks a frame that could not be packed; it scores as NaN
+                        layout.append((sym, pos, pos + n, p[2] if p is not None else None)); pos += n
+                    shm = _to_shm(vals, dates)
+                    fut = pool.submit(_score_chunk, shm.name, len(vals), layout, bench, price_col, rf, freq, weights)
+                    live[fut] = (i, shm)
+                done, _ = wait(list(live), return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i, shm = live.pop(fut)
+                    shm.close(); shm.unlink()
+                    try:
+                        results[i] = fut.result()
+                    except Exception:
+                        results[i] = [_nan_row(sym) for sym, _ in chunks[i]]
+    finally:
+        for _, shm in live.values():
+            shm.close(); shm.unlink()
+        if bench_shm is not None:
+            bench_shm.close(); bench_shm.unlink()
+    rows = [r for i in range(len(chunks)) for r in results.get(i, [])]
+    return pd.DataFrame(rows, columns=["symbol"] + _RESULT_COLS)
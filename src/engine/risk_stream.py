@@ -0,0 +1,316 @@
+# src/engine/risk_stream.py
+# Online (streaming) versions of the risk_scoring metrics.
+# State is kept per symbol, persisted as JSON and advanced one bar at a time,
+# so a daily re-score of the universe costs O(new bars) instead of O(history).
+from __future__ import annotations
+import os, json, math
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from src.engine.risk_scoring import _ann_factor, composite_score
+
+STATE_PATH = os.getenv("VEGA_RISK_STATE_PATH", "data/vega/risk_state.json")
+
+# ============================ Accumulators ============================
+
+class Welford:
+    """Running mean / sample variance (ddof=1)."""
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    def push(self, x: float) -> None:
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+    def to_dict(self) -> dict: return {"n": self.n, "mean": self.mean, "m2": self.m2}
+    @classmethod
+    def from_dict(cls, d: dict) -> "Welford": return cls(**d)
+
+class CoMoment:
+    """Running covariance of (a, b) plus var(b) — enough for beta/alpha."""
+    def __init__(self, n: int = 0, mean_a: float = 0.0, mean_b: float = 0.0, c_ab: float = 0.0, m2_b: float = 0.0):
+        self.n, self.mean_a, self.mean_b, self.c_ab, self.m2_b = n, mean_a, mean_b, c_ab, m2_b
+
+    def push(self, a: float, b: float) -> None:
+        self.n += 1
+        da = a - self.mean_a
+        self.mean_a += da / self.n
+        db = b - self.mean_b
+        self.mean_b += db / self.n
+        self.c_ab += da * (b - self.mean_b)
+        self.m2_b += db * (b - self.mean_b)
+
+    def beta(self) -> float:
+        if self.n < 2 or self.m2_b == 0:
+            return np.nan
+        return self.c_ab / self.m2_b
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "mean_a": self.mean_a, "mean_b": self.mean_b, "c_ab": self.c_ab, "m2_b": self.m2_b}
+    @classmethod
+    def from_dict(cls, d: dict) -> "CoMoment": return cls(**d)
+
+class P2Quantile:
+    """Extended P² estimator (Jain & Chlamtac) tracking several quantiles with O(1) memory.
+
+    `probs` are the interior marker probabilities; markers at 0 (min) and 1 (max)
+    are added automatically. The defaults crowd the left tail so tail_mean() can
+    approximate the 5% CVaR. Until len(probs)+2 observations arrive the raw values
+    are buffered and answers are exact.
+    """
+    def __init__(self, probs=(0.0025, 0.005, 0.01, 0.02, 0.03, 0.04, 0.05, 0.525), q=None, n=None, np_=None, buf=None):
+        self.p = [0.0] + list(probs) + [1.0]
+        self.q = q or []          # marker heights
+        self.n = n or []          # actual marker positions (1-based)
+        self.np_ = np_ or []      # desired marker positions
+        self.buf = buf or []
+
+    @property
+    def count(self) -> int:
+        return len(self.buf) if not self.q else int(self.n[-1])
+
+    def push(self, x: float) -> None:
+        m = len(self.p)
+        if not self.q:
+            self.buf.append(x)
+            if len(self.buf) == m:
+                self.q = sorted(self.buf); self.buf = []
+                self.n = [i + 1.0 for i in range(m)]
+                self.np_ = [1.0 + (m - 1) * p for p in self.p]
+            return
+        q, n = self.q, self.n
+        if x < q[0]:
+            q[0] = x; k = 0
+        elif x >= q[-1]:
+            q[-1] = x; k = m - 2
+        else:
+            k = next(i for i in range(m - 1) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, m):
+            n[i] += 1
+        for i in range(m):
+            self.np_[i] += self.p[i]
+        for i in range(1, m - 1):
+            d = self.np_[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                qp = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not (q[i - 1] < qp < q[i + 1]):   # parabolic step left the bracket → linear
+                    qp = q[i] + s * (q[i + s] - q[i]) / (n[i + s] - n[i])
+                q[i] = qp; n[i] += s
+
+    def quantile(self, p: float) -> float:
+        if not self.q:
+            return float(np.quantile(self.buf, p)) if self.buf else np.nan
+        return float(np.interp(p, self.p, self.q))
+
+    def tail_mean(self, p: float) -> float:
+        """Approximate E[X | X <= q_p] by integrating the piecewise-linear quantile curve on [0, p]."""
+        if not self.q:
+            if not self.buf:
+                return np.nan
+            qv = np.quantile(self.buf, p)
+            tail = [x for x in self.buf if x <= qv]
+            return float(np.mean(tail)) if tail else np.nan
+        grid = sorted({x for x in self.p if x < p} | {p})
+        ys = np.interp(grid, self.p, self.q)
+        area = sum((grid[i + 1] - grid[i]) * (ys[i] + ys[i + 1]) / 2.0 for i in range(len(grid) - 1))
+        return float(area / p) if p > 0 else float(self.q[0])
+
+    def to_dict(self) -> dict:
+        return {"probs": self.p[1:-1], "q": self.q, "n": self.n, "np_": self.np_, "buf": self.buf}
+    @classmethod
+    def from_dict(cls, d: dict) -> "P2Quantile": return cls(**d)
+
+# ============================ Per-symbol state ============================
+
+def _dated(df: pd.DataFrame, price_col: str) -> pd.Series:
+    """Closes indexed by date, from a `date` column or a DatetimeIndex."""
+    if "date" in df.columns:
+        idx = pd.DatetimeIndex(pd.to_datetime(df["date"], errors="coerce"))
+    elif isinstance(df.index, pd.DatetimeIndex):
+        idx = df.index
+    else:
+        raise ValueError("update_frame needs a 'date' column or a DatetimeIndex")
+    s = pd.Series(pd.to_numeric(df[price_col], errors="coerce").to_numpy(), index=idx)
+    s = s[s.index.notna()].sort_index()
+    return s[~s.index.duplicated(keep="last")]
+
+class RiskStream:
+    """Streaming counterpart of risk_scoring.score_from_prices for one symbol.
+
+    Feed closes (and optionally same-bar benchmark closes) with update(); metrics()
+    returns the same keys as score_from_prices. rf is fixed at creation because the
+    downside accumulator depends on the excess-return threshold.
+    """
+    def __init__(self, rf: float = 0.0, freq: str = "D", alpha: float = 0.05):
+        self.rf, self.freq, self.alpha = rf, freq, alpha
+        self.ret = Welford()
+        self.down = Welford()
+        self.co = CoMoment()
+        self.tail = P2Quantile()
+        self.first_price = self.last_price = self.last_bench = None
+        self.n_prices = 0
+        self.eq = 1.0; self.peak = None; self.mdd = np.nan
+        self.last_date = None
+
+    def update(self, price: float, bench_price: float = None, date=None) -> None:
+        if price is None or not np.isfinite(price):
+            if self.last_price is None:
+                return
+            price = self.last_price          # mirrors the ffill in _to_returns
+        if self.last_price is None:
+            self.first_price = self.last_price = float(price); self.n_prices = 1
+        else:
+            r = price / self.last_price - 1.0
+            self.last_price = float(price); self.n_prices += 1
+            self._push_return(r, bench_price)
+        if bench_price is not None and np.isfinite(bench_price):
+            self.last_bench = float(bench_price)
+        if date is not None:
+            self.last_date = str(pd.Timestamp(date))
+
+    def _push_return(self, r: float, bench_price: float = None) -> None:
+        ann = _ann_factor(self.freq)
+        self.ret.push(r)
+        ex = r - self.rf / ann
+        if ex < 0:
+            self.down.push(ex)
+        self.tail.push(r)
+        self.eq *= (1.0 + r)
+        self.peak = self.eq if self.peak is None else max(self.peak, self.eq)
+        dd = self.eq / self.peak - 1.0
+        self.mdd = dd if not np.isfinite(self.mdd) else min(self.mdd, dd)
+        if bench_price is not None and np.isfinite(bench_price) and self.last_bench:
+            self.co.push(r, bench_price / self.last_bench - 1.0)
+
+    def update_frame(self, df: pd.DataFrame, bench: pd.DataFrame = None, price_col: str = "close") -> int:
+        """Feed only the rows newer than last_date; returns rows consumed. Dates come from a
+        `date` column or a DatetimeIndex — without either the new rows cannot be told apart
+        from the ones already consumed, so that raises ValueError."""
+        s = _dated(df, price_col)
+        if self.last_date is not None:
+            s = s[s.index > pd.Timestamp(self.last_date)]
+        b = _dated(bench, price_col).reindex(s.index) if bench is not None and len(bench) else None
+        for i, (dt, px) in enumerate(s.items()):
+            self.update(px, None if b is None else b.iloc[i], date=dt)
+        return len(s)
+
+    def matches(self, df: pd.DataFrame, price_col: str = "close", rtol: float = 1e-6) -> bool:
+        """False when the frame's close on last_date differs from the one consumed, i.e. the
+        history was re-adjusted (split / dividend) or replaced and the state must be rebuilt."""
+        if self.last_date is None or self.last_price is None:
+            return True
+        s = _dated(df, price_col)
+        px = s.get(pd.Timestamp(self.last_date))
+        return px is None or not np.isfinite(px) or abs(px / self.last_price - 1.0) <= rtol
+
+    def metrics(self, weights: dict = None) -> dict:
+        ann = _ann_factor(self.freq)
+        mu_ex = self.ret.mean - self.rf / ann
+        sd = self.ret.std
+        s = (mu_ex / sd) * np.sqrt(ann) if sd and np.isfinite(sd) else np.nan
+        dd_sd = self.down.std
+        so = (mu_ex / dd_sd) * np.sqrt(ann) if dd_sd and np.isfinite(dd_sd) else np.nan
+        b = self.co.beta(); a = np.nan
+        if np.isfinite(b):
+            a = self.co.mean_a * ann - (self.rf + b * (self.co.mean_b * ann - self.rf))
+        vol = sd * np.sqrt(ann) if np.isfinite(sd) else np.nan
+        cg = np.nan
+        if self.n_prices >= 2 and self.first_price and self.first_price > 0:
+            cg = (self.last_price / self.first_price) ** (1.0 / (self.n_prices / ann)) - 1.0
+        es = self.tail.tail_mean(self.alpha) if self.ret.n else np.nan
+        m = {"sharpe": s, "sortino": so, "beta": b, "alpha": a, "vol": vol,
+             "mdd": self.mdd if self.ret.n else np.nan, "cvar": es, "cagr": cg}
+        m["score"] = composite_score(m, weights=weights)
+        return m
+
+    def to_dict(self) -> dict:
+        return {"rf": self.rf, "freq": self.freq, "alpha": self.alpha,
+                "ret": self.ret.to_dict(), "down": self.down.to_dict(), "co": self.co.to_dict(),
+                "tail": self.tail.to_dict(), "first_price": self.first_price, "last_price": self.last_price,
+                "last_bench": self.last_bench, "n_prices": self.n_prices, "eq": self.eq, "peak": self.peak,
+                "mdd": None if not np.isfinite(self.mdd) else self.mdd, "last_date": self.last_date}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RiskStream":
+        o = cls(rf=d.get("rf", 0.0), freq=d.get("freq", "D"), alpha=d.get("alpha", 0.05))
+        o.ret = Welford.from_dict(d["ret"]); o.down = Welford.from_dict(d["down"])
+        o.co = CoMoment.from_dict(d["co"]); o.tail = P2Quantile.from_dict(d["tail"])
+        o.first_price, o.last_price, o.last_bench = d.get("first_price"), d.get("last_price"), d.get("last_bench")
+        o.n_prices, o.eq, o.peak = d.get("n_prices", 0), d.get("eq", 1.0), d.get("peak")
+        o.mdd = d["mdd"] if d.get("mdd") is not None else np.nan
+        o.last_date = d.get("last_date")
+        return o
+
+# ============================ Persistence ============================
+
+def state_path(region: str = None) -> str:
+    """STATE_PATH, or one file per price-store region next to it."""
+    if not region:
+        return STATE_PATH
+    root, ext = os.path.splitext(STATE_PATH)
+    return f"{root}_{region.lower()}{ext}"
+
+def load_states(path: str = STATE_PATH) -> dict:
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return {k: RiskStream.from_dict(v) for k, v in json.load(f).items()}
+    except Exception:
+        pass
+    return {}
+
+def save_states(states: dict, path: str = STATE_PATH) -> str:
+    Path(os.path.dirname(path) or ".").mkdir(parents=True, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({k: v.to_dict() for k, v in states.items()}, f)
+    os.replace(tmp, path)
+    return path
+
+def update_states(states: dict, symbol_to_df: dict, benchmark: pd.DataFrame = None, price_col: str = "close",
+                  rf: float = 0.0, freq: str = "D", errors: dict = None) -> dict:
+    """Advance (or seed) each symbol's stream with the bars it has not seen yet. A stream whose
+    last consumed close no longer matches the history (re-adjusted prices) is rebuilt.
+    A symbol whose frame fails (no dates, bad values, ...) keeps its previous state and is
+    recorded in `errors` ({symbol: message}) while the others go on; only when every symbol
+    fails is that raised (ValueError), so one bad file cannot stop the nightly update."""
+    failed = {}
+    for sym, df in symbol_to_df.items():
+        st = states.get(sym)
+        before = st.to_dict() if st is not None else None
+        try:
+            if st is None or st.rf != rf or st.freq != freq or not st.matches(df, price_col):
+                st = states[sym] = RiskStream(rf=rf, freq=freq)
+            st.update_frame(df, bench=benchmark, price_col=price_col)
+        except Exception as e:
+            failed[sym] = f"{type(e).__name__}: {e}"
+            if before is None:
+                states.pop(sym, None)
+            else:
+                states[sym] = RiskStream.from_dict(before)
+    if errors is not None:
+        errors.update(failed)
+    if failed and len(failed) == len(symbol_to_df):
+        sym, msg = next(iter(failed.items()))
+        raise ValueError(f"risk state update failed for all {len(failed)} symbols (e.g. {sym}: {msg})")
+    return states
+
+def score_states(states: dict, weights: dict = None) -> pd.DataFrame:
+    """Same shape as risk_scoring.batch_score, read straight from the accumulators."""
+    rows = []
+    for sym, st in states.items():
+        m = st.metrics(weights=weights)
+        row = {"symbol": sym}
+        row.update({k: m.get(k) for k in ["score","sharpe","sortino","beta","alpha","vol","mdd","cvar","cagr"]})
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,38 @@
+# src/engine/scan_diagnostics.py
+# Bounded scan diagnostics. Rejections are counted per reason (a plain dict of ints) and
+# only a fixed-size uniform sample of example rows is kept per reason (reservoir
+# sampling), so a job's diagnostics stay the same size whether it scanned 200 symbols
+# or the whole universe. Tables are served one page at a time.
+from __future__ import annotations
+import random
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+SAMPLES_PER_REASON = 20
+
+def reservoir_add(samples: Dict[str, List[dict]], reason: str, seen: int, row: dict,
+                  k: int = SAMPLES_PER_REASON, rng: Optional[random.Random] = None) -> None:
+    """Offer `row` as the `seen`-th example of `reason` (1-based, i.e. the count including
+    this one). Keeps a uniform sample of at most k rows per reason."""
+    bucket = samples.setdefault(reason, [])
+    if len(bucket) < k:
+        bucket.append(row)
+        return
+    j = (rng or random).randrange(max(int(seen), 1))
+    if j < k:
+        bucket[j] = row
+
+def examples_frame(samples: Dict[str, List[dict]], counts: Optional[dict] = None) -> pd.DataFrame:
+    """Flatten the per-reason samples; most frequent reasons first when counts are given."""
+    keys = list(samples)
+    if counts:
+        keys.sort(key=lambda r: -int(counts.get(r, 0)))
+    rows = [{**row, "Reason": r} for r in keys for row in samples[r]]
+    return pd.DataFrame(rows, columns=["Symbol", "Reason"] if not rows else None)
+
+def page(df: pd.DataFrame, number: int, size: int = 50) -> Tuple[pd.DataFrame, int]:
+    """Rows of page `number` (1-based, clamped) and the page count."""
+    size = max(int(size), 1)
+    pages = max((len(df) + size - 1) // size, 1)
+    number = min(max(int(number), 1), pages)
+    return df.iloc[(number - 1) * size: number * size], pages
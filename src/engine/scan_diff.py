@@ -0,0 +1,68 @@
+# src/engine/scan_diff.py
+# Symbol-keyed diff between two scan result tables (usually consecutive snapshots of one
+# preset): which names are new, which dropped out, and which changed label
+# (e.g. "Buy in 2–3 days" -> "Buy Today"). Deltas are exported to data/alerts so
+# queueing and alerting only handle what changed.
+from __future__ import annotations
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Tuple
+import pandas as pd
+
+from src.engine import scan_snapshots
+
+ALERTS_DIR = os.getenv("VEGA_ALERTS_DIR", "data/alerts")
+LABEL_COLS = ("Buy Today", "Side", "Tag", "signal")
+DELTA_COLS = ["Symbol", "change", "field", "before", "after"]
+
+def _keyed(df: Optional[pd.DataFrame], key: str) -> pd.DataFrame:
+    if df is None or df.empty or key not in df.columns:
+        return pd.DataFrame(columns=[key])
+    return df.drop_duplicates(key, keep="first").set_index(key)
+
+def diff_frames(prev: Optional[pd.DataFrame], cur: Optional[pd.DataFrame], key: str = "Symbol",
+                label_cols=LABEL_COLS) -> pd.DataFrame:
+    """-> one row per delta: change in {new, dropped, changed}; for `changed`, field is
+    the label column and before/after its values. New rows come first in `cur` order."""
+    p, c = _keyed(prev, key), _keyed(cur, key)
+    new = c.index[~c.index.isin(p.index)]
+    dropped = p.index[~p.index.isin(c.index)]
+    both = c.index[c.index.isin(p.index)]
+    parts = [pd.DataFrame({"Symbol": new, "change": "new"}),
+             pd.DataFrame({"Symbol": dropped, "change": "dropped"})]
+    for col in label_cols:
+        if col not in p.columns or col not in c.columns or not len(both):
+            continue
+        before, after = p.loc[both, col], c.loc[both, col]
+        moved = ~((before == after) | (before.isna() & after.isna()))
+        if moved.any():
+            parts.append(pd.DataFrame({"Symbol": both[moved.to_numpy()], "change": "changed", "field": col,
+                                       "before": before[moved].to_numpy(), "after": after[moved].to_numpy()}))
+    out = pd.concat([x for x in parts if not x.empty], ignore_index=True) if any(not x.empty for x in parts) else pd.DataFrame()
+    return out.reindex(columns=DELTA_COLS)
+
+def summarize(delta: pd.DataFrame) -> Counter:
+    return Counter(delta["change"]) if delta is not None and not delta.empty else Counter()
+
+def diff_latest(preset: str, version: Optional[str] = None) -> Tuple[pd.DataFrame, dict, dict]:
+    """Delta of a snapshot (default: the latest) against the one before it -> (delta, meta, prev_meta)."""
+    if version is None:
+        cur, meta = scan_snapshots.load_latest(preset)
+    else:
+        cur, meta = scan_snapshots.load_version(preset, version)
+    prev, prev_meta = scan_snapshots.load_previous(preset, meta.get("version"))
+    if not prev_meta:                                # first snapshot: nothing to compare against
+        return pd.DataFrame(columns=DELTA_COLS), meta, prev_meta
+    return diff_frames(prev, cur), meta, prev_meta
+
+def export_delta(delta: pd.DataFrame, preset: str, version: str, alerts_dir: str = ALERTS_DIR) -> Optional[str]:
+    """data/alerts/scan_delta_<preset>_<version>.csv; nothing is written for an empty delta."""
+    if delta is None or delta.empty:
+        return None
+    Path(alerts_dir).mkdir(parents=True, exist_ok=True)
+    path = Path(alerts_dir) / f"scan_delta_{preset}_{version}.csv"
+    tmp = str(path) + ".tmp"
+    delta.assign(preset=preset, version=version).to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    return str(path)
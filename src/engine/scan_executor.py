@@ -0,0 +1,130 @@
+# src/engine/scan_executor.py
+# Pipelined scan executor: fetches are prefetched concurrently (bounded window, optional
+# rate limit) while a second pool evaluates the symbols whose data has arrived. Results
+# are emitted in input order, so "first N matches" and "processed" counts are exactly
+# what the serial loop produced; once the target is reached, everything still queued is
+# cancelled and at most `prefetch` requests beyond the stopping point were ever issued.
+from __future__ import annotations
+import os, threading, time
+from collections import deque
+from concurrent.futures import CancelledError, Future, InvalidStateError, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+FETCH_WORKERS = int(os.getenv("VEGA_FETCH_WORKERS", "8"))
+FETCH_RATE = float(os.getenv("VEGA_FETCH_RATE", "0"))       # requests/second, 0 = unlimited
+
+class RateLimiter:
+    """Token bucket shared by the fetch threads (`rate` calls/second, bursts up to `burst`)."""
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate); self.burst = max(int(burst), 1)
+        self._tokens = float(self.burst); self._t = time.monotonic(); self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._t) * self.rate); self._t = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def run_ordered(items: Iterable, fetch: Callable[[Any], Any], evaluate: Callable[[Any, Any], Tuple[Any, Any]],
+                max_checks: Optional[int] = None, max_results: Optional[int] = None,
+                fetch_workers: int = FETCH_WORKERS, eval_workers: int = 2, prefetch: Optional[int] = None,
+                rate: float = FETCH_RATE, cancel: Optional[threading.Event] = None) -> Iterator[Tuple[Any, Any, Any]]:
+    """Yield (item, row, reason) in input order.
+
+    fetch(item) -> data runs in the I/O pool; evaluate(item, data) -> (row, reason) runs in
+    the compute pool; row is None for a rejected item. Stops after `max_checks` items or
+    `max_results` non-None rows. Exceptions become (None, "fetch_error" / "eval_error").
+    Closing the generator early (break) cancels outstanding work the same way, and so does
+    setting `cancel` (checked while waiting, so a slow fetch doesn't delay the stop).
+    """
+    limiter = RateLimiter(rate, burst=fetch_workers) if rate and rate > 0 else None
+    window = max(int(prefetch or 2 * fetch_workers), 1)
+    source = iter(items)
+    limit = None if max_checks is None else int(max_checks)
+    fetch_pool = ThreadPoolExecutor(max_workers=max(fetch_workers, 1), thread_name_prefix="scan-fetch")
+    eval_pool = ThreadPoolExecutor(max_workers=max(eval_workers, 1), thread_name_prefix="scan-eval")
+    pending: deque = deque()          # (item, fetch_future, result_future) in input order
+    submitted = matches = 0
+    stop = threading.Event()
+
+    def _fetch(item):
+        if stop.is_set():
+            return None
+        if limiter is not None:
+            limiter.acquire()
+        return None if stop.is_set() else fetch(item)
+
+    def _evaluate(item, fut: Future):
+        if fut.exception() is not None:
+            return None, "fetch_error"
+        try:
+            return evaluate(item, fut.result())
+        except Exception:
+            return None, "eval_error"
+
+    def _settle(out: Future, e: Future):
+        try:
+            if e.cancelled():
+                out.cancel()
+            elif e.exception() is not None:              # BaseException (e.g. interrupt) reaches the caller
+                out.set_exception(e.exception())
+            else:
+                out.set_result(e.result())
+        except (InvalidStateError, CancelledError):     # cancelled on stop
+            pass
+
+    def _submit(item):
+        """Fetch in the I/O pool; as soon as the data lands, evaluate in the compute pool."""
+        out: Future = Future()
+        def _landed(f: Future):
+            if stop.is_set() or f.cancelled():
+                out.cancel(); return
+            try:
+                eval_pool.submit(_evaluate, item, f).add_done_callback(lambda e: _settle(out, e))
+            except RuntimeError:                         # pool already shut down
+                out.cancel()
+        f = fetch_pool.submit(_fetch, item)
+        f.add_done_callback(_landed)
+        return f, out
+
+    def _top_up():
+        nonlocal submitted
+        while len(pending) < window and (limit is None or submitted < limit):
+            try:
+                item = next(source)
+            except StopIteration:
+                return
+            pending.append((item, *_submit(item))); submitted += 1
+
+    try:
+        _top_up()
+        while pending:
+            item, _, out = pending[0]
+            while True:
+                if cancel is not None and cancel.is_set():
+                    return
+                try:
+                    row, reason = out.result(timeout=0.2 if cancel is not None else None)
+                    break
+                except FutureTimeout:
+                    continue
+            pending.popleft()
+            yield item, row, reason
+            if row is not None:
+                matches += 1
+                if max_results is not None and matches >= int(max_results):
+                    break
+            _top_up()
+    finally:
+        stop.set()
+        for _, f, out in pending:
+            f.cancel(); out.cancel()
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        eval_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,109 @@
+# src/engine/scan_jobs.py
+# Resumable universe scans. A job is one scan definition (kind + parameters + universe)
+# with a persisted cursor in data/vega/scan_jobs/<id>.json: the next symbol index,
+# partial results, reason counters and recent fail examples. Running a job advances
+# the cursor by N symbols and checkpoints every few symbols, so a rerun or timeout
+# resumes where it stopped and "extend by N" never redoes symbols already scanned.
+# Fail examples are a bounded sample per reason (src/engine/scan_diagnostics.py), so a
+# job file stays small however much of the universe it has covered.
+from __future__ import annotations
+import hashlib, json, os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from src.engine.scan_executor import run_ordered
+from src.engine.scan_diagnostics import reservoir_add, SAMPLES_PER_REASON
+
+JOB_DIR = os.getenv("VEGA_SCAN_JOB_DIR", "data/vega/scan_jobs")
+
+def job_id(kind: str, params: dict, universe: Sequence[str]) -> str:
+    """Stable id: same scan kind, parameters and symbol list -> same job (and cursor)."""
+    h = hashlib.sha1(json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str).encode())
+    h.update("\n".join(map(str, universe)).encode())
+    return f"{kind}_{h.hexdigest()[:12]}"
+
+def job_path(jid: str) -> Path:
+    return Path(JOB_DIR) / f"{jid}.json"
+
+def new_job(jid: str, kind: str, params: dict, universe_size: int, start: int = 0) -> dict:
+    now = datetime.now().isoformat(timespec="seconds")
+    return {"id": jid, "kind": kind, "params": params, "universe_size": int(universe_size),
+            "cursor": int(start), "start": int(start), "processed": 0, "results": [], "reasons": {},
+            "fail_samples": {}, "status": "new", "created": now, "updated": now}
+
+def load_job(jid: str) -> Optional[dict]:
+    try:
+        job = json.loads(job_path(jid).read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if "fail_samples" not in job:                    # jobs saved with the old unbounded fail_rows list
+        job["fail_samples"] = {}
+        for r in job.pop("fail_rows", []):
+            job["fail_samples"].setdefault(r.get("Reason", ""), []).append({"Symbol": r.get("Symbol")})
+        job["fail_samples"] = {k: v[-SAMPLES_PER_REASON:] for k, v in job["fail_samples"].items()}
+    return job
+
+def save_job(job: dict) -> str:
+    p = job_path(job["id"]); p.parent.mkdir(parents=True, exist_ok=True)
+    job["updated"] = datetime.now().isoformat(timespec="seconds")
+    tmp = str(p) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(job, f, default=str)
+    os.replace(tmp, p)
+    return str(p)
+
+def delete_job(jid: str) -> None:
+    try: job_path(jid).unlink()
+    except FileNotFoundError: pass
+
+def load_or_create(kind: str, params: dict, universe: Sequence[str], start: int = 0) -> dict:
+    jid = job_id(kind, params, universe)
+    return load_job(jid) or new_job(jid, kind, params, len(universe), start)
+
+def is_done(job: dict, max_results: Optional[int] = None) -> bool:
+    return job["cursor"] >= job["universe_size"] or (max_results is not None and len(job["results"]) >= int(max_results))
+
+def run_job(job: dict, universe: Sequence[str], fetch: Callable[[Any], Any], evaluate: Callable[[Any, Any], tuple],
+            n: int, max_results: Optional[int] = None, checkpoint_every: int = 25,
+            on_progress: Optional[Callable[[dict], None]] = None, progress_every: int = 5,
+            samples_per_reason: int = SAMPLES_PER_REASON, **executor_kw) -> dict:
+    """Advance `job` by up to `n` symbols from its cursor (fewer when max_results total
+    matches are reached). evaluate(sym, data) -> (row, reason | [reasons]) as in run_ordered.
+    The job is saved every `checkpoint_every` symbols and when the run ends.
+    on_progress(job) is called at the start, on every match, every `progress_every` symbols
+    and at the end, so callers can render partial results. A cancel Event (executor_kw["cancel"]) or
+    an exception raised by on_progress stops the run; the job is saved as paused and
+    resumes from its cursor."""
+    reasons = Counter(job["reasons"])
+    if is_done(job, max_results):
+        job["status"] = "done"; save_job(job)
+        return job
+    todo = list(universe[job["cursor"]:job["cursor"] + max(int(n), 0)])
+    want = None if max_results is None else int(max_results) - len(job["results"])
+    job["status"] = "running"
+    since = shown = 0
+    stream = run_ordered(todo, fetch, evaluate, max_results=want, **executor_kw)
+    try:
+        if on_progress: on_progress(job)
+        for sym, row, why in stream:
+            job["cursor"] += 1; job["processed"] += 1; since += 1; shown += 1
+            if row is not None:
+                job["results"].append(row)
+            else:
+                for r in (why if isinstance(why, list) else [why]):
+                    r = str(r)[:240]; reasons[r] += 1
+                    reservoir_add(job["fail_samples"], r, reasons[r], {"Symbol": sym}, k=samples_per_reason)
+            if since >= checkpoint_every:
+                job["reasons"] = dict(reasons); save_job(job); since = 0
+            if on_progress and (row is not None or shown >= progress_every):
+                job["reasons"] = dict(reasons); shown = 0
+                on_progress(job)
+    finally:
+        stream.close()                                   # cancels in-flight fetches / evaluations
+        job["reasons"] = dict(reasons)
+        job["status"] = "done" if is_done(job, max_results) else "paused"
+        save_job(job)
+    if on_progress: on_progress(job)
+    return job
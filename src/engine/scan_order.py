@@ -0,0 +1,59 @@
+# src/engine/scan_order.py
+# Scan ordering: walk the universe most-relevant-first so a capped run ("Symbols per
+# run", max matches) spends its fetch budget on liquid, active names instead of
+# whatever sorts first alphabetically. Keys come from data that is already cached —
+# the last-day snapshot (src/engine/scan_pipeline.py) or the feature table
+# (src/engine/feature_table.py) — so ordering costs no extra requests.
+from __future__ import annotations
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+STRATEGIES = {
+    "alphabetical":  "Alphabetical",
+    "dollar_volume": "30-day dollar volume",
+    "rvol":          "Last-day RVOL",
+    "market_cap":    "Market cap",
+    "feature_rank":  "Prior-day VST rank (feature table)",
+}
+
+def _keyed(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    if df is None or df.empty:
+        return pd.DataFrame()
+    if "Symbol" in df.columns:
+        df = df.drop_duplicates("Symbol", keep="last").set_index("Symbol")
+    return df.set_axis(df.index.astype(str).str.upper())
+
+def _num(df: pd.DataFrame, col: str) -> pd.Series:
+    return pd.to_numeric(df[col], errors="coerce") if col in df.columns else pd.Series(np.nan, index=df.index)
+
+def sort_key(strategy: str, snapshot: Optional[pd.DataFrame] = None, features: Optional[pd.DataFrame] = None) -> pd.Series:
+    """Score per symbol (higher scans first); empty when the data for `strategy` is missing.
+    The feature table is preferred for dollar volume / RVOL (true 30-day / 20-day averages),
+    the snapshot fills in symbols it lacks."""
+    snap, feat = _keyed(snapshot), _keyed(features)
+    if strategy == "dollar_volume":
+        a = _num(feat, "Close") * _num(feat, "AvgVol30") if not feat.empty else pd.Series(dtype=float)
+        b = _num(snap, "Close") * _num(snap, "AvgVol") if not snap.empty else pd.Series(dtype=float)
+    elif strategy == "rvol":
+        a = _num(feat, "RVOL") if not feat.empty else pd.Series(dtype=float)
+        b = _num(snap, "Volume") / _num(snap, "AvgVol").replace(0, np.nan) if not snap.empty else pd.Series(dtype=float)
+    elif strategy == "market_cap":
+        a, b = pd.Series(dtype=float), (_num(snap, "MarketCap") if not snap.empty else pd.Series(dtype=float))
+    elif strategy == "feature_rank":
+        a, b = (_num(feat, "VST") if not feat.empty else pd.Series(dtype=float)), pd.Series(dtype=float)
+    else:
+        return pd.Series(dtype=float)
+    key = a.dropna()
+    return pd.concat([key, b.dropna().drop(key.index, errors="ignore")])
+
+def order_symbols(symbols: List[str], strategy: str = "alphabetical", snapshot: Optional[pd.DataFrame] = None,
+                  features: Optional[pd.DataFrame] = None) -> List[str]:
+    """Symbols sorted by descending sort_key; ties and symbols without a key keep their input
+    order (unknown ones go last). 'alphabetical' returns the list as given."""
+    key = sort_key(strategy, snapshot, features)
+    if key.empty or not len(symbols):
+        return list(symbols)
+    v = key.reindex([str(s).upper() for s in symbols]).to_numpy(dtype=float)
+    order = np.argsort(np.where(np.isnan(v), np.inf, -v), kind="stable")
+    return [symbols[i] for i in order]
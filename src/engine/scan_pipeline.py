@@ -0,0 +1,95 @@
+# src/engine/scan_pipeline.py
+# Staged scans: a cheap stage 1 on a last-day snapshot (price, volume, average volume,
+# security type) drops illiquid or ineligible symbols in one vector op, so stage 2 only
+# loads history and computes indicators for the survivors.
+#
+# Snapshot sources:
+#   bulk_last_day(token)        one EODHD eod-bulk-last-day call for a whole exchange
+#   local_snapshot(region, ..)  last bars from the local price store (data/eod/<region>/)
+# Either way the snapshot is a DataFrame with Symbol, Close, Volume, AvgVol and
+# (optionally) Type and MarketCap columns.
+from __future__ import annotations
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+EXCLUDE_TYPES = ("ETF", "ETN", "FUND", "PREF", "ADR", "RIGHT", "WARRANT")
+SNAPSHOT_COLS = ["Symbol", "Close", "Volume", "AvgVol", "Type", "MarketCap"]
+
+# ───────────────────── Snapshots
+def bulk_last_day(token: str, exchange: str = "US", timeout: int = 60) -> pd.DataFrame:
+    """EODHD eod-bulk-last-day (extended) -> snapshot. AvgVol is the 50-day average
+    (the closest the bulk feed has to 30 days); empty frame on any failure."""
+    try:
+        import requests
+        r = requests.get(f"https://eodhd.com/api/eod-bulk-last-day/{exchange}",
+                         params={"api_token": token, "fmt": "json", "filter": "extended"}, timeout=timeout)
+        d = r.json() if r.status_code == 200 else []
+    except Exception:
+        d = []
+    df = pd.DataFrame(d)
+    if df.empty or "code" not in df.columns:
+        return pd.DataFrame(columns=SNAPSHOT_COLS)
+    out = pd.DataFrame({
+        "Symbol": df["code"].astype(str).str.upper(),
+        "Close": pd.to_numeric(df.get("close"), errors="coerce"),
+        "Volume": pd.to_numeric(df.get("volume"), errors="coerce"),
+        "AvgVol": pd.to_numeric(df.get("avgvol_50d", df.get("avgvol_14d")), errors="coerce"),
+        "MarketCap": pd.to_numeric(df.get("MarketCapitalization", pd.Series(np.nan, index=df.index)), errors="coerce"),
+    })
+    out["Type"] = df["type"].astype(str) if "type" in df.columns else ""
+    return out.reindex(columns=SNAPSHOT_COLS).drop_duplicates("Symbol", keep="last").reset_index(drop=True)
+
+def local_snapshot(region: str, symbols: Optional[Iterable[str]] = None, window: int = 30) -> pd.DataFrame:
+    """Last close / volume and `window`-bar average volume per symbol. Served from the
+    feature table (src/engine/feature_table.py) when it has the symbol and a matching
+    AvgVol column; the rest are read from the price store."""
+    from src.engine import price_store, feature_table
+    syms = list(symbols) if symbols is not None else price_store.list_symbols(region)
+    table = feature_table.features(region, syms) if f"AvgVol{window}" in feature_table.FEATURE_COLS else pd.DataFrame()
+    rows = []
+    if not table.empty:
+        rows = [{"Symbol": s, "Close": r["Close"], "Volume": r["Volume"], "AvgVol": r[f"AvgVol{window}"], "Type": ""}
+                for s, r in table.iterrows()]
+        syms = [s for s in syms if str(s).upper() not in table.index]
+    for sym in syms:
+        df = price_store.load_bars(sym, region)
+        if df.empty or "volume" not in df.columns:
+            continue
+        v = pd.to_numeric(df["volume"], errors="coerce").tail(window)
+        rows.append({"Symbol": str(sym).upper(), "Close": float(df["close"].iloc[-1]), "Volume": float(v.iloc[-1]),
+                     "AvgVol": float(v.mean()) if len(v) >= window else np.nan, "Type": ""})
+    return pd.DataFrame(rows, columns=SNAPSHOT_COLS)
+
+# ───────────────────── Stage 1
+def stage1_mask(snapshot: pd.DataFrame, min_avg_volume: float = 100_000, min_price: Optional[float] = None,
+                exclude_types=EXCLUDE_TYPES, slack: float = 1.0) -> Tuple[np.ndarray, np.ndarray]:
+    """-> (keep mask, reason per row or ''). `slack` < 1 loosens the volume floor when the
+    snapshot average is only a proxy for the stage-2 measure (e.g. 50D vs 30D)."""
+    n = len(snapshot)
+    reason = np.full(n, "", dtype=object)
+    if "Type" in snapshot.columns and exclude_types:
+        bad_type = snapshot["Type"].astype(str).str.upper().str.contains("|".join(exclude_types), na=False).to_numpy()
+        reason[bad_type] = "type_excluded"
+    avg = pd.to_numeric(snapshot.get("AvgVol"), errors="coerce").to_numpy(dtype=float) if "AvgVol" in snapshot else np.full(n, np.nan)
+    # unknown averages pass through to stage 2; only a known-low average is dropped
+    illiquid = ~np.isnan(avg) & (avg < float(min_avg_volume) * float(slack))
+    reason[(reason == "") & illiquid] = "liquidity_avg30_floor"
+    if min_price is not None and "Close" in snapshot.columns:
+        px = pd.to_numeric(snapshot["Close"], errors="coerce").to_numpy(dtype=float)
+        reason[(reason == "") & ~np.isnan(px) & (px < float(min_price))] = "price_floor"
+    return reason == "", reason
+
+def prefilter(symbols: List[str], snapshot: pd.DataFrame, **kw) -> Tuple[List[str], Counter]:
+    """Survivors of stage 1 in the original symbol order, plus drop counts by reason.
+    Symbols missing from the snapshot are kept (stage 2 decides)."""
+    if snapshot is None or snapshot.empty:
+        return list(symbols), Counter()
+    keep, reason = stage1_mask(snapshot, **kw)
+    dropped = pd.Series(reason[~keep], index=snapshot["Symbol"].astype(str).str.upper().to_numpy()[~keep])
+    dropped = dropped[~dropped.index.duplicated(keep="last")]
+    syms = pd.Index([str(s).upper() for s in symbols])
+    hit = syms.isin(dropped.index)
+    counts = Counter(dropped.reindex(syms[hit]).tolist())
+    return [s for s, h in zip(symbols, hit) if not h], counts
@@ -0,0 +1,133 @@
+# src/engine/scan_presets.py
+# Named scan presets evaluated over a whole universe from local bars.
+# One pass per symbol computes indicators once and evaluates every requested preset,
+# so the background job (tools/scan_presets_job.py) can refresh all of them after EOD.
+from __future__ import annotations
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import pandas as pd
+
+from src.engine.scan_rules import (compute_indicators, gate_long_minimal, gate_short_minimal, decide_buy_today,
+                                   tag_long, tag_short, tag_momentum)
+from src.engine.vector_metrics import compute_from_df as vector_scores, score_rv
+from src.scanner.patterns import best_wedge
+
+MIN_AVG30_VOLUME = 100_000
+
+PRESETS = {
+    "long_a":        {"label": "A — Long (Smart Money)",  "kind": "ab",  "is_long": True},
+    "short_b":       {"label": "B — Short (Smart Money)", "kind": "ab",  "is_long": False},
+    "long_stock":    {"label": "Long Stock",              "kind": "tag", "tag": tag_long},
+    "short_stock":   {"label": "Short Stock",             "kind": "tag", "tag": tag_short},
+    "high_momentum": {"label": "High Momentum Stock",     "kind": "tag", "tag": tag_momentum},
+    "rising_wedge":  {"label": "Rising Wedge",            "kind": "wedge", "rising": True},
+    "falling_wedge": {"label": "Falling Wedge",           "kind": "wedge", "rising": False},
+}
+LABEL_TO_PRESET = {v["label"]: k for k, v in PRESETS.items()}
+
+SmCheck = Callable[[str, bool], Tuple[bool, list]]      # (symbol, is_long) -> (ok, reasons)
+
+# ───────────────────── Per-preset evaluation (one symbol, indicators already computed)
+def _eval_ab(sym: str, ind: pd.DataFrame, is_long: bool, sm_check: Optional[SmCheck],
+             min_avg_volume: float = MIN_AVG30_VOLUME):
+    if ind.empty or len(ind) < 60: return None, "data_insufficient"
+    row = ind.iloc[-1]
+    avg30 = float(row.get("AvgVol30") or 0.0)
+    if avg30 < min_avg_volume: return None, "liquidity_avg30_floor"
+    if not (gate_long_minimal(row) if is_long else gate_short_minimal(row)):
+        return None, "long_setup_min_fail" if is_long else "short_setup_min_fail"
+    if sm_check is not None:
+        ok, reasons = sm_check(sym, is_long)
+        if not ok: return None, (reasons[0] if reasons else "smart_money_fail")
+    vm = vector_scores(ind)
+    rt, rs, ci = vm["RT"], vm["RS"], vm["CI"]
+    rv = score_rv(float(row["Close"]))            # no fundamentals offline → neutral RV
+    vst = round(float(0.4*rt + 0.3*rv + 0.3*rs), 3)
+    label, entry, stop = decide_buy_today(row, is_long, rt, vst)
+    if label == "Wait": return None, "buy_logic_wait"
+    prev = ind["Close"].iloc[-2] if len(ind) >= 2 else row["Close"]
+    return {
+        "Symbol": sym.upper(),
+        "TV": f"https://www.tradingview.com/chart/?symbol={sym.upper()}",
+        "Side": "LONG" if is_long else "SHORT",
+        "Sector": "",
+        "% PRC": round(float((row["Close"]/prev - 1.0)*100.0), 2),
+        "RS": round(float(rs), 3), "RT": round(float(rt), 3),
+        "VST": round(float(vst), 3), "CI": round(float(ci), 3),
+        "AvgVol30": int(avg30), "Buy Today": label,
+        "$ Change (D)": round(float(row["Close"] - prev), 4), "Stop": round(float(stop), 4),
+    }, None
+
+def _scanner_row(sym: str, row: pd.Series, sc: float, label: str) -> dict:
+    return {
+        "Symbol": sym.upper(),
+        "Close": round(float(row["Close"]), 4),
+        "EMA20": round(float(row["EMA20"]), 4),
+        "EMA50": round(float(row["EMA50"]), 4),
+        "EMA200": round(float(row["EMA200"]), 4),
+        "RSI14": round(float(row["RSI14"]), 2),
+        "ATR14": round(float(row["ATR14"]), 4),
+        "Vol": int(row["Volume"]),
+        "AvgVol20": int(row["AvgVol20"]) if pd.notna(row["AvgVol20"]) else 0,
+        "High20": round(float(row["High20"]), 4),
+        "Low20": round(float(row["Low20"]), 4),
+        "Score": round(float(sc), 4),
+        "Tag": label,
+    }
+
+def _eval_tag(sym: str, ind: pd.DataFrame, preset: dict):
+    if ind.empty or len(ind) < 120: return None, "data_insufficient"
+    row = ind.iloc[-1]
+    tag = preset["tag"]
+    if not tag(row): return None, "setup_fail"
+    sc = float(100 - row.get("RSI14", 0)) if tag is tag_short else float(row.get("RSI14", 0))
+    return _scanner_row(sym, row, sc, preset["label"]), None
+
+def _eval_wedge(sym: str, ind: pd.DataFrame, preset: dict):
+    if ind.empty or len(ind) < 120: return None, "data_insufficient"
+    w = best_wedge(ind, preset["label"])
+    if w is None: return None, "no_wedge"
+    return _scanner_row(sym, ind.iloc[-1], w["score"], preset["label"]), None
+
+def evaluate(preset_key: str, sym: str, ind: pd.DataFrame, sm_check: Optional[SmCheck] = None,
+             min_avg_volume: float = MIN_AVG30_VOLUME):
+    """-> (row dict or None, reason or None) for one preset on one indicator frame."""
+    p = PRESETS[preset_key]
+    if p["kind"] == "ab":
+        return _eval_ab(sym, ind, p["is_long"], sm_check, min_avg_volume)
+    if p["kind"] == "tag":
+        return _eval_tag(sym, ind, p)
+    return _eval_wedge(sym, ind, p)
+
+# ───────────────────── Ranking
+def rank(preset_key: str, df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    if PRESETS[preset_key]["kind"] == "ab":
+        by = [c for c in ["VST","RS","RT","Symbol"] if c in df.columns]; asc = [False,False,False,True][:len(by)]
+    else:
+        by, asc = ["Score","RSI14"], [False, False]
+    return df.sort_values(by=by, ascending=asc).reset_index(drop=True)
+
+# ───────────────────── Universe run
+def run_presets(frames: Iterable[Tuple[str, pd.DataFrame]], presets=None, lookback: int = 420,
+                sm_check: Optional[SmCheck] = None, min_avg_volume: float = MIN_AVG30_VOLUME) -> Dict[str, dict]:
+    """frames: iterable of (symbol, Title-case OHLCV frame). Indicators are computed once per
+    symbol on its full history and the last `lookback` bars are evaluated by every preset.
+    Returns {preset: {"results": ranked DataFrame, "reasons": Counter, "processed": int}}."""
+    keys = list(presets or PRESETS.keys())
+    rows = {k: [] for k in keys}; reasons = {k: Counter() for k in keys}; processed = 0
+    for sym, df in frames:
+        processed += 1
+        try:
+            ind = compute_indicators(df).tail(max(int(lookback), 60)) if df is not None and not df.empty else pd.DataFrame()
+        except Exception:
+            ind = pd.DataFrame()
+        for k in keys:
+            try:
+                row, why = evaluate(k, sym, ind, sm_check if PRESETS[k]["kind"] == "ab" else None, min_avg_volume)
+            except Exception:
+                row, why = None, "eval_error"
+            if row is None: reasons[k][why] += 1
+            else: rows[k].append(row)
+    return {k: {"results": rank(k, pd.DataFrame(rows[k])), "reasons": reasons[k], "processed": processed} for k in keys}
@@ -0,0 +1,74 @@
+# src/engine/scan_rules.py
+# Indicators and setup gates shared by the USA scanners, the preset job and the
+# region dashboards. Frames use Title-case OHLCV columns (Open/High/Low/Close/Volume)
+# plus a `date` column, i.e. the shape returned by the pages' EODHD fetchers.
+from __future__ import annotations
+from typing import Tuple
+import numpy as np
+import pandas as pd
+
+# ───────────────────── Frames
+def to_title(df: pd.DataFrame) -> pd.DataFrame:
+    """price_store frames (lower-case columns) -> scanner frames (Title-case OHLCV, `date`)."""
+    m = {c: c.title() for c in df.columns if str(c).lower() in ("open", "high", "low", "close", "volume")}
+    m.update({c: "date" for c in df.columns if str(c).lower() == "date"})
+    out = df.rename(columns=m)
+    if "date" not in out.columns and isinstance(out.index, pd.DatetimeIndex):
+        out = out.rename_axis("date").reset_index()
+    return out
+
+# ───────────────────── Indicators
+ema = lambda s, n: s.ewm(span=n, adjust=False).mean()
+
+def rsi(s: pd.Series, n: int = 14) -> pd.Series:
+    d = s.diff(); up = np.where(d > 0, d, 0.0); dn = np.where(d < 0, -d, 0.0)
+    rs = pd.Series(up).rolling(n).mean() / pd.Series(dn).rolling(n).mean().replace(0, np.nan)
+    return pd.Series((100 - (100 / (1 + rs))).to_numpy(), index=s.index)
+
+def atr(df: pd.DataFrame, n: int = 14) -> pd.Series:
+    tr = pd.concat([(df["High"] - df["Low"]).abs(),
+                    (df["High"] - df["Close"].shift()).abs(),
+                    (df["Low"] - df["Close"].shift()).abs()], axis=1).max(axis=1)
+    return tr.rolling(n).mean()
+
+def compute_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    o = df.copy()
+    o["EMA20"], o["EMA50"], o["EMA200"] = ema(o["Close"], 20), ema(o["Close"], 50), ema(o["Close"], 200)
+    o["RSI14"], o["ATR14"] = rsi(o["Close"], 14), atr(o, 14)
+    o["AvgVol20"], o["AvgVol30"] = o["Volume"].rolling(20).mean(), o["Volume"].rolling(30).mean()
+    o["High20"], o["Low20"] = o["High"].rolling(20).max(), o["Low"].rolling(20).min()
+    return o
+
+# ───────────────────── A/B setup gates (USA Text Dashboard)
+compute_stop = lambda row: round(float(row["EMA50"] - 2.0 * row["ATR14"]), 4)
+
+def gate_long_minimal(r: pd.Series) -> bool:
+    return bool(((r["EMA20"] >= r["EMA50"]) or (r["Close"] >= r["EMA20"])) and r["RSI14"] >= 40)
+
+def gate_short_minimal(r: pd.Series) -> bool:
+    return bool(((r["EMA20"] <= r["EMA50"]) or (r["Close"] <= r["EMA20"])) and r["RSI14"] <= 60)
+
+def decide_buy_today(row: pd.Series, is_long: bool, rt: float, vst: float) -> Tuple[str, float, float]:
+    if is_long:
+        ok_now = (row["EMA20"] >= row["EMA50"]) and (row["RSI14"] >= 50) and (row["Close"] >= 0.97 * (row["High20"] or row["Close"]))
+        almost = (row["EMA20"] >= row["EMA50"]) and (row["RSI14"] >= 45)
+    else:
+        ok_now = (row["EMA20"] <= row["EMA50"]) and (row["RSI14"] <= 50) and (row["Close"] <= 1.03 * (row["Low20"] or row["Close"]))
+        almost = (row["EMA20"] <= row["EMA50"]) and (row["RSI14"] <= 55)
+    entry = float(row["Close"]); stop = compute_stop(row)
+    if ok_now and rt >= 1.0 and vst >= 0.9: return ("Buy Today", entry, stop)
+    if almost and rt >= 0.9 and vst >= 0.85: return ("Buy in 2–3 days", entry, stop)
+    return ("Wait", entry, stop)
+
+# ───────────────────── Strategy taggers (USA Scanner)
+def tag_long(row) -> bool:
+    return bool(row["EMA20"] > row["EMA50"] > row["EMA200"] and row["Close"] > row["EMA20"] and row["RSI14"] >= 50)
+
+def tag_short(row) -> bool:
+    return bool(row["EMA20"] < row["EMA50"] < row["EMA200"] and row["Close"] < row["EMA20"] and row["RSI14"] <= 50)
+
+def tag_momentum(row, avg_col: str = "AvgVol20") -> bool:
+    return bool(row["EMA20"] > row["EMA50"] > row["EMA200"]
+                and row["RSI14"] >= 60
+                and row["Close"] >= 0.98 * (row["High20"] or row["Close"])
+                and row["Volume"] >= 1.2 * (row[avg_col] or 1))
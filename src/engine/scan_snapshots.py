@@ -0,0 +1,76 @@
+# src/engine/scan_snapshots.py
+# Versioned scan snapshots: data/vega/scans/<preset>/<YYYYmmdd_HHMMSS>.csv + .json meta.
+# The meta file records when the scan ran, the parameters, how many symbols were
+# processed and the rejection-reason counts, so pages can show a precomputed result
+# (and its diagnostics) without re-running the scan.
+from __future__ import annotations
+import json, os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+import pandas as pd
+
+SCAN_ROOT = os.getenv("VEGA_SCAN_ROOT", "data/vega/scans")
+KEEP_LAST = int(os.getenv("VEGA_SCAN_KEEP", "30"))
+
+def preset_dir(preset: str) -> Path:
+    return Path(SCAN_ROOT) / preset
+
+def _atomic_write(path: Path, write) -> None:
+    tmp = str(path) + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def list_versions(preset: str) -> list:
+    """Snapshot versions of a preset, newest first."""
+    d = preset_dir(preset)
+    return sorted((p.stem for p in d.glob("*.csv")), reverse=True) if d.exists() else []
+
+def save_snapshot(preset: str, df: pd.DataFrame, reasons=None, processed: int = None, params: dict = None,
+                  keep_last: int = KEEP_LAST) -> str:
+    """Write one snapshot version and prune to the newest `keep_last`. Returns the version id."""
+    d = preset_dir(preset); d.mkdir(parents=True, exist_ok=True)
+    version = datetime.now().strftime("%Y%m%d_%H%M%S")
+    n = 1
+    while (d / f"{version}.csv").exists():          # two runs within the same second
+        version = f"{version.split('-')[0]}-{n}"; n += 1
+    meta = {
+        "preset": preset, "version": version, "created": datetime.now().isoformat(timespec="seconds"),
+        "rows": int(len(df)), "processed": processed,
+        "reasons": dict(Counter(reasons or {})), "params": params or {},
+    }
+    # data first, meta second: a version is only listed once its csv exists, and load
+    # tolerates a missing meta file
+    _atomic_write(d / f"{version}.csv", lambda p: df.to_csv(p, index=False))
+    _atomic_write(d / f"{version}.json", lambda p: Path(p).write_text(json.dumps(meta, indent=2), encoding="utf-8"))
+    for old in list_versions(preset)[max(int(keep_last), 1):]:
+        for ext in (".csv", ".json"):
+            try: (d / f"{old}{ext}").unlink()
+            except FileNotFoundError: pass
+    return version
+
+def load_version(preset: str, version: str) -> Tuple[pd.DataFrame, dict]:
+    d = preset_dir(preset)
+    try:
+        df = pd.read_csv(d / f"{version}.csv")
+    except Exception:                                # missing file, or a run with no matches
+        df = pd.DataFrame()
+    try:
+        meta = json.loads((d / f"{version}.json").read_text(encoding="utf-8"))
+    except Exception:
+        meta = {"preset": preset, "version": version}
+    return df, meta
+
+def load_latest(preset: str) -> Tuple[pd.DataFrame, dict]:
+    """(results, meta) of the newest snapshot; (empty frame, {}) when none exists."""
+    versions = list_versions(preset)
+    return load_version(preset, versions[0]) if versions else (pd.DataFrame(), {})
+
+def load_previous(preset: str, version: Optional[str] = None) -> Tuple[pd.DataFrame, dict]:
+    """Snapshot right before `version` (or before the latest one)."""
+    versions = list_versions(preset)
+    if version is None:
+        return load_version(preset, versions[1]) if len(versions) > 1 else (pd.DataFrame(), {})
+    older = [v for v in versions if v < version]
+    return load_version(preset, older[0]) if older else (pd.DataFrame(), {})
@@ -2,7 +2,9 @@
 from __future__ import annotations
 import math
 from typing import Iterable, List, Dict, Any
+import numpy as np
 import pandas as pd
+from src.engine.compact import maybe_compact
 
 MIN_ABS_VOLUME = 100_000  # hard floor
 MIN_RVOL = 1.0            # hard floor
@@ -24,87 +26,189 @@ def _calc_rvol(df: pd.DataFrame) -> pd.Series:
             break
     if vol is None or avg is None:
         # If we cannot compute, return NaNs so filter drops them.
-        return pd.Series([math.nan] * len(df), index=df.index)
-    with pd.option_context("mode.use_inf_as_na", True):
-        return (vol.astype(float) / avg.astype(float)).replace([math.inf, -math.inf], pd.NA)
+        return pd.Series(math.nan, index=df.index, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (vol.astype(float) / avg.astype(float)).replace([math.inf, -math.inf], np.nan)
 
-def find_matches_from_zero(
-    universe: Iterable[Dict[str, Any]] | pd.DataFrame,
-    *,
-    apply_smart_money_prefilter: bool = True,
-    hard_cap_symbols_to_process: int | None = None,
-    max_matches_to_return: int = 150,
-    start_offset_in_symbol_list: int = 0,
-) -> pd.DataFrame:
-    """
-    Accepts either a list of dicts or a DataFrame with at least:
-    'Symbol' (or 'symbol'), 'Sector' (optional), 'Volume', '30D Volume' (or alias columns).
-    Returns a filtered & sorted DataFrame with RVOL and hard floors applied.
-
-    NOTE: We DO NOT stop at 'A*'—we iterate the entire (sliced) universe.
-    """
-    # Normalize to DataFrame
-    if isinstance(universe, pd.DataFrame):
-        df = universe.copy()
-    else:
-        df = pd.DataFrame(list(universe))
-
-    # Normalize column names we rely on
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     colmap = {}
     if "symbol" in df.columns and "Symbol" not in df.columns:
         colmap["symbol"] = "Symbol"
     if "sector" in df.columns and "Sector" not in df.columns:
         colmap["sector"] = "Sector"
-    df = df.rename(columns=colmap)
-
-    # Enforce offset & hard cap on the raw universe *before* filtering
-    if start_offset_in_symbol_list and start_offset_in_symbol_list > 0:
-        df = df.iloc[start_offset_in_symbol_list:].reset_index(drop=True)
-    if hard_cap_symbols_to_process and hard_cap_symbols_to_process > 0:
-        df = df.iloc[:hard_cap_symbols_to_process].reset_index(drop=True)
+    return df.rename(columns=colmap) if colmap else df
 
-    # Compute RVOL
-    df["RVOL"] = _calc_rvol(df)
+def _filter_rows(df: pd.DataFrame, positions: np.ndarray, apply_smart_money_prefilter: bool) -> pd.DataFrame:
+    """Rows of df passing the hard floors (and the metric prefilter), copied, indexed by
+    their position in the sliced universe and carrying RVOL. Only survivors are copied."""
+    rvol = _calc_rvol(df)
 
     # Apply hard floors
     vol_col = "Volume" if "Volume" in df.columns else ("volume" if "volume" in df.columns else None)
     if vol_col is None:
         # If we cannot verify volume, drop everything to avoid bad signals
-        return df.iloc[0:0]
+        return df.iloc[0:0].assign(RVOL=rvol.iloc[0:0]).reset_index(drop=True)
 
     mask = (
         (df[vol_col].fillna(0).astype(float) >= MIN_ABS_VOLUME) &
-        (df["RVOL"].astype(float) >= MIN_RVOL)
+        (rvol.astype(float) >= MIN_RVOL)
     )
 
     # Optional “Smart Money” prefilter: keep only rows that have all the
     # core metric columns (prevents empty/zeroed lines from slipping in).
+    core_cols = ["RS", "RT", "VST"]
     if apply_smart_money_prefilter:
-        core_cols = ["RS", "RT", "VST"]
-        for c in core_cols:
-            if c not in df.columns:
-                df[c] = pd.NA
-        mask &= df[core_cols].notna().all(axis=1)
+        present = [c for c in core_cols if c in df.columns]
+        mask &= df[present].notna().all(axis=1) if len(present) == len(core_cols) else False
 
-    filtered = df.loc[mask].copy()
+    keep = np.flatnonzero(mask.to_numpy(dtype=bool))
+    filtered = df.iloc[keep].copy()
+    filtered.index = pd.Index(positions[keep])
+    filtered["RVOL"] = rvol.to_numpy()[keep]
+    if apply_smart_money_prefilter:
+        for c in core_cols:
+            if c not in filtered.columns:
+                filtered[c] = pd.NA
+    return filtered
 
-    # Stable sort: by highest RVOL then by dollar % change if present, then by symbol
+def _order(filtered: pd.DataFrame) -> pd.DataFrame:
+    # Result order: by Symbol; rows of the same symbol by highest RVOL, then % PRC if present.
+    # (The last stable sort is the primary key.) Ties keep input order, which is what lets
+    # chunked merges reproduce this exactly.
     sort_cols = []
     if "RVOL" in filtered.columns: sort_cols.append(("RVOL", False))
     if "% PRC" in filtered.columns: sort_cols.append(("% PRC", False))
     sort_by = [c for (c, _) in sort_cols]
     ascending = [asc for (_, asc) in sort_cols]
     if sort_by:
-        filtered = filtered.sort_values(by=sort_by, ascending=ascending)
-    filtered = filtered.sort_values(by="Symbol", ascending=True, kind="stable")
+        filtered = filtered.sort_values(by=sort_by, ascending=ascending, kind="stable")
+    return filtered.sort_values(by="Symbol", ascending=True, kind="stable")
+
+# Nice column order if present
+PREFERRED_COLS = ["Symbol", "Sector", "S Change (From Yesterday)", "% PRC", "Value",
+                  "RS", "RT", "VST", "CI", "Stop", "GRT", "EPS", "Volume", "30D Volume", "RVOL"]
+
+def _finish(filtered: pd.DataFrame, compact: bool | None) -> pd.DataFrame:
+    cols = [c for c in PREFERRED_COLS if c in filtered.columns] + \
+           [c for c in filtered.columns if c not in PREFERRED_COLS]
+    return maybe_compact(filtered.loc[:, cols], compact)
+
+def find_matches_from_zero(
+    universe: Iterable[Dict[str, Any]] | pd.DataFrame,
+    *,
+    apply_smart_money_prefilter: bool = True,
+    hard_cap_symbols_to_process: int | None = None,
+    max_matches_to_return: int = 150,
+    start_offset_in_symbol_list: int = 0,
+    compact: bool | None = None,
+) -> pd.DataFrame:
+    """
+    Accepts either a list of dicts or a DataFrame with at least:
+    'Symbol' (or 'symbol'), 'Sector' (optional), 'Volume', '30D Volume' (or alias columns).
+    Returns a filtered & sorted DataFrame with RVOL and hard floors applied.
+
+    NOTE: We DO NOT stop at 'A*'—we iterate the entire (sliced) universe.
+    compact: store the result with compact dtypes (defaults to VEGA_COMPACT_DTYPES).
+    For universes that do not fit in memory use find_matches_streaming.
+    """
+    # Normalize to DataFrame (no copy yet — only the rows that pass the floors are copied)
+    if isinstance(universe, pd.DataFrame):
+        df = universe
+    else:
+        df = pd.DataFrame(list(universe))
+    df = _normalize_columns(df)
+
+    # Enforce offset & hard cap on the raw universe *before* filtering
+    if start_offset_in_symbol_list and start_offset_in_symbol_list > 0:
+        df = df.iloc[start_offset_in_symbol_list:]
+    if hard_cap_symbols_to_process and hard_cap_symbols_to_process > 0:
+        df = df.iloc[:hard_cap_symbols_to_process]
+
+    filtered = _order(_filter_rows(df, np.arange(len(df)), apply_smart_money_prefilter))
 
     # Limit results
     if max_matches_to_return and max_matches_to_return > 0:
         filtered = filtered.head(max_matches_to_return)
+    return _finish(filtered, compact)
 
-    # Nice column order if present
-    preferred = ["Symbol", "Sector", "S Change (From Yesterday)", "% PRC", "Value",
-                 "RS", "RT", "VST", "CI", "Stop", "GRT", "EPS", "Volume", "30D Volume", "RVOL"]
-    cols = [c for c in preferred if c in filtered.columns] + \
-           [c for c in filtered.columns if c not in preferred]
-    return filtered.loc[:, cols]
+# ============================ Streaming mode ============================
+
+def _as_frame(batch) -> pd.DataFrame:
+    """Record batch -> DataFrame: DataFrame, list of dicts, dict of columns, a single
+    record dict, or anything with .to_pandas() (pyarrow RecordBatch / Table)."""
+    if isinstance(batch, pd.DataFrame):
+        return batch
+    if hasattr(batch, "to_pandas"):
+        return batch.to_pandas()
+    if isinstance(batch, dict):
+        cols = list(batch.values())
+        if cols and all(isinstance(v, (list, tuple, np.ndarray, pd.Series)) for v in cols):
+            return pd.DataFrame(batch)
+        return pd.DataFrame([batch])
+    return pd.DataFrame(list(batch))
+
+def iter_batches(records: Iterable[Dict[str, Any]], size: int = 5000):
+    """Group a record iterator into lists of `size` dicts for find_matches_streaming."""
+    buf = []
+    for r in records:
+        buf.append(r)
+        if len(buf) >= size:
+            yield buf; buf = []
+    if buf:
+        yield buf
+
+def find_matches_streaming(
+    batches: Iterable[Any],
+    *,
+    apply_smart_money_prefilter: bool = True,
+    hard_cap_symbols_to_process: int | None = None,
+    max_matches_to_return: int = 150,
+    start_offset_in_symbol_list: int = 0,
+    compact: bool | None = None,
+) -> pd.DataFrame:
+    """
+    find_matches_from_zero over an iterator of record batches (see _as_frame).
+    Each batch is filtered as it arrives and merged into a buffer truncated to the
+    first max_matches_to_return rows of the result order (_order: by Symbol, then RVOL
+    and % PRC), so memory is O(K + batch) for any universe size. Offset and hard cap
+    count rows across batches; iteration stops once the cap is consumed. The result —
+    rows, columns, order and index — is the same as find_matches_from_zero on the
+    concatenated input (tools/check_scanner_streaming.py checks this).
+    """
+    k = max_matches_to_return if max_matches_to_return and max_matches_to_return > 0 else None
+    skip = max(int(start_offset_in_symbol_list or 0), 0)
+    cap = hard_cap_symbols_to_process if hard_cap_symbols_to_process and hard_cap_symbols_to_process > 0 else None
+    seen = 0                     # rows of the sliced universe consumed so far
+    top = None
+    empty = None                 # zero-row frame with every input column, for the no-match layout
+    for batch in batches:
+        df = _normalize_columns(_as_frame(batch))
+        if empty is None:
+            empty = df.iloc[0:0].copy()
+        else:
+            for c in df.columns:
+                if c not in empty.columns:
+                    empty[c] = df[c].iloc[0:0]
+        if skip:
+            drop = min(skip, len(df)); df = df.iloc[drop:]; skip -= drop
+        if cap is not None:
+            df = df.iloc[:max(cap - seen, 0)]
+        if df.empty:
+            if cap is not None and seen >= cap:
+                break
+            continue
+        filtered = _filter_rows(df, np.arange(seen, seen + len(df)), apply_smart_money_prefilter)
+        seen += len(df)
+        if not filtered.empty:
+            # earlier rows first: ties then resolve in input order, exactly as one big sort
+            merged = filtered if top is None else pd.concat([top, filtered])
+            top = _order(merged)
+            if k is not None:
+                top = top.head(k)
+        if cap is not None and seen >= cap:
+            break
+    if top is None:
+        # no match: filter the zero-row input so the layout is what find_matches_from_zero gives
+        empty = empty if empty is not None else pd.DataFrame()
+        top = _filter_rows(empty, np.arange(0), apply_smart_money_prefilter)
+    return _finish(top, compact)
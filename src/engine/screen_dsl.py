@@ -0,0 +1,253 @@
+# src/engine/screen_dsl.py
+# Small screening language compiled to NumPy masks over a latest-bar feature matrix
+# (one row per symbol, one column per feature — e.g. compute_indicators(...).iloc[-1]
+# stacked across the universe, or the feature table).
+#
+#   EMA20 > EMA50 > EMA200 and RSI14 >= 60 and Close >= 0.98*High20
+#   not (RSI14 > 70) or `% PRC` < -3
+#
+# Grammar: or / and / not, chained comparisons (< <= > >= == !=), + - * /, unary minus,
+# parentheses, numbers, column names (backticks for names with spaces or symbols) and
+# abs() / min() / max(). Expressions are parsed once — no eval — into a Screen whose
+# conjuncts run cheapest-first: each one only sees the rows that survived the previous
+# ones, and the order adapts to the selectivity observed on earlier evaluations.
+from __future__ import annotations
+import re
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+class ScreenError(ValueError):
+    pass
+
+# ───────────────────── Built-in screens (the row rules of src/engine/scan_rules.py; a missing
+# High20 / AvgVol20 fails the comparison instead of falling back to Close / 1)
+SCREENS = {
+    "long_stock": "EMA20 > EMA50 > EMA200 and Close > EMA20 and RSI14 >= 50",
+    "short_stock": "EMA20 < EMA50 < EMA200 and Close < EMA20 and RSI14 <= 50",
+    "high_momentum": "EMA20 > EMA50 > EMA200 and RSI14 >= 60 and Close >= 0.98*High20 and Volume >= 1.2*AvgVol20",
+    "long_setup_min": "(EMA20 >= EMA50 or Close >= EMA20) and RSI14 >= 40",
+    "short_setup_min": "(EMA20 <= EMA50 or Close <= EMA20) and RSI14 <= 60",
+}
+
+# ───────────────────── Tokenizer
+_TOKEN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<num>\d+\.\d*(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?|\d+(?:[eE][-+]?\d+)?)
+  | (?P<quoted>`[^`]+`)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+  | (?P<op><=|>=|==|!=|<|>|\+|-|\*|/|\(|\)|,)
+""", re.VERBOSE)
+_KEYWORDS = {"and", "or", "not"}
+_FUNCS = {"abs": (1, np.abs), "min": (2, np.fmin), "max": (2, np.fmax)}
+_CMP = {"<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+        "==": np.equal, "!=": np.not_equal}
+_ARITH = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide}
+
+def tokenize(text: str) -> list:
+    out, pos = [], 0
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise ScreenError(f"Unexpected character {text[pos]!r} at {pos}")
+        kind = m.lastgroup; val = m.group(kind)
+        if kind == "quoted":
+            out.append(("name", val[1:-1], pos))
+        elif kind == "name" and val.lower() in _KEYWORDS:
+            out.append((val.lower(), val.lower(), pos))
+        elif kind != "ws":
+            out.append((kind, val, pos))
+        pos = m.end()
+    out.append(("end", None, pos))
+    return out
+
+# ───────────────────── Parser (recursive descent -> tuples)
+class _Parser:
+    def __init__(self, text: str):
+        self.toks = tokenize(text); self.i = 0
+
+    def peek(self, *vals):
+        kind, val, _ = self.toks[self.i]
+        return (kind in vals or (kind == "op" and val in vals)) if vals else kind
+
+    def take(self, *vals):
+        tok = self.toks[self.i]
+        if vals and not self.peek(*vals):
+            raise ScreenError(f"Expected {' or '.join(vals)} at {tok[2]}, got {tok[1] or 'end of input'!r}")
+        self.i += 1
+        return tok
+
+    def parse(self):
+        node = self.or_()
+        if self.peek() != "end":
+            tok = self.toks[self.i]
+            raise ScreenError(f"Unexpected {tok[1]!r} at {tok[2]}")
+        return node
+
+    def or_(self):
+        parts = [self.and_()]
+        while self.peek("or"):
+            self.take(); parts.append(self.and_())
+        return parts[0] if len(parts) == 1 else ("or", parts)
+
+    def and_(self):
+        parts = [self.not_()]
+        while self.peek("and"):
+            self.take(); parts.append(self.not_())
+        flat = [c for p in parts for c in (p[1] if p[0] == "and" else [p])]    # chained comparisons join the conjuncts
+        return flat[0] if len(flat) == 1 else ("and", flat)
+
+    def not_(self):
+        if self.peek("not"):
+            self.take(); return ("not", self.not_())
+        return self.cmp()
+
+    def cmp(self):
+        operands, ops = [self.sum()], []
+        while self.peek(*_CMP):
+            ops.append(self.take()[1]); operands.append(self.sum())
+        if not ops:
+            return operands[0]
+        pairs = [("cmp", op, a, b) for op, a, b in zip(ops, operands, operands[1:])]
+        return pairs[0] if len(pairs) == 1 else ("and", pairs)      # a < b < c  ==  a < b and b < c
+
+    def sum(self):
+        node = self.term()
+        while self.peek("+", "-"):
+            op = self.take()[1]; node = ("arith", op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek("*", "/"):
+            op = self.take()[1]; node = ("arith", op, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek("-"):
+            self.take(); return ("neg", self.unary())
+        return self.atom()
+
+    def atom(self):
+        kind, val, pos = self.take()
+        if kind == "num":
+            return ("num", float(val))
+        if kind == "op" and val == "(":
+            node = self.or_(); self.take(")"); return node
+        if kind == "name":
+            if self.peek("(") and val.lower() in _FUNCS:
+                self.take("("); args = [self.or_()]
+                while self.peek(","):
+                    self.take(); args.append(self.or_())
+                self.take(")")
+                arity = _FUNCS[val.lower()][0]
+                if len(args) != arity:
+                    raise ScreenError(f"{val}() takes {arity} argument(s) at {pos}")
+                return ("call", val.lower(), args)
+            return ("col", val)
+        raise ScreenError(f"Unexpected {val or 'end of input'!r} at {pos}")
+
+# ───────────────────── Evaluation
+Features = Union[pd.DataFrame, Dict[str, np.ndarray]]
+
+def _columns(node, acc=None) -> set:
+    acc = set() if acc is None else acc
+    if node[0] == "col":
+        acc.add(node[1])
+    for child in node[1:]:
+        if isinstance(child, tuple):
+            _columns(child, acc)
+        elif isinstance(child, list):
+            for c in child: _columns(c, acc)
+    return acc
+
+def _cost(node) -> int:
+    """Static cost estimate used before any selectivity has been observed."""
+    if node[0] in ("num", "col"):
+        return 1
+    kids = [c for c in node[1:] if isinstance(c, tuple)] + [c for x in node[1:] if isinstance(x, list) for c in x]
+    return 1 + sum(_cost(k) for k in kids)
+
+def _value(node, cols: Dict[str, np.ndarray], rows: Optional[np.ndarray]):
+    kind = node[0]
+    if kind == "num":
+        return node[1]
+    if kind == "col":
+        a = cols[node[1]]
+        return a if rows is None else a[rows]
+    if kind == "neg":
+        return -_value(node[1], cols, rows)
+    if kind == "arith":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _ARITH[node[1]](_value(node[2], cols, rows), _value(node[3], cols, rows))
+    if kind == "call":
+        fn = _FUNCS[node[1]][1]
+        return fn(*[_value(a, cols, rows) for a in node[2]])
+    return _mask(node, cols, rows)
+
+def _mask(node, cols, rows) -> np.ndarray:
+    kind = node[0]
+    n = len(next(iter(cols.values()))) if rows is None else len(rows)
+    if kind == "cmp":
+        with np.errstate(invalid="ignore"):
+            out = _CMP[node[1]](_value(node[2], cols, rows), _value(node[3], cols, rows))
+        return np.broadcast_to(np.asarray(out, dtype=bool), (n,))
+    if kind == "not":
+        return ~_mask(node[1], cols, rows)
+    if kind == "and":
+        out = np.ones(n, dtype=bool)
+        for c in node[1]:
+            out &= _mask(c, cols, rows)
+        return out
+    if kind == "or":
+        out = np.zeros(n, dtype=bool)
+        for c in node[1]:
+            out |= _mask(c, cols, rows)
+        return out
+    v = np.asarray(_value(node, cols, rows), dtype=float)               # bare number / column: non-zero
+    return np.broadcast_to(np.nan_to_num(v) != 0, (n,))
+
+class Screen:
+    """A compiled screen. Call with a feature matrix -> boolean mask (one per row)."""
+    def __init__(self, text: str):
+        self.text = text
+        self.tree = _Parser(text).parse()
+        self.conjuncts = list(self.tree[1]) if self.tree[0] == "and" else [self.tree]
+        self.columns = sorted(_columns(self.tree))
+        # observed pass counts per conjunct; order() runs the most selective first
+        self._seen = [0] * len(self.conjuncts); self._passed = [0] * len(self.conjuncts)
+
+    def order(self) -> List[int]:
+        def key(i):
+            rate = self._passed[i] / self._seen[i] if self._seen[i] else 1.0
+            return (rate, _cost(self.conjuncts[i]))
+        return sorted(range(len(self.conjuncts)), key=key)
+
+    def _arrays(self, features: Features) -> Dict[str, np.ndarray]:
+        missing = [c for c in self.columns if c not in features]
+        if missing:
+            raise ScreenError(f"Unknown column(s): {', '.join(missing)}")
+        return {c: pd.to_numeric(pd.Series(np.asarray(features[c])), errors="coerce").to_numpy(dtype=float)
+                for c in self.columns}
+
+    def __call__(self, features: Features) -> np.ndarray:
+        cols = self._arrays(features)
+        n = len(features) if isinstance(features, pd.DataFrame) else (len(next(iter(cols.values()))) if cols else 0)
+        if not cols:
+            return np.broadcast_to(_mask(self.tree, {"_": np.zeros(n)}, None), (n,)).copy()
+        alive = np.arange(n)
+        for i in self.order():
+            if not len(alive):
+                break
+            m = _mask(self.conjuncts[i], cols, alive)
+            self._seen[i] += len(alive); self._passed[i] += int(m.sum())
+            alive = alive[m]
+        out = np.zeros(n, dtype=bool); out[alive] = True
+        return out
+
+    def filter(self, features: pd.DataFrame) -> pd.DataFrame:
+        return features[self(features)]
+
+def compile_screen(text: str) -> Screen:
+    """Parse a screen (or the name of a built-in one from SCREENS) once."""
+    return Screen(SCREENS.get(text, text))
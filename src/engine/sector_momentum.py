@@ -3,6 +3,7 @@ import pandas as pd
 import os, json
 from pathlib import Path
 from datetime import datetime
+from src.engine import trading_calendar as tcal
 
 def _to_returns(df: pd.DataFrame, price_col='close'):
     s = pd.to_numeric(df[price_col], errors='coerce').ffill()
@@ -19,13 +20,27 @@ def _horizon_ret(series: pd.Series, periods: int):
     if series.shape[0] <= periods: return np.nan
     return float(series.iloc[-1] / series.iloc[-periods] - 1.0)
 
-def compute_momentum(asset_df: pd.DataFrame, bench_df: pd.DataFrame, price_col='close'):
-    r_a = _to_returns(asset_df, price_col)
-    r_b = _to_returns(bench_df, price_col) if bench_df is not None else None
-    eq_a = (1 + r_a).cumprod()
+def _on_sessions(df: pd.DataFrame, exchange: str, index: pd.DatetimeIndex = None, price_col='close'):
+    # reindex a dated frame onto the exchange's sessions so rows == sessions
+    px = pd.to_numeric(df[price_col], errors='coerce').to_frame(price_col)
+    return tcal.reindex_panel(px, exchange, index=index)
 
+def compute_momentum(asset_df: pd.DataFrame, bench_df: pd.DataFrame, price_col='close', exchange: str = None):
+    """exchange: when given (and the frames are date-indexed), horizons are counted in that
+    exchange's sessions and the benchmark is aligned to the same session index."""
     horizons = {'1w':5, '1m':21, '3m':63, '6m':126}
-    hvals = {k: _horizon_ret(eq_a, p) for k,p in horizons.items()}
+    dated = isinstance(asset_df.index, pd.DatetimeIndex) and not asset_df.empty
+    if exchange and dated:
+        asset_df = _on_sessions(asset_df, exchange, price_col=price_col)
+        if bench_df is not None and isinstance(bench_df.index, pd.DatetimeIndex):
+            bench_df = _on_sessions(bench_df, exchange, index=asset_df.index, price_col=price_col)
+        hv = tcal.horizon_returns(asset_df[price_col].dropna(), exchange, list(horizons.values()))
+        hvals = {k: float(v) for k, v in zip(horizons, hv)}
+    r_a = _to_returns(asset_df, price_col)
+    r_b = _to_returns(bench_df, price_col) if bench_df is not None else None
+    if not (exchange and dated):
+        eq_a = (1 + r_a).cumprod()
+        hvals = {k: _horizon_ret(eq_a, p) for k,p in horizons.items()}
     rs_val = _rs(r_a, r_b) if r_b is not None else np.nan
 
     w = {'1w':0.2,'1m':0.3,'3m':0.3,'6m':0.2}
@@ -42,7 +57,7 @@ def compute_momentum(asset_df: pd.DataFrame, bench_df: pd.DataFrame, price_col='
         'score': comp
     }
 
-def tiles_from_files(files: list, bench_df: pd.DataFrame = None, price_col='close'):
+def tiles_from_files(files: list, bench_df: pd.DataFrame = None, price_col='close', exchange: str = None):
     rows = []
     for f in files:
         try:
@@ -56,7 +71,7 @@ def tiles_from_files(files: list, bench_df: pd.DataFrame = None, price_col='clos
             name = getattr(f, 'name', 'SECTOR')
             import os as _os
             sym = _os.path.splitext(_os.path.basename(name))[0].upper()
-            metrics = compute_momentum(df, bench_df, price_col=price_col)
+            metrics = compute_momentum(df, bench_df, price_col=price_col, exchange=exchange)
             row = {'sector': sym}
             row.update(metrics)
             rows.append(row)
@@ -1,8 +1,10 @@
 # src/engine/smart_money.py
 from __future__ import annotations
 import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from typing import Iterable, Tuple
 
 DEBUG = os.getenv("VEGA_DEBUG", "0") == "1"
 
@@ -15,7 +17,22 @@ DEFAULTS = {
     "rs_floor": 0.50,
 }
 
-def load_config(path: str = "src/config/smart_money.yaml") -> dict:
+# path -> (mtime_ns, value); config and earnings calendar are re-read only when the file changes
+_FILE_CACHE: dict = {}
+
+def _cached(path: str, loader):
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    hit = _FILE_CACHE.get(path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    value = loader(path)
+    _FILE_CACHE[path] = (mtime, value)
+    return value
+
+def _read_config(path: str) -> dict:
     try:
         import yaml
         if os.path.exists(path):
@@ -26,6 +43,9 @@ def load_config(path: str = "src/config/smart_money.yaml") -> dict:
         pass
     return DEFAULTS.copy()
 
+def load_config(path: str = "src/config/smart_money.yaml") -> dict:
+    return dict(_cached(path, _read_config))
+
 def get_market_inputs(region: str) -> dict:
     presets = {
         "USA":    {"breadth": 0.55, "rs": 0.53, "vol": 1.9},
@@ -52,6 +72,10 @@ def make_light_badge(region: str) -> str:
 
 # ---- Earnings helpers (TZ-safe) ----
 def load_earnings_calendar(path: str = "data/earnings/calendar.csv") -> pd.DataFrame:
+    """Earnings calendar (symbol, date); cached until the file changes — don't mutate."""
+    return _cached(path, _read_earnings)
+
+def _read_earnings(path: str) -> pd.DataFrame:
     if os.path.exists(path):
         try:
             df = pd.read_csv(path)
@@ -84,13 +108,16 @@ def _debug_write(symbol: str, cal: pd.DataFrame, now: pd.Timestamp, future: pd.T
     except Exception as e:
         print(f"[VEGA DEBUG] failed to write diagnostics: {e}")
 
+def _utc_today() -> pd.Timestamp:
+    return pd.Timestamp.now(tz="UTC").tz_localize(None).normalize()  # naive UTC, comparable with the calendar
+
 def within_earnings_window(symbol: str, days: int, cal: pd.DataFrame) -> bool:
     if cal.empty:
         return False
     rows = cal[cal["symbol"].str.upper() == symbol.upper()]
     if rows.empty:
         return False
-    now = pd.Timestamp.utcnow().normalize()  # naive UTC
+    now = _utc_today()
     future = now + pd.Timedelta(days=days)
     try:
         mask = (rows["date"] >= now) & (rows["date"] <= future)
@@ -125,3 +152,46 @@ def passes_rules(symbol: str, region: str, rr_ratio: float = 3.0, pop: float = 0
         reasons.append("Market regime red")
 
     return {"pass": len(reasons) == 0, "reasons": reasons, "status": status}
+
+# ---- Batch gate ----
+# One reason code per symbol (first failing check, in passes_rules order); "" = pass.
+REASON_TEXT = {
+    "earnings_window": "Within {days} days of earnings",
+    "earnings_error": "earnings-window error",
+    "rr_low": "R/R too low",
+    "pop_low": "POP below target",
+    "regime_red": "Market regime red",
+}
+
+def earnings_mask(symbols, days: int, cal: pd.DataFrame) -> np.ndarray:
+    """True where the symbol reports within the next `days` days."""
+    syms = pd.Series(list(symbols), dtype=object).astype(str).str.upper()
+    if cal.empty or not len(syms):
+        return np.zeros(len(syms), dtype=bool)
+    now = _utc_today()
+    d = cal["date"]
+    soon = cal.loc[(d >= now) & (d <= now + pd.Timedelta(days=days)), "symbol"].astype(str).str.upper()
+    return syms.isin(set(soon)).to_numpy()
+
+def passes_rules_batch(symbols: Iterable[str], region: str, rr=3.0, pop=0.60) -> Tuple[np.ndarray, np.ndarray]:
+    """passes_rules for a whole list: config, earnings calendar and regime status are loaded
+    once. rr / pop: scalars or per-symbol arrays. -> (pass mask, reason code per symbol)."""
+    syms = list(symbols)
+    n = len(syms)
+    cfg = load_config()
+    code = np.full(n, "", dtype=object)
+    try:
+        earn = earnings_mask(syms, int(cfg["earnings_lookahead_days"]), load_earnings_calendar())
+    except Exception:
+        earn, code[:] = np.zeros(n, dtype=bool), "earnings_error"
+    code[(code == "") & earn] = "earnings_window"
+    rr = np.broadcast_to(np.asarray(rr, dtype=float), (n,))
+    pop = np.broadcast_to(np.asarray(pop, dtype=float), (n,))
+    code[(code == "") & (rr < float(cfg["min_rr_ratio"]))] = "rr_low"
+    code[(code == "") & (pop < float(cfg["pop_target"]))] = "pop_low"
+    if n and compute_status(region)["light"].startswith("🔴"):
+        code[code == ""] = "regime_red"
+    return code == "", code
+
+def reason_text(code: str, days: int = 30) -> str:
+    return REASON_TEXT.get(code, code).format(days=days) if code else ""
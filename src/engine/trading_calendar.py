@@ -0,0 +1,238 @@
+# src/engine/trading_calendar.py
+# Exchange trading calendars (NYSE, TSX, BMV, BYMA) as precomputed session arrays.
+# Sessions are numpy datetime64[D] arrays built once per exchange, so "N sessions ago",
+# session counts and panel reindexing are searchsorted lookups instead of per-call
+# pandas date arithmetic.
+#
+# Holiday rules cover the regular statutory closures, including Argentina's movable
+# ones (Carnival from Easter, "feriados trasladables" moved to a Monday by rule, decree
+# exceptions and the tourist "puente" days listed per year below). Other one-off
+# closures (national mourning days, ...) can be added per exchange in
+# data/calendars/<EXCHANGE>.csv with a `date` column.
+from __future__ import annotations
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+CAL_DIR = os.getenv("VEGA_CALENDAR_DIR", "data/calendars")
+FIRST_YEAR = 2000
+LAST_YEAR = date.today().year + 2
+
+ALIASES = {
+    "NYSE": "NYSE", "NASDAQ": "NYSE", "US": "NYSE", "USA": "NYSE",
+    "TSX": "TSX", "TO": "TSX", "CA": "TSX", "CANADA": "TSX",
+    "BMV": "BMV", "MX": "BMV", "MEXICO": "BMV",
+    "BYMA": "BYMA", "BA": "BYMA", "BCBA": "BYMA", "LATAM": "BYMA",
+}
+
+# ============================ Date rules ============================
+
+def _easter(y: int) -> date:
+    """Gregorian Easter Sunday (anonymous algorithm)."""
+    a = y % 19; b, c = divmod(y, 100); d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    j, k = divmod(c, 4)
+    m = (a + 11 * h) // 319
+    r = (2 * e + 2 * j - k - h + m + 32) % 7
+    n = (h - m + r + 90) // 25
+    p = (h - m + r + n + 19) % 32
+    return date(y, n, p)
+
+def _nth_weekday(y: int, month: int, weekday: int, n: int) -> date:
+    """n-th `weekday` (Mon=0) of the month; n=-1 for the last one."""
+    if n > 0:
+        d = date(y, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    nxt = date(y + (month == 12), month % 12 + 1, 1)
+    d = nxt - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+def _us_observed(d: date) -> date:
+    return d - timedelta(days=1) if d.weekday() == 5 else d + timedelta(days=1) if d.weekday() == 6 else d
+
+def _roll_forward(days: list) -> list:
+    """Weekend holidays move to the next weekday that is not already a holiday."""
+    out = set()
+    for d in sorted(days):
+        while d.weekday() >= 5 or d in out:
+            d += timedelta(days=1)
+        out.add(d)
+    return sorted(out)
+
+def _nyse(y: int) -> list:
+    e = _easter(y)
+    days = [_nth_weekday(y, 1, 0, 3), _nth_weekday(y, 2, 0, 3), e - timedelta(days=2),
+            _nth_weekday(y, 5, 0, -1), _us_observed(date(y, 7, 4)), _nth_weekday(y, 9, 0, 1),
+            _nth_weekday(y, 11, 3, 4), _us_observed(date(y, 12, 25))]
+    ny = date(y, 1, 1)
+    if ny.weekday() != 5:                 # NYSE does not close Dec 31 for a Saturday New Year
+        days.append(_us_observed(ny))
+    if y >= 2022:
+        days.append(_us_observed(date(y, 6, 19)))
+    return days
+
+def _tsx(y: int) -> list:
+    e = _easter(y)
+    may25 = date(y, 5, 25)
+    victoria = may25 - timedelta(days=(may25.weekday() - 0) % 7 or 7)
+    fixed = _roll_forward([date(y, 1, 1), date(y, 7, 1), date(y, 12, 25), date(y, 12, 26)])
+    days = fixed + [e - timedelta(days=2), victoria, _nth_weekday(y, 8, 0, 1),
+                    _nth_weekday(y, 9, 0, 1), _nth_weekday(y, 10, 0, 2)]
+    if y >= 2008:
+        days.append(_nth_weekday(y, 2, 0, 3))   # Family Day
+    return days
+
+def _bmv(y: int) -> list:
+    e = _easter(y)
+    return [date(y, 1, 1), _nth_weekday(y, 2, 0, 1), _nth_weekday(y, 3, 0, 3),
+            e - timedelta(days=3), e - timedelta(days=2), date(y, 5, 1), date(y, 9, 16),
+            date(y, 11, 2), _nth_weekday(y, 11, 0, 3), date(y, 12, 12), date(y, 12, 25)]
+
+# Argentina: decree dates that differ from the Monday rule, and the "días no laborables con
+# fines turísticos" (puentes) fixed each year by decree. Extend as new decrees are published.
+BYMA_MOVED = {
+    date(2025, 6, 17): date(2025, 6, 16),       # Güemes, Tuesday moved to Monday by decree
+}
+BYMA_PUENTES = {
+    2023: [date(2023, 5, 26), date(2023, 6, 19), date(2023, 10, 13)],
+    2024: [date(2024, 4, 1), date(2024, 6, 21), date(2024, 10, 11)],
+    2025: [date(2025, 5, 2), date(2025, 8, 15), date(2025, 11, 21)],
+    2026: [date(2026, 3, 23), date(2026, 7, 10), date(2026, 12, 7)],
+}
+
+def _ar_monday(d: date, tuesday: bool = True) -> date:
+    """Ley 27.399 trasladables: Tue/Wed -> previous Monday, Thu/Fri -> next Monday
+    (Güemes, ley 27.258, keeps a Tuesday date: tuesday=False)."""
+    if d in BYMA_MOVED:
+        return BYMA_MOVED[d]
+    wd = d.weekday()
+    if wd == 2 or (wd == 1 and tuesday):
+        return d - timedelta(days=wd)
+    if wd in (3, 4):
+        return d + timedelta(days=7 - wd)
+    return d
+
+def _byma(y: int) -> list:
+    e = _easter(y)
+    fixed = [date(y, 1, 1), date(y, 3, 24), date(y, 4, 2), date(y, 5, 1), date(y, 5, 25), date(y, 6, 20),
+             date(y, 7, 9), date(y, 12, 8), date(y, 12, 25)]
+    movable = [_ar_monday(date(y, 6, 17), tuesday=False), _ar_monday(date(y, 8, 17)),
+               _ar_monday(date(y, 10, 12)), _ar_monday(date(y, 11, 20))]
+    return (fixed + movable + BYMA_PUENTES.get(y, [])
+            + [e - timedelta(days=48), e - timedelta(days=47), e - timedelta(days=3), e - timedelta(days=2)])
+
+HOLIDAY_RULES = {"NYSE": _nyse, "TSX": _tsx, "BMV": _bmv, "BYMA": _byma}
+
+# ============================ Session arrays ============================
+
+def canonical(exchange: str) -> str:
+    ex = ALIASES.get(str(exchange).upper().lstrip("."))
+    if ex is None:
+        raise ValueError(f"Unknown exchange: {exchange}")
+    return ex
+
+def _extra_closures(ex: str) -> list:
+    p = os.path.join(CAL_DIR, f"{ex}.csv")
+    if not os.path.exists(p):
+        return []
+    try:
+        d = pd.to_datetime(pd.read_csv(p)["date"], errors="coerce").dropna()
+        return list(d.dt.date)
+    except Exception:
+        return []
+
+@lru_cache(maxsize=None)
+def _sessions(ex: str, y0: int, y1: int) -> np.ndarray:
+    hol = set(_extra_closures(ex))
+    for y in range(y0, y1 + 1):
+        hol.update(HOLIDAY_RULES[ex](y))
+    days = np.arange(np.datetime64(f"{y0}-01-01"), np.datetime64(f"{y1 + 1}-01-01"), dtype="datetime64[D]")
+    weekday = (days.astype("int64") + 3) % 7          # 1970-01-01 was a Thursday
+    mask = weekday < 5
+    if hol:
+        mask &= ~np.isin(days, np.array(sorted(hol), dtype="datetime64[D]"))
+    out = days[mask]
+    out.setflags(write=False)
+    return out
+
+def sessions(exchange: str, start=None, end=None) -> np.ndarray:
+    """All sessions of `exchange` in [start, end] as datetime64[D]."""
+    ex = canonical(exchange)
+    s = _as_days(start)[0] if start is not None else np.datetime64(f"{FIRST_YEAR}-01-01")
+    e = _as_days(end)[0] if end is not None else np.datetime64(f"{LAST_YEAR}-12-31")
+    y0 = min(FIRST_YEAR, int(str(s)[:4])); y1 = max(LAST_YEAR, int(str(e)[:4]))
+    arr = _sessions(ex, y0, y1)
+    return arr[np.searchsorted(arr, s, side="left"):np.searchsorted(arr, e, side="right")]
+
+def _as_days(x) -> np.ndarray:
+    idx = pd.DatetimeIndex(pd.to_datetime(x if np.ndim(x) else [x]))
+    if idx.tz is not None:
+        idx = idx.tz_localize(None)
+    return idx.values.astype("datetime64[D]")
+
+def _full(exchange: str, dates) -> np.ndarray:
+    d = _as_days(dates)
+    lo = min(FIRST_YEAR, int(str(np.min(d))[:4])) if d.size else FIRST_YEAR
+    hi = max(LAST_YEAR, int(str(np.max(d))[:4])) if d.size else LAST_YEAR
+    return _sessions(canonical(exchange), lo, hi)
+
+def is_session(exchange: str, dates) -> np.ndarray:
+    d = _as_days(dates); arr = _full(exchange, d)
+    i = np.clip(np.searchsorted(arr, d), 0, len(arr) - 1)
+    return arr[i] == d
+
+def sessions_ago(exchange: str, dates, n) -> np.ndarray:
+    """Session that is `n` sessions before each date (a non-session date first rolls back
+    to the previous session). Broadcasts over dates and n; NaT when out of range."""
+    d = _as_days(dates); arr = _full(exchange, d)
+    idx = np.searchsorted(arr, d, side="right") - 1 - np.asarray(n)
+    ok = (idx >= 0) & (idx < len(arr))
+    out = arr[np.clip(idx, 0, len(arr) - 1)].copy()
+    return np.where(ok, out, np.datetime64("NaT"))
+
+def session_count(exchange: str, start, end) -> np.ndarray:
+    """Number of sessions in (start, end] — i.e. how many sessions end is after start."""
+    s = _as_days(start); e = _as_days(end); arr = _full(exchange, np.concatenate([s, e]))
+    return np.searchsorted(arr, e, side="right") - np.searchsorted(arr, s, side="right")
+
+def master_index(exchanges, start, end, how: str = "union") -> pd.DatetimeIndex:
+    """Aligned date index across exchanges: union (any market open) or intersection (all open)."""
+    arrs = [sessions(ex, start, end) for ex in exchanges]
+    if not arrs:
+        return pd.DatetimeIndex([])
+    out = arrs[0]
+    for a in arrs[1:]:
+        out = np.union1d(out, a) if how == "union" else np.intersect1d(out, a)
+    return pd.DatetimeIndex(out.astype("datetime64[ns]"), name="date")
+
+def reindex_panel(panel: pd.DataFrame, exchange=None, index: pd.DatetimeIndex = None, ffill: bool = True) -> pd.DataFrame:
+    """Reindex a date-indexed panel onto an exchange's sessions (or a master index),
+    forward-filling closes over the exchange's own missing bars."""
+    if panel is None or panel.empty:
+        return panel
+    if index is None:
+        index = master_index([exchange], panel.index.min(), panel.index.max())
+    src = panel.copy()
+    src.index = pd.DatetimeIndex(src.index).normalize()
+    src = src[~src.index.duplicated(keep="last")]
+    out = src.reindex(src.index.union(index)).sort_index()
+    if ffill:
+        out = out.ffill()
+    return out.reindex(index)
+
+def horizon_returns(series: pd.Series, exchange: str, horizons) -> np.ndarray:
+    """Return of a dated price series over each horizon (in sessions of `exchange`),
+    measured from the series' last date back to the price at-or-before the target session."""
+    s = pd.to_numeric(series, errors="coerce").dropna()
+    if s.empty or not isinstance(s.index, pd.DatetimeIndex):
+        return np.full(len(horizons), np.nan)
+    s = s.sort_index()
+    targets = sessions_ago(exchange, s.index[-1:], np.asarray(horizons))
+    pos = np.searchsorted(s.index.values.astype("datetime64[D]"), targets, side="right") - 1
+    ok = (pos >= 0) & ~np.isnat(targets)
+    base = s.to_numpy()[np.clip(pos, 0, len(s) - 1)]
+    return np.where(ok, s.iloc[-1] / base - 1.0, np.nan)
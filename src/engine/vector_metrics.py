@@ -1,2 +1,157 @@
-def compute_from_df(df):
-    return {"RT":1.05,"RV":1.10,"RS":0.95,"CI":1.00,"VST":1.03}
+# src/engine/vector_metrics.py
+# Vector-style scores (RT / RV / RS / CI / VST) computed for a whole price panel at once.
+# Panel = wide DataFrame of closes (DatetimeIndex rows, one column per symbol).
+# Definitions follow the USA A/B scanner:
+#   RT  = 1 + 0.6*ret(20 bars) + 0.4*ret(60 bars), floored at 0          (needs 60 bars)
+#   RS  = 1 / (15 * stdev of the last 20 daily returns), clipped 0.1..2  (needs 60 bars)
+#   RV  = 1.5 / (PE / growth), clipped 0.1..2; 1.0 without fundamentals
+#   CI  = 1.5 * (0.6*up-week ratio + 0.4*(1 - worst drawdown)) over 13 W-FRI bars, clipped 0.1..1.5
+#   VST = 0.4*RT + 0.3*RV + 0.3*RS
+from __future__ import annotations
+from typing import Optional
+import numpy as np
+import pandas as pd
+from src.engine.compact import ENABLED as COMPACT_DEFAULT, compact_panel
+from src.engine import trading_calendar as tcal
+
+SCORE_COLS = ["RT", "RV", "RS", "CI", "VST"]
+
+# ============================ Panel helpers ============================
+
+def _col(df: pd.DataFrame, name: str) -> Optional[str]:
+    for c in df.columns:
+        if str(c).lower() == name.lower():
+            return c
+    return None
+
+def _dated(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df indexed by its date column (any case) when it has one."""
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df
+    dc = _col(df, "date")
+    if dc is None:
+        return df
+    out = df.copy()
+    out[dc] = pd.to_datetime(out[dc], errors="coerce")
+    return out.dropna(subset=[dc]).sort_values(dc).set_index(dc)
+
+def panel_from_frames(frames: dict, field: str = "close", compact: bool = None) -> pd.DataFrame:
+    """{symbol: OHLCV frame} -> wide panel of one field on the union of dates (float32 when compact)."""
+    cols = {}
+    for sym, df in frames.items():
+        if df is None or df.empty:
+            continue
+        d = _dated(df); c = _col(d, field)
+        if c is not None:
+            cols[sym] = pd.to_numeric(d[c], errors="coerce")
+    if not cols:
+        return pd.DataFrame()
+    panel = pd.concat(cols, axis=1).sort_index()
+    return compact_panel(panel) if (COMPACT_DEFAULT if compact is None else compact) else panel
+
+def right_align(panel: pd.DataFrame) -> np.ndarray:
+    """Push each column's valid values to the bottom (NaN-padded on top), so row -k
+    is the k-th most recent bar of every symbol regardless of gaps or start dates."""
+    a = panel.to_numpy(dtype=float)
+    if a.size == 0:
+        return a
+    order = np.argsort(~np.isnan(a), axis=0, kind="stable")
+    return np.take_along_axis(a, order, axis=0)
+
+# ============================ Scores ============================
+
+def _rt(a: np.ndarray, n: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r4 = a[-1] / a[-20] - 1.0 if len(a) >= 20 else np.zeros(a.shape[1])
+        r12 = a[-1] / a[-60] - 1.0 if len(a) >= 60 else np.zeros(a.shape[1])
+    rt = np.maximum(0.0, 1.0 + 0.6 * r4 + 0.4 * r12)
+    return np.where(n >= 60, np.round(rt, 3), 0.0)
+
+def _rs(a: np.ndarray, n: np.ndarray) -> np.ndarray:
+    if len(a) < 21:
+        return np.zeros(a.shape[1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tail = a[-21:]
+        ret = tail[1:] / tail[:-1] - 1.0
+        vol = np.std(ret, axis=0, ddof=1)
+        vol = np.where(vol == 0, 1e-9, vol)
+        rs = np.clip(1.0 / (vol * 15.0), 0.1, 2.0)
+    return np.where(n >= 60, np.round(rs, 3), 0.0)
+
+def score_rv(price, eps=None, grt=None):
+    """Vectorized RV; scalars in -> scalar out."""
+    scalar = np.isscalar(price)
+    price = np.asarray(price, dtype=float)
+    eps = np.broadcast_to(np.asarray(np.nan if eps is None else eps, dtype=float), price.shape)
+    grt = np.broadcast_to(np.asarray(np.nan if grt is None else grt, dtype=float), price.shape)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pe = price / eps
+        rv = np.clip(1.5 / (pe / np.maximum(grt, 0.01)), 0.1, 2.0)
+    ok = (eps > 0) & np.isfinite(grt) & (pe > 0)
+    out = np.where(ok, np.round(rv, 3), 1.0)
+    return float(out) if scalar else out
+
+def _weekly(panel: pd.DataFrame) -> pd.DataFrame:
+    return panel.resample("W-FRI").last()
+
+def _ci(weekly: Optional[pd.DataFrame], n: np.ndarray) -> np.ndarray:
+    out = np.full(len(n), 0.9)
+    if weekly is None or weekly.empty:
+        return out
+    w = right_align(weekly)
+    nw = (~np.isnan(w)).sum(axis=0)
+    if len(w) < 13:
+        return out
+    last14 = w[-14:] if len(w) >= 14 else np.vstack([np.full((1, w.shape[1]), np.nan), w])
+    up_weeks = (np.diff(last14, axis=0) > 0).sum(axis=0)
+    last13 = last14[1:]
+    peak = np.fmax.accumulate(last13, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dd = np.nanmax((peak - last13) / peak, axis=0) if last13.size else np.zeros(len(n))
+        ci = 0.6 * (up_weeks / 13.0) + 0.4 * (1.0 - dd)
+        ci = np.round(np.clip(ci * 1.5, 0.1, 1.5), 3)
+    return np.where((n >= 65) & (nw >= 13), ci, out)
+
+def compute_panel(close: pd.DataFrame, eps=None, grt=None, weekly: Optional[pd.DataFrame] = None,
+                  exchange: str = None) -> pd.DataFrame:
+    """Scores for every column of a close panel -> DataFrame indexed by symbol.
+
+    eps / grt: optional per-symbol Series (or scalars) for RV.
+    weekly: optional precomputed weekly close panel; resampled from `close` otherwise.
+    exchange: reindex onto that exchange's sessions first, so bar horizons are session
+    horizons even when a symbol is missing bars.
+    """
+    if close is None or close.empty:
+        return pd.DataFrame(columns=SCORE_COLS)
+    close = close.apply(pd.to_numeric, errors="coerce")
+    if exchange and isinstance(close.index, pd.DatetimeIndex):
+        firsts = close.apply(pd.Series.first_valid_index)
+        close = tcal.reindex_panel(close, exchange)
+        # keep each symbol's pre-listing rows empty after the forward fill
+        close = close.where(close.index.values[:, None] >= firsts.reindex(close.columns).values.astype("datetime64[ns]")[None, :])
+    a = right_align(close)
+    n = (~np.isnan(a)).sum(axis=0)
+    rt, rs = _rt(a, n), _rs(a, n)
+    if weekly is None and isinstance(close.index, pd.DatetimeIndex):
+        weekly = _weekly(close)
+    ci = _ci(None if weekly is None else weekly.reindex(columns=close.columns), n)
+    syms = close.columns
+    _align = lambda v: v.reindex(syms).to_numpy(dtype=float) if isinstance(v, pd.Series) else v
+    rv = score_rv(a[-1], _align(eps), _align(grt))
+    vst = np.round(0.4 * rt + 0.3 * rv + 0.3 * rs, 3)
+    return pd.DataFrame({"RT": rt, "RV": rv, "RS": rs, "CI": ci, "VST": vst}, index=pd.Index(syms, name="symbol"))
+
+def compute_from_df(df: pd.DataFrame, eps: float = None, grt: float = None, weekly: pd.DataFrame = None) -> dict:
+    """Single-symbol convenience wrapper: OHLCV frame (any column case) -> score dict.
+    weekly: optional precomputed weekly bars (e.g. price_store.load_bars(..., "W"))."""
+    if df is None or df.empty:
+        return {k: np.nan for k in SCORE_COLS}
+    d = _dated(df); c = _col(d, "close")
+    if c is None:
+        return {k: np.nan for k in SCORE_COLS}
+    wk = None
+    if weekly is not None and not weekly.empty:
+        w = _dated(weekly); wc = _col(w, "close")
+        wk = w[[wc]].rename(columns={wc: "_"}) if wc is not None else None
+    res = compute_panel(d[[c]].rename(columns={c: "_"}), eps=eps, grt=grt, weekly=wk)
+    return {k: float(res[k].iloc[0]) for k in SCORE_COLS}
@@ -2,11 +2,17 @@
 # USA Text Dashboard — A/B Smart Money Scanner + TV Chart + Earnings + News (compact)
 # Needs: EODHD_API_TOKEN
 
-import os, json, requests, pandas as pd, numpy as np, streamlit as st
+import os, json, time, threading, requests, pandas as pd, numpy as np, streamlit as st
 from datetime import date, timedelta
 from typing import Optional, Dict, List, Tuple
 from collections import Counter
 import streamlit.components.v1 as components
+from src.engine.vector_metrics import compute_from_df as vector_scores, score_rv
+from src.engine.scan_rules import compute_indicators, gate_long_minimal, gate_short_minimal, decide_buy_today
+from src.engine.compact import maybe_compact
+from src.engine import scan_jobs, scan_pipeline, scan_diff, regions, scan_order, feature_table, scan_diagnostics, dedup, price_store, risk_plan
+from src.engine.scan_presets import LABEL_TO_PRESET
+from src.engine.scan_snapshots import load_latest
 
 # ───────────────────── Optional deps (graceful fallbacks)
 try:
@@ -16,7 +22,7 @@ try:
     from src.components.tradingview_widgets import advanced_chart; HAS_TV = True
 except Exception: HAS_TV = False
 try:
-    from src.engine.smart_money import make_light_badge, passes_rules as sm_passes; HAS_SM = True
+    from src.engine.smart_money import make_light_badge, passes_rules_batch, reason_text, load_config; HAS_SM = True
 except Exception:
     HAS_SM = False
     def make_light_badge(_: str)->str: return "USA Dashboard Ready"
@@ -77,85 +83,45 @@ def fetch_ohlcv(sym_eod: str, start: str, end: str, token: str)->pd.DataFrame:
     return df.rename(columns={"open":"Open","high":"High","low":"Low","close":"Close","volume":"Volume"})\
              .sort_values("date").reset_index(drop=True)
 
-def _eod_us(sym:str)->str: sym=sym.strip().upper(); return sym if "." in sym else f"{sym}.US"
-
-# ───────────────────── Indicators (light)
-ema = lambda s,n: s.ewm(span=n, adjust=False).mean()
-def rsi(s:pd.Series, n:int=14)->pd.Series:
-    d=s.diff(); up=np.where(d>0,d,0.0); dn=np.where(d<0,-d,0.0)
-    rs = pd.Series(up).rolling(n).mean() / pd.Series(dn).rolling(n).mean().replace(0,np.nan)
-    return pd.Series(100 - (100/(1+rs)), index=s.index)
-def atr(df:pd.DataFrame, n:int=14)->pd.Series:
-    tr=pd.concat([(df["High"]-df["Low"]).abs(),
-                  (df["High"]-df["Close"].shift()).abs(),
-                  (df["Low"]-df["Close"].shift()).abs()], axis=1).max(axis=1); 
-    return tr.rolling(n).mean()
-def compute_indicators(df:pd.DataFrame)->pd.DataFrame:
-    o=df.copy()
-    o["EMA20"],o["EMA50"],o["EMA200"]=ema(o["Close"],20),ema(o["Close"],50),ema(o["Close"],200)
-    o["RSI14"],o["ATR14"]=rsi(o["Close"],14),atr(o,14)
-    o["AvgVol30"]=o["Volume"].rolling(30).mean()
-    o["High20"],o["Low20"]=o["High"].rolling(20).max(),o["Low"].rolling(20).min()
-    return o
-
-# ───────────────────── Vector-style scores
-def score_rt(df:pd.DataFrame)->float:
-    if len(df)<60: return 0.0
-    c=df["Close"]; r4=(c.iloc[-1]/c.iloc[-20]-1.0) if len(c)>=20 else 0.0
-    r12=(c.iloc[-1]/c.iloc[-60]-1.0) if len(c)>=60 else 0.0
-    return round(float(max(0.0, 1.0+0.6*r4+0.4*r12)),3)
-
-def score_rs(df:pd.DataFrame)->float:
-    if len(df)<60: return 0.0
-    ret=df["Close"].pct_change().dropna()
-    vol = (ret.rolling(20).std().iloc[-1] if len(ret)>=20 else ret.std()) or 1e-9
-    return round(float(min(max(1.0/(vol*15),0.1),2.0)),3)
-
-def score_rv(price:float, eps:Optional[float], grt:Optional[float])->float:
-    if not eps or eps<=0 or grt is None or np.isnan(grt): return 1.0
-    pe = price/eps if eps else np.nan
-    if not pe or pe<=0: return 1.0
-    return round(float(min(max(1.5/(pe/max(grt,0.01)),0.1),2.0)),3)
+def _eod_us(sym:str)->str: return regions.eod_symbol(sym, "us")
 
-score_vst = lambda rt,rv,rs: round(float(0.4*rt+0.3*rv+0.3*rs),3)
+def _close_panel(symbols:List[str], lookback:int)->pd.DataFrame:
+    """Closes for the correlation check: local price store first, then the (cached) EODHD
+    fetches the scan already made for the remaining symbols."""
+    local=price_store.load_panel(symbols, "us")
+    cols={s:local[s] for s in local.columns} if not local.empty else {}
+    if TOKEN:
+        start=(date.today()-timedelta(days=int(max(lookback*1.2,200)))).strftime("%Y-%m-%d"); end=date.today().strftime("%Y-%m-%d")
+        for s in symbols:
+            if s in cols: continue
+            df=fetch_ohlcv(_eod_us(s), start, end, TOKEN)
+            if not df.empty: cols[s]=df.set_index("date")["Close"]
+    return pd.concat(cols, axis=1).sort_index() if cols else pd.DataFrame()
 
-# CI (Option 2): 13-week trend-recovery stability (higher is steadier)
-def score_ci(df:pd.DataFrame)->float:
-    if len(df)<65: return 0.9
-    w=df.set_index("date")[["Close"]].resample("W-FRI").last().dropna()
-    if len(w)<13: return 0.9
-    up_weeks=(w["Close"].diff()>0).tail(13).sum()
-    peak=np.maximum.accumulate(w["Close"].tail(13))
-    dd=((peak - w["Close"].tail(13))/peak).max()  # worst drawdown over 13w
-    up_ratio=float(up_weeks)/13.0
-    ci = 0.6*up_ratio + 0.4*(1.0 - float(dd))
-    return round(float(min(max(ci*1.5,0.1),1.5)),3)
-
-compute_stop = lambda row: round(float(row["EMA50"] - 2.0*row["ATR14"]),4)
-
-# ───────────────────── A/B setup gates (minimal but safe)
-def gate_long_minimal(r:pd.Series)->bool: return bool(((r["EMA20"]>=r["EMA50"]) or (r["Close"]>=r["EMA20"])) and r["RSI14"]>=40)
-def gate_short_minimal(r:pd.Series)->bool: return bool(((r["EMA20"]<=r["EMA50"]) or (r["Close"]<=r["EMA20"])) and r["RSI14"]<=60)
-
-def decide_buy_today(row:pd.Series, is_long:bool, rt:float, vst:float)->Tuple[str,float,float]:
-    if is_long:
-        ok_now=(row["EMA20"]>=row["EMA50"]) and (row["RSI14"]>=50) and (row["Close"]>=0.97*(row["High20"] or row["Close"]))
-        almost=(row["EMA20"]>=row["EMA50"]) and (row["RSI14"]>=45)
-    else:
-        ok_now=(row["EMA20"]<=row["EMA50"]) and (row["RSI14"]<=50) and (row["Close"]<=1.03*(row["Low20"] or row["Close"]))
-        almost=(row["EMA20"]<=row["EMA50"]) and (row["RSI14"]<=55)
-    entry=float(row["Close"]); stop=compute_stop(row)
-    if ok_now and rt>=1.0 and vst>=0.9: return ("Buy Today", entry, stop)
-    if almost and rt>=0.9 and vst>=0.85: return ("Buy in 2–3 days", entry, stop)
-    return ("Wait", entry, stop)
+# ───────────────────── Indicators, gates & Vector-style scores (shared engine)
+score_vst = lambda rt,rv,rs: round(float(0.4*rt+0.3*rv+0.3*rs),3)
 
 # ───────────────────── Smart Money (resilient wrapper)
-def _sm_eval(symbol:str, price=None, ctx=None):
-    if not HAS_SM: return True,["smart_money_not_loaded_but_allowed"]
-    try:
-        ok,details=sm_passes(symbol=symbol, price=price, context=ctx, return_details=True)
-        return bool(ok), (details.get("fail_reasons",[]) if not ok else [])
-    except Exception: return True,["smart_money_error_bypassed"]
+def _sm_gate():
+    """sm_check(sym, is_long) from risk_plan.lazy_gate: R/R and Monte Carlo POP (prior-day
+    feature table + local bars) are computed only for the symbols a run brings to the gate.
+    Symbols it cannot judge fail as risk_plan.GATE_ERROR (see _gate_warning); None when the
+    engine is unavailable (the gate is then bypassed)."""
+    if not HAS_SM: return None
+    return risk_plan.lazy_gate("us", "USA")
+
+def _gate_warning(job:dict, error:Optional[str]=None):
+    """Say so when Smart Money gate errors failed symbols (counted under GATE_ERROR in the job)."""
+    n=int((job.get("reasons") or {}).get(risk_plan.GATE_ERROR, 0))
+    if n: st.warning(f"Smart Money gate could not judge {n} symbols — they are failed as `{risk_plan.GATE_ERROR}`, not passed"
+                     +(f" ({error})" if error else "")+". Fix the feature table / price store, then Restart the scan.")
+
+def _paged(df:pd.DataFrame, key:str, size:int=50)->pd.DataFrame:
+    """Server-side page of df: only the visible rows are sent to the browser."""
+    pages=scan_diagnostics.page(df,1,size)[1]
+    if pages<=1: return df
+    num=st.number_input(f"Page (1–{pages}, {len(df)} rows)",1,pages,1,key=key)
+    return scan_diagnostics.page(df,num,size)[0]
 
 def _render_sm_summary(total_checked:int, reasons_counter:Counter, fail_examples_df:pd.DataFrame):
     st.markdown(f"**Smart Money filter summary:** checked `{total_checked}` symbols")
@@ -163,7 +129,10 @@ def _render_sm_summary(total_checked:int, reasons_counter:Counter, fail_examples
         st.markdown("**Top filter reasons**")
         for r,n in reasons_counter.most_common(12): st.write(f"- {r} → {n}")
     if isinstance(fail_examples_df,pd.DataFrame) and not fail_examples_df.empty:
-        st.markdown("**Examples (failed):**"); st.dataframe(fail_examples_df.head(25), use_container_width=True, height=360)
+        st.markdown("**Examples (failed, sampled per reason):**")
+        why=st.selectbox("Reason", ["All"]+list(dict.fromkeys(fail_examples_df["Reason"])), key="us_fail_reason")
+        shown=fail_examples_df if why=="All" else fail_examples_df[fail_examples_df["Reason"]==why]
+        st.dataframe(_paged(shown, "us_fail_page", 25), use_container_width=True, height=360)
 
 # ───────────────────── UI — Chart (left) + Scanner controls/table (right)
 st.markdown("### 🔎 A/B Smart Money Scanner")
@@ -182,9 +151,13 @@ with R:
     st.subheader("Universe Scan (USA)")
     lookback = st.number_input("Lookback bars", 150, 3000, 420, 10)
     apply_sm = st.checkbox("Apply Smart Money pre-filter", value=True)
-    max_checks = st.number_input("HARD CAP: symbols to process", 50, 2000, 200, 50)
+    stage1 = st.checkbox("Stage-1 liquidity pre-filter (bulk last-day snapshot)", value=True,
+                         help="Drops symbols whose average volume is far below the floor before any history is fetched.")
+    max_checks = st.number_input("Symbols per run (resume / extend by N)", 50, 2000, 200, 50)
     max_results = st.number_input("Max matches to return", 5, 2000, 200, 5)
     start_offset = st.number_input("Start offset in symbol list", 0, 50000, 0, 100)
+    scan_order_key = st.selectbox("Scan order", list(scan_order.STRATEGIES), index=1, format_func=scan_order.STRATEGIES.get,
+                                  help="Capped runs reach the most liquid / active names first (from the cached snapshot & feature table).")
 
     if "us_symbol_pool" not in st.session_state: st.session_state["us_symbol_pool"]=[]
     if st.button("📥 Load US symbol list", use_container_width=True):
@@ -207,38 +180,29 @@ with R:
     if "us_sm_fail_examples" not in st.session_state: st.session_state["us_sm_fail_examples"]=pd.DataFrame()
     MIN_AVG30_VOLUME=100_000
 
-    @st.cache_data(ttl=300, show_spinner=False)
-    def _scan(is_long:bool, lookback:int, token:str, pool:List[str], start_offset:int, max_checks:int, max_results:int, apply_sm_flag:bool):
-        start=(date.today()-timedelta(days=int(max(lookback*1.2,200)))).strftime("%Y-%m-%d"); end=date.today().strftime("%Y-%m-%d")
-        out=[]; processed=0; reasons_counter=Counter(); fail_rows=[]
-        for sym in pool[start_offset:]:
-            if processed>=int(max_checks): break
-            df=fetch_ohlcv(_eod_us(sym), start, end, token); processed+=1
-            if df.empty or len(df)<60: reasons_counter["data_insufficient"]+=1; fail_rows.append({"Symbol":sym,"Reason":"data_insufficient"}); continue
+    def _make_evaluate(is_long:bool, lookback:int, sm_gate=None):
+        def _evaluate(sym:str, df:pd.DataFrame):
+            """-> (row, None) on a match, (None, reason or [reasons]) otherwise."""
+            if df is None or df.empty or len(df)<60: return None,"data_insufficient"
             df=df.tail(max(lookback,60)); df=compute_indicators(df); row=df.iloc[-1]
             avg30=float(row.get("AvgVol30") or 0.0)
-            if avg30<MIN_AVG30_VOLUME: reasons_counter["liquidity_avg30_floor"]+=1; fail_rows.append({"Symbol":sym,"Reason":"liquidity_avg30_floor"}); continue
+            if avg30<MIN_AVG30_VOLUME: return None,"liquidity_avg30_floor"
             if not (gate_long_minimal(row) if is_long else gate_short_minimal(row)):
-                reasons_counter["long_setup_min_fail" if is_long else "short_setup_min_fail"]+=1; 
-                fail_rows.append({"Symbol":sym,"Reason":"setup_min_fail"}); continue
-            sm_ok, sm_reasons = (True, [])
-            if apply_sm_flag and HAS_SM:
-                sm_ok, sm_reasons=_sm_eval(sym, price=float(row["Close"]), ctx={"benchmark":"SPY"})
-            if not sm_ok:
-                for rr in (sm_reasons or ["smart_money_fail"]): reasons_counter[rr]+=1
-                fail_rows.append({"Symbol":sym,"Reason":", ".join(sm_reasons)[:240]}); continue
-            rt=score_rt(df); rs=score_rs(df); eps=grt=sector=sales=None
+                return None,("long_setup_min_fail" if is_long else "short_setup_min_fail")
+            sm_ok, sm_reasons = sm_gate(sym, is_long) if sm_gate else (True, [])
+            if not sm_ok: return None,(sm_reasons or ["smart_money_fail"])
+            vm=vector_scores(df); rt,rs,ci=vm["RT"],vm["RS"],vm["CI"]; eps=grt=sector=sales=None
             if HAS_YF:
                 try:
                     info=yf.Ticker(sym).info; eps=info.get("trailingEps"); grt=info.get("earningsGrowth"); sector=info.get("sector"); sales=info.get("revenueGrowth")
                 except Exception: pass
             rv=score_rv(float(row["Close"]), eps, (grt if grt is not None else (sales if sales is not None else 0.1)))
-            vst=score_vst(rt,rv,rs); ci=score_ci(df)
+            vst=score_vst(rt,rv,rs)
             label,entry,stop=decide_buy_today(row,is_long,rt,vst)
-            if label=="Wait": reasons_counter["buy_logic_wait"]+=1; fail_rows.append({"Symbol":sym,"Reason":"buy_logic_wait"}); continue
+            if label=="Wait": return None,"buy_logic_wait"
             pct_prc=(row["Close"]/df["Close"].iloc[-2]-1.0)*100.0 if len(df)>=2 else 0.0
             chg=row["Close"]-df["Close"].iloc[-2] if len(df)>=2 else 0.0
-            out.append({
+            return {
                 "Symbol": sym.upper(),
                 "TV": f"https://www.tradingview.com/chart/?symbol={sym.upper()}",
                 "Side": "LONG" if is_long else "SHORT",
@@ -248,35 +212,147 @@ with R:
                 "VST": round(float(vst),3), "CI": round(float(ci),3),
                 "AvgVol30": int(avg30), "Buy Today": label,
                 "$ Change (D)": round(float(chg),4), "Stop": round(float(stop),4)
-            })
-            if len(out)>=int(max_results): break
-        df_out=pd.DataFrame(out); fail_df=pd.DataFrame(fail_rows)
+            }, None
+        return _evaluate
+
+    @st.cache_data(ttl=3600, show_spinner=False)
+    def _bulk_snapshot(token:str, day:str)->pd.DataFrame:
+        return scan_pipeline.bulk_last_day(token, "US")
+
+    def _scan(is_long:bool, lookback:int, token:str, pool:List[str], start_offset:int, max_checks:int, max_results:int, apply_sm_flag:bool, stage1_flag:bool=True, order:str="alphabetical", on_progress=None, cancel:Optional[threading.Event]=None):
+        """Advance the persisted scan job for these parameters by `max_checks` symbols.
+        Same parameters + symbol list + day -> same job, so reruns resume from its cursor.
+        Stage 1 drops symbols the last-day snapshot already shows as illiquid, so their
+        history is never fetched (50D bulk average vs the 30D floor, hence the slack).
+        `order` (scan_order.STRATEGIES) sorts the survivors so the cap hits the best names first.
+        on_progress(job) renders partial results while the run is in flight; setting `cancel`
+        stops it and cancels the fetches already queued in the executor."""
+        start=(date.today()-timedelta(days=int(max(lookback*1.2,200)))).strftime("%Y-%m-%d"); end=date.today().strftime("%Y-%m-%d")
+        universe, s1_counts = list(pool[start_offset:]), Counter()
+        snap=_bulk_snapshot(token, end) if (stage1_flag or order!="alphabetical") else None
+        if stage1_flag:
+            universe, s1_counts = scan_pipeline.prefilter(universe, snap, min_avg_volume=MIN_AVG30_VOLUME, slack=0.8)
+        universe=scan_order.order_symbols(universe, order, snapshot=snap, features=feature_table.features("us"))
+        st.session_state["us_stage1_counts"]=s1_counts
+        params={"is_long":bool(is_long),"lookback":int(lookback),"sm":bool(apply_sm_flag),"start_offset":int(start_offset),"asof":end,"order":order}
+        job=scan_jobs.load_or_create("us_ab", params, universe)
+        # Fetches are prefetched concurrently (VEGA_FETCH_WORKERS / VEGA_FETCH_RATE) while
+        # evaluation runs alongside; results come back in symbol order and stop at max_results.
+        gate=_sm_gate() if apply_sm_flag else None
+        job=scan_jobs.run_job(job, universe, lambda s: fetch_ohlcv(_eod_us(s), start, end, token),
+                              _make_evaluate(is_long, lookback, gate), n=int(max_checks), max_results=int(max_results),
+                              on_progress=on_progress, cancel=cancel)
+        st.session_state["us_sm_gate_error"]=getattr(gate, "error", None)
+        # symbols this run has judged: the requested slice minus whatever the cursor hasn't reached
+        pending=set(universe[job["cursor"]:])
+        st.session_state["us_scan_seen"]=[s for s in pool[start_offset:] if s not in pending]
+        return _job_frames(job)+(job,)
+
+    def _job_frames(job:dict):
+        df_out=pd.DataFrame(job["results"]); fail_df=scan_diagnostics.examples_frame(job["fail_samples"], job["reasons"])
         if not df_out.empty:
             by=[c for c in ["VST","RS","RT","Symbol"] if c in df_out.columns]; asc=[False,False,False,True][:len(by)]
             df_out=df_out.sort_values(by=by, ascending=asc).reset_index(drop=True)
-        return df_out, reasons_counter, fail_df, processed
-
-    if st.button("🚀 Scan (A/B)", use_container_width=True):
+        return maybe_compact(df_out), Counter(job["reasons"]), maybe_compact(fail_df)
+
+    preset_key = LABEL_TO_PRESET[mode]
+    def _keep_job(job:dict):
+        res,counts,fail_df=_job_frames(job)
+        st.session_state["us_scan_df"]=res; st.session_state["us_sm_counts"]=counts
+        st.session_state["us_sm_fail_examples"]=fail_df; st.session_state["us_scan_mode"]=preset_key
+        st.session_state["us_scan_job"]=job["id"]
+        return res
+
+    def _live_view():
+        """Progress bar, throughput line and a results table refreshed as matches arrive.
+        Pressing Cancel sets the run's cancel event (see _request_cancel): the executor stops
+        waiting, cancels queued fetches, and the job is saved as paused with its partial results."""
+        bar, line, table = st.progress(0.0, text="Starting…"), st.empty(), st.empty()
+        t0, first = time.time(), {}
+        def _update(job:dict):
+            first.setdefault("cursor", job["cursor"]); first.setdefault("matches", len(job["results"]))
+            done=job["cursor"]-first["cursor"]; todo=max(min(int(max_checks), job["universe_size"]-first["cursor"]),1)
+            rate=done/max(time.time()-t0,1e-6)
+            top=", ".join(f"{r} ({n})" for r,n in Counter(job["reasons"]).most_common(3))
+            bar.progress(min(done/todo,1.0), text=f"{done}/{todo} symbols • {rate:.1f} symbols/s")
+            line.caption(f"✅ {len(job['results'])} matches so far (+{len(job['results'])-first['matches']} this run)"+(f" • top reasons: {top}" if top else ""))
+            if len(job["results"])>first.get("shown",-1):
+                first["shown"]=len(job["results"]); table.dataframe(_job_frames(job)[0].head(50), use_container_width=True, hide_index=True)
+            st.session_state["us_scan_job"]=job["id"]
+        return _update
+
+    def _request_cancel():
+        ev=st.session_state.get("us_scan_cancel")
+        if ev is not None: ev.set()
+
+    run_c, cancel_c, reset_c = st.columns([3,1,1])
+    if cancel_c.button("⏹ Cancel", use_container_width=True, on_click=_request_cancel):
+        _job=scan_jobs.load_job(st.session_state["us_scan_job"]) if st.session_state.get("us_scan_job") else None
+        if _job:
+            _keep_job(_job); st.info(f"Scan paused at {_job['cursor']}/{_job['universe_size']} — press Run / resume to continue.")
+    if run_c.button("🚀 Run / resume live scan (A/B)", use_container_width=True):
         if not TOKEN: st.error("EODHD token missing — set EODHD_API_TOKEN.")
         elif not pool: st.warning("Load the US symbol list first.")
         else:
-            with st.spinner("Scanning…"):
-                is_long = mode.startswith("A")
-                res,counts,fail_df,checked=_scan(is_long,lookback,TOKEN,pool,int(start_offset),int(max_checks),int(max_results),apply_sm)
-            st.session_state["us_scan_df"]=res; st.session_state["us_sm_counts"]=counts
-            st.session_state["us_sm_fail_examples"]=fail_df; st.success(f"Done. Checked: {checked} • Matches: {len(res)}")
-
-    res=st.session_state.get("us_scan_df", pd.DataFrame())
-    _render_sm_summary(total_checked=(sum(st.session_state.get("us_sm_counts",Counter()).values())+len(res)),
-                       reasons_counter=st.session_state.get("us_sm_counts",Counter()),
-                       fail_examples_df=st.session_state.get("us_sm_fail_examples",pd.DataFrame()))
+            is_long = mode.startswith("A")
+            st.session_state["us_scan_mode"]=preset_key
+            cancel_ev=st.session_state["us_scan_cancel"]=threading.Event()      # one per run, set by Cancel
+            res,counts,fail_df,job=_scan(is_long,lookback,TOKEN,pool,int(start_offset),int(max_checks),int(max_results),apply_sm,stage1,scan_order_key,
+                                         on_progress=_live_view(), cancel=cancel_ev)
+            _keep_job(job)
+            if cancel_ev.is_set(): st.info(f"Scan cancelled at {job['cursor']}/{job['universe_size']} — press Run / resume to continue.")
+            else: st.success(f"Done. Checked: {job['processed']} • Matches: {len(res)}")
+    if reset_c.button("🔄 Restart", use_container_width=True):
+        if st.session_state.get("us_scan_job"): scan_jobs.delete_job(st.session_state["us_scan_job"])
+        st.session_state["us_scan_job"]=None; st.session_state["us_scan_mode"]=None
+    _job=scan_jobs.load_job(st.session_state["us_scan_job"]) if st.session_state.get("us_scan_job") else None
+    if _job and st.session_state.get("us_scan_mode")==preset_key:
+        st.caption(f"🧭 Scan job `{_job['id']}` • {_job['cursor']}/{_job['universe_size']} symbols • "
+                   f"{len(_job['results'])} matches • {_job['status']} — run again to continue from the cursor.")
+        _gate_warning(_job, st.session_state.get("us_sm_gate_error"))
+
+    # Live results for this mode win; otherwise open on the latest precomputed snapshot
+    if st.session_state.get("us_scan_mode")==preset_key:
+        res=st.session_state.get("us_scan_df", pd.DataFrame())
+        counts=st.session_state.get("us_sm_counts",Counter())+st.session_state.get("us_stage1_counts",Counter())
+        fails=st.session_state.get("us_sm_fail_examples",pd.DataFrame())
+        if st.session_state.get("us_stage1_counts"):
+            st.caption(f"⚡ Stage 1 dropped {sum(st.session_state['us_stage1_counts'].values())} symbols before any history fetch.")
+    else:
+        res,meta=load_latest(preset_key); counts=Counter(meta.get("reasons") or {}); fails=pd.DataFrame()
+        if meta: st.caption(f"📦 Snapshot {meta.get('created','')} • {meta.get('processed') or 0} symbols — press **Re-run live** for custom parameters.")
+    _render_sm_summary(total_checked=(sum(counts.values())+len(res)), reasons_counter=counts, fail_examples_df=fails)
+
+    # What changed since the previous snapshot (a live run compares against the latest one,
+    # limited to the symbols it has actually judged — a capped / resumable run isn't the universe)
+    if st.session_state.get("us_scan_mode")==preset_key:
+        snap,snap_meta=load_latest(preset_key)
+        seen=set(map(str.upper, st.session_state.get("us_scan_seen") or []))
+        if snap_meta and not snap.empty and "Symbol" in snap.columns:
+            snap=snap[snap["Symbol"].astype(str).str.upper().isin(seen)]
+        delta=scan_diff.diff_frames(snap,res) if snap_meta else pd.DataFrame(columns=scan_diff.DELTA_COLS)
+        delta_note=f"vs snapshot {snap_meta.get('created','')}, {len(seen)} symbols scanned so far"
+    else:
+        delta,_,prev_meta=scan_diff.diff_latest(preset_key); delta_note=f"vs snapshot {prev_meta.get('created','')}"
+    moves=scan_diff.summarize(delta)
+    if moves:
+        with st.expander(f"Δ {moves.get('new',0)} new • {moves.get('dropped',0)} dropped • {moves.get('changed',0)} changed ({delta_note})"):
+            st.dataframe(delta, use_container_width=True, hide_index=True)
 
     if not res.empty:
         st.markdown("### Smart Money — Passed")
+        dd_c, rho_c = st.columns([2,1])
+        collapse = dd_c.checkbox("🧬 One name per correlated cluster", value=True,
+                                 help="Matches whose 60-day returns move together are one trade: keep the best-ranked name per cluster.")
+        rho = rho_c.slider("Cluster at ρ ≥", 0.50, 0.95, dedup.DEFAULT_THRESHOLD, 0.05)
+        if collapse and len(res)>1:
+            res_all, res = dedup.dedupe(res, _close_panel(res["Symbol"].tolist(), int(lookback)), threshold=rho)
+            if len(res)<len(res_all):
+                st.caption(f"🧬 {len(res_all)} matches → {len(res)} clusters; each row shows its cluster members.")
         # Link column → TradingView, click sets preview symbol (no dropdowns)
         try:
             st.dataframe(
-                res[[c for c in ["Symbol","Side","Sector","% PRC","RS","RT","VST","CI","AvgVol30","Buy Today","TV"]]],
+                _paged(res, "us_res_page")[[c for c in ["Symbol","Side","Sector","% PRC","RS","RT","VST","CI","AvgVol30","Buy Today","ClusterSize","Members","TV"] if c in res.columns]],
                 use_container_width=True, hide_index=True,
                 column_config={
                     "TV": st.column_config.LinkColumn("TradingView", help="Open chart", validate="^https?://")
@@ -284,19 +360,24 @@ with R:
             )
         except Exception:
             # Fallback (no LinkColumn support)
-            df_show=res.copy(); df_show["TradingView"]=df_show["TV"]; df_show=df_show.drop(columns=["TV"])
+            df_show=_paged(res, "us_res_page").copy(); df_show["TradingView"]=df_show["TV"]; df_show=df_show.drop(columns=["TV"])
             st.dataframe(df_show, use_container_width=True, hide_index=True)
 
         # Quick picker keeps chart pinned on the left—no scroll back & forth
         pick = st.selectbox("Quick Preview (updates left chart)", res["Symbol"].tolist(), key="quick_pick")
         if st.button("🔍 Preview Selected", use_container_width=True, key="btn_prev"):
             st.session_state["preview_symbol"]=pick; st.rerun()
-        c1,c2=st.columns(2)
+        c1,c2,c3=st.columns(3)
         with c1:
             st.download_button("⬇️ CSV", res.to_csv(index=False).encode("utf-8"), file_name="usa_scan_AB.csv", mime="text/csv")
         with c2:
             if st.button("➕ Add ALL to Today's Queue", use_container_width=True):
                 for s in res["Symbol"].tolist(): add_to_queue(s,"USA"); st.success("Queued all results.")
+        with c3:
+            new_syms=delta.loc[delta["change"]=="new","Symbol"].tolist() if not delta.empty else []
+            if st.button(f"🆕 Queue new only ({len(new_syms)})", use_container_width=True, disabled=not new_syms):
+                for s in new_syms: add_to_queue(s,"USA")
+                st.success(f"Queued {len(new_syms)} new names.")
     else:
         st.info("No final matches. See **Top filter reasons** above to adjust thresholds.")
 
@@ -1,8 +1,9 @@
-import os, pandas as pd, streamlit as st
+import os, numpy as np, pandas as pd, streamlit as st
 from src.components.tradingview_widgets import advanced_chart, economic_calendar
-from src.engine.smart_money import make_light_badge, passes_rules
+from src.engine.smart_money import make_light_badge, passes_rules_batch
 from src.components.today_queue import add as add_to_queue, render as render_queue
 from src.engine.vector_metrics import compute_from_df
+from src.engine.price_store import load_bars, region_dir
 
 st.set_page_config(page_title="Mexico Text Dashboard", page_icon="🇲🇽", layout="wide")
 st.title("Mexico Text Dashboard")
@@ -17,12 +18,10 @@ with left:
         st.link_button("Open Chart", f"https://www.tradingview.com/chart/?symbol={default_symbol}", use_container_width=True)
     advanced_chart(default_symbol, height=720)
 
-    import os
-    path = os.path.join("data/eod/mx", (default_symbol.split(":")[-1] if ":" in default_symbol else default_symbol) + ".csv")
-    if os.path.exists(path):
-        import pandas as pd
-        df = pd.read_csv(path)
-        m = compute_from_df(df)
+    sym_local = default_symbol.split(":")[-1] if ":" in default_symbol else default_symbol
+    df = load_bars(sym_local, "mx")
+    if not df.empty:
+        m = compute_from_df(df, weekly=load_bars(sym_local, "mx", "W"))
         c1,c2,c3,c4,c5 = st.columns(5)
         c1.metric("RT", m["RT"]); c2.metric("RV", m["RV"]); c3.metric("RS", m["RS"]); c4.metric("CI", m["CI"]); c5.metric("VST", m["VST"])
     else:
@@ -30,14 +29,21 @@ with left:
 
 with right:
     st.subheader("Local Scans")
+    kind_map = {"Rising Wedge": "rising_wedge", "Falling Wedge": "falling_wedge", "Vega Smart Money (Today)": "vega_smart_today"}
     try:
         from tools.scanners import pattern_scanners as ps
-        res = ps.run_scan("data/eod/mx", kind="vega_smart_today", limit=50)
-        if not res.empty:
-            def _judge(sym):
-                chk = passes_rules(sym, "Mexico")
-                return "✅" if chk.get("pass") else "⛔"
-            res["pass"] = [ _judge(s) for s in res["symbol"] ]
+        # Scan only on demand; unchanged CSVs are served from the scanner's per-file cache
+        if st.button(f"🔎 Run {scan_kind} scan", use_container_width=True):
+            st.session_state["scan_mx"] = (scan_kind, ps.run_scan(region_dir("mx"), kind=kind_map[scan_kind], limit=50))
+        last_kind, res = st.session_state.get("scan_mx", (None, pd.DataFrame()))
+        if last_kind and last_kind != scan_kind:
+            st.caption(f"Showing the last {last_kind} scan — press Run to scan for {scan_kind}.")
+        if last_kind is None:
+            st.info("Pick a scan type and press Run.")
+        elif not res.empty:
+            res = res.copy()
+            ok, _ = passes_rules_batch(res["symbol"].tolist(), "Mexico")
+            res["pass"] = np.where(ok, "✅", "⛔")
             st.dataframe(res, use_container_width=True, hide_index=True)
             pick = st.selectbox("Send to chart", res["symbol"].tolist())
             cols = st.columns(2)
@@ -46,7 +52,7 @@ with right:
             if cols[1].button("Add to Today's Trades"):
                 add_to_queue(pick, "Mexico"); st.toast(f"Added {pick} to Today's Trades")
         else:
-            st.info("No results yet. Add CSVs to the data folder.")
+            st.info("No matches. Add or refresh CSVs in the data folder.")
     except Exception as e:
         st.error(f"Scanner error: {e}")
 
@@ -1,8 +1,9 @@
-import os, pandas as pd, streamlit as st
+import os, numpy as np, pandas as pd, streamlit as st
 from src.components.tradingview_widgets import advanced_chart, economic_calendar
-from src.engine.smart_money import make_light_badge, passes_rules
+from src.engine.smart_money import make_light_badge, passes_rules_batch
 from src.components.today_queue import add as add_to_queue, render as render_queue
 from src.engine.vector_metrics import compute_from_df
+from src.engine.price_store import load_bars
 
 st.set_page_config(page_title="LATAM (ex-Mexico) Text Dashboard", page_icon="🌎", layout="wide")
 st.title("LATAM (ex-Mexico) Text Dashboard")
@@ -25,10 +26,10 @@ with left:
     )
     advanced_chart(default_symbol, height=720)
 
-    csv_path = os.path.join("data/eod/latam", (default_symbol.split(":")[-1] if ":" in default_symbol else default_symbol) + ".csv")
-    if os.path.exists(csv_path):
-        df = pd.read_csv(csv_path)
-        m = compute_from_df(df)
+    sym_local = default_symbol.split(":")[-1] if ":" in default_symbol else default_symbol
+    df = load_bars(sym_local, "latam")
+    if not df.empty:
+        m = compute_from_df(df, weekly=load_bars(sym_local, "latam", "W"))
         c1, c2, c3, c4, c5 = st.columns(5)
         c1.metric("RT", m["RT"]); c2.metric("RV", m["RV"]); c3.metric("RS", m["RS"]); c4.metric("CI", m["CI"]); c5.metric("VST", m["VST"])
     else:
@@ -59,7 +60,8 @@ with right:
     res = st.session_state["latam_scan_results"]
     if not res.empty:
         res = res.copy()
-        res["pass"] = ["✅" if passes_rules(sym, "LATAM").get("pass") else "⛔" for sym in res["symbol"]]
+        ok, _ = passes_rules_batch(res["symbol"].tolist(), "LATAM")
+        res["pass"] = np.where(ok, "✅", "⛔")
         st.dataframe(res, use_container_width=True, hide_index=True)
 
         pick = st.selectbox("Send to chart", res["symbol"].tolist())
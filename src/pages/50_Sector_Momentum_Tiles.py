@@ -16,7 +16,7 @@ def _tv_proxy_url(path: str):
     safe = urllib.parse.quote(path, safe='')
     return f'/tv/forward?url={safe}'
 
-def region_ui(label: str, tv_url_key: str):
+def region_ui(label: str, tv_url_key: str, exchange: str):
     with st.expander(f'{label} — Uploads', expanded=True):
         c1, c2 = st.columns(2)
         with c1:
@@ -51,7 +51,7 @@ def region_ui(label: str, tv_url_key: str):
                     bdf = bdf.rename(columns={bdf.columns[0]:'date'}).sort_values('date').set_index('date')
                 bench_df = bdf
 
-            df = sm.tiles_from_files(files, bench_df=bench_df, price_col=price_col)
+            df = sm.tiles_from_files(files, bench_df=bench_df, price_col=price_col, exchange=exchange)
             df = df.sort_values('score', ascending=False)
             df['grade'] = df['score'].apply(sm.grade)
             st.dataframe(df, use_container_width=True)
@@ -99,10 +99,10 @@ def region_ui(label: str, tv_url_key: str):
             st.info('Provide a TradingView URL or add it to `.streamlit/secrets.toml`.')
 
 with tabs[0]:
-    region_ui('USA', 'TV_URL_USA')
+    region_ui('USA', 'TV_URL_USA', 'NYSE')
 with tabs[1]:
-    region_ui('Canada', 'TV_URL_CAN')
+    region_ui('Canada', 'TV_URL_CAN', 'TSX')
 with tabs[2]:
-    region_ui('Mexico', 'TV_URL_MEX')
+    region_ui('Mexico', 'TV_URL_MEX', 'BMV')
 with tabs[3]:
-    region_ui('LATAM ex-MX', 'TV_URL_LATAM')
+    region_ui('LATAM ex-MX', 'TV_URL_LATAM', 'BYMA')
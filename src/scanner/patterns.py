@@ -1,3 +1,4 @@
+from __future__ import annotations
 
 import numpy as np
 import pandas as pd
@@ -20,76 +21,136 @@ def _load_ohlc(symbol: str, lookback: int = 400):
             df["Close"] = df["Adj Close"]
     return df[["Open","High","Low","Close"]].copy()
 
-def _linreg(x, y):
-    x = np.asarray(x, dtype=float)
+# ---------- Channel fits from prefix sums ----------
+# For a window of L bars ending at row t, the OLS line through y uses only
+# n, Σy, Σi·y and Σy² over the window (Σi and Σi² are closed-form), so one set of
+# cumulative sums per panel gives slope, intercept and residual error for every
+# window length and every end date, for every symbol at once.
+
+WEDGE_WINDOWS = tuple(range(40, 121, 10))
+
+def _prefix(y: np.ndarray):
+    """Cumulative n, Σy, Σi·y, Σy² along axis 0 (with a leading zero row); y is demeaned
+    per column so the sums stay well conditioned."""
     y = np.asarray(y, dtype=float)
-    n = len(x)
-    if n < 2:
-        return (0.0, 0.0)
-    A = np.vstack([x, np.ones(n)]).T
-    m, b = np.linalg.lstsq(A, y, rcond=None)[0]
-    return (m, b)
+    if y.ndim == 1:
+        y = y[:, None]
+    ok = ~np.isnan(y)
+    mu = np.nanmean(np.where(ok.any(axis=0), y, 0.0), axis=0) if y.size else np.zeros(y.shape[1])
+    yc = np.where(ok, y - mu, 0.0)
+    i = np.arange(len(y), dtype=float)[:, None]
+    z = np.zeros((1, y.shape[1]))
+    cs = lambda a: np.vstack([z, np.cumsum(a, axis=0)])
+    return cs(ok.astype(float)), cs(yc), cs(i * yc), cs(yc * yc), mu
 
-def _channel_slope_quality(highs, lows):
-    """Compute simple upper/lower regression channels and return slope + fit quality."""
-    idx = np.arange(len(highs))
-    m_hi, b_hi = _linreg(idx, highs)
-    m_lo, b_lo = _linreg(idx, lows)
-    # quality = negative mean absolute error to favor tighter channels
-    fit_hi = -np.mean(np.abs((m_hi*idx + b_hi) - highs))
-    fit_lo = -np.mean(np.abs((m_lo*idx + b_lo) - lows))
-    fit = (fit_hi + fit_lo) / 2.0
-    return (m_hi, b_hi, m_lo, b_lo, fit)
+def _window_fits(P, L: int, ends: np.ndarray):
+    """Slope, intercept (at the window's first bar), RMSE and validity of the L-bar OLS
+    fits ending at rows `ends`. P comes from _prefix."""
+    n, sy, siy, syy, mu = P
+    lo, hi = ends - L + 1, ends + 1
+    d = lambda a: a[hi] - a[lo]
+    cnt, Sy, Siy, Syy = d(n), d(sy), d(siy), d(syy)
+    xbar = ((lo + ends) / 2.0)[:, None]
+    sxx = L * (L * L - 1) / 12.0                   # Σ(i - x̄)² over L consecutive bars
+    with np.errstate(invalid="ignore", divide="ignore"):
+        m = (Siy - xbar * Sy) / sxx
+        ybar = Sy / L
+        sse = np.maximum((Syy - Sy * ybar) - m * m * sxx, 0.0)
+        rmse = np.sqrt(sse / L)
+    b = ybar + mu - m * (L - 1) / 2.0
+    return m, b, rmse, cnt == L
 
-def _is_rising_wedge(df: pd.DataFrame) -> (bool, float):
-    highs = df["High"].values
-    lows  = df["Low"].values
-    m_hi, b_hi, m_lo, b_lo, fit = _channel_slope_quality(highs, lows)
-    # Rising wedge: both slopes positive but upper slope (m_hi) < lower slope (m_lo)
-    cond = (m_hi > 0) and (m_lo > 0) and (m_hi < m_lo)
-    # score favors tight channels and bigger slope difference
-    score = float(fit + (m_lo - m_hi))
-    return cond, score
+WEDGE_COLS = ["pattern", "window", "end", "m_hi", "m_lo", "rmse_hi", "rmse_lo", "fit", "score"]
 
-def _is_falling_wedge(df: pd.DataFrame) -> (bool, float):
-    highs = df["High"].values
-    lows  = df["Low"].values
-    m_hi, b_hi, m_lo, b_lo, fit = _channel_slope_quality(highs, lows)
-    # Falling wedge: both slopes negative but lower slope (m_lo) > upper slope (m_hi) (closer to zero)
-    cond = (m_hi < 0) and (m_lo < 0) and (m_lo > m_hi)
-    score = float(fit + (m_lo - m_hi))
-    return cond, score
+def detect_wedges(high: pd.DataFrame, low: pd.DataFrame, pattern: str = "Both", windows=WEDGE_WINDOWS,
+                  max_age: int | None = 1, min_t: float = 2.0, chunk: int = 256) -> pd.DataFrame:
+    """Best wedge per symbol over every window length in `windows` and every end date.
+
+    high / low: wide panels (dates x symbols) on a shared index; windows containing a
+    missing bar are skipped. max_age: only windows ending in the last `max_age` rows
+    (1 = wedges that are live today); None scans all end dates.
+    `score` — the one wedge score every caller ranks by — is the convergence of the two
+    channel slopes in units of its standard error (a t-statistic:
+    |m_lo - m_hi|·√Σ(i-x̄)² / √(rmse_hi² + rmse_lo²)), so a long, tight, clearly narrowing
+    channel beats a short noisy one; below `min_t` is noise. `fit` is the mean channel
+    RMSE relative to price. Symbols without a wedge are omitted.
+    """
+    want = {"Rising Wedge": ("rising",), "Falling Wedge": ("falling",)}.get(pattern, ("rising", "falling"))
+    H = high.to_numpy(dtype=float); Lw = low.reindex(index=high.index, columns=high.columns).to_numpy(dtype=float)
+    T = len(H); rows = []
+    for c0 in range(0, H.shape[1], max(int(chunk), 1)):
+        sl = slice(c0, c0 + chunk)
+        Ph, Pl = _prefix(H[:, sl]), _prefix(Lw[:, sl])
+        ncol = Ph[0].shape[1]
+        best = np.full(ncol, -np.inf); rec = [None] * ncol
+        for L in windows:
+            L = int(L)
+            if L < 3 or L > T:
+                continue
+            first = L - 1 if max_age is None else max(L - 1, T - int(max_age))
+            ends = np.arange(first, T)
+            if not len(ends):
+                continue
+            mh, bh, eh, okh = _window_fits(Ph, L, ends)
+            ml, bl, el, okl = _window_fits(Pl, L, ends)
+            sxx = L * (L * L - 1) / 12.0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                level = (bh + bl) / 2.0 + (mh + ml) * (L - 1) / 4.0          # mean of both channel lines
+                rel = -(eh + el) / 2.0 / np.abs(level)
+                gap_t = np.abs(ml - mh) * np.sqrt(sxx) / np.sqrt(eh * eh + el * el)
+            valid = okh & okl & np.isfinite(gap_t) & (gap_t >= min_t)
+            for kind in want:
+                cond = (mh > 0) & (ml > 0) & (mh < ml) if kind == "rising" else (mh < 0) & (ml < 0) & (ml > mh)
+                cand = np.where(valid & cond, gap_t, -np.inf)
+                k = np.argmax(cand, axis=0); v = cand[k, np.arange(ncol)]
+                for j in np.flatnonzero(v > best):
+                    best[j] = v[j]; r = k[j]
+                    rec[j] = (kind, L, ends[r], mh[r, j], ml[r, j], eh[r, j], el[r, j], rel[r, j], v[j])
+        for j, r in enumerate(rec):
+            if r is not None:
+                rows.append((high.columns[c0 + j],) + r)
+    out = pd.DataFrame(rows, columns=["symbol"] + WEDGE_COLS)
+    if not out.empty:
+        out["end"] = high.index[out["end"].to_numpy()]
+        out["pattern"] = out["pattern"].map({"rising": "Rising Wedge", "falling": "Falling Wedge"})
+    return out.set_index("symbol")
+
+def best_wedge(df: pd.DataFrame, pattern: str = "Both", windows=WEDGE_WINDOWS, max_age: int | None = 1, min_t: float = 2.0):
+    """detect_wedges for a single OHLC frame -> dict (pattern, window, end, ..., score) or None."""
+    if df is None or df.empty or "High" not in df.columns or "Low" not in df.columns:
+        return None
+    res = detect_wedges(df[["High"]].rename(columns={"High": "_"}), df[["Low"]].rename(columns={"Low": "_"}),
+                        pattern=pattern, windows=windows, max_age=max_age, min_t=min_t)
+    return None if res.empty else res.iloc[0].to_dict()
 
 def find_wedges(symbol: str, pattern: str = "Both", lookback: int = 400):
     df = _load_ohlc(symbol, lookback)
     if df.empty or len(df) < 100:
         return None
-
-    res = {"symbol": symbol, "rising": 0, "falling": 0, "score": 0.0}
-    if pattern in ("Rising Wedge","Both"):
-        ok, sc = _is_rising_wedge(df)
-        if ok:
-            res["rising"] = 1
-            res["score"] = max(res["score"], sc)
-    if pattern in ("Falling Wedge","Both"):
-        ok, sc = _is_falling_wedge(df)
-        if ok:
-            res["falling"] = 1
-            res["score"] = max(res["score"], sc)
-    if (res["rising"] == 0) and (res["falling"] == 0):
+    w = best_wedge(df, pattern)
+    if w is None:
         return None
-    return res
+    return {"symbol": symbol, "rising": int(w["pattern"] == "Rising Wedge"), "falling": int(w["pattern"] == "Falling Wedge"),
+            "score": float(w["score"]), "window": int(w["window"])}
 
 def find_wedges_batch(symbols, pattern="Both", lookback=400):
-    out = []
+    frames = {}
     for sym in symbols:
         try:
-            r = find_wedges(sym, pattern=pattern, lookback=lookback)
-            if r:
-                out.append(r)
+            df = _load_ohlc(sym, lookback)
+            if not df.empty and len(df) >= 100:
+                frames[sym] = df
         except Exception:
             continue
-    if not out:
-        return pd.DataFrame(columns=["symbol","rising","falling","score"])
-    df = pd.DataFrame(out).sort_values("score", ascending=False).reset_index(drop=True)
-    return df
+    if not frames:
+        return pd.DataFrame(columns=["symbol","rising","falling","score","window"])
+    # one panel, one pass: every symbol and window length at once
+    high = pd.concat({s: d["High"] for s, d in frames.items()}, axis=1).sort_index()
+    low = pd.concat({s: d["Low"] for s, d in frames.items()}, axis=1).sort_index()
+    res = detect_wedges(high, low, pattern=pattern)
+    if res.empty:
+        return pd.DataFrame(columns=["symbol","rising","falling","score","window"])
+    df = pd.DataFrame({"symbol": res.index, "rising": (res["pattern"] == "Rising Wedge").astype(int).to_numpy(),
+                       "falling": (res["pattern"] == "Falling Wedge").astype(int).to_numpy(),
+                       "score": res["score"].to_numpy(), "window": res["window"].to_numpy()})
+    return df.sort_values("score", ascending=False).reset_index(drop=True)
@@ -1,9 +1,9 @@
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import pandas as pd
-from src.engine import risk_scoring as rs
+from src.engine import risk_scoring as rs, risk_stream
 
 app = FastAPI(title="Vega Risk Scoring API")
 
@@ -30,6 +30,9 @@ class BatchRequest(BaseModel):
     freq: str = "D"
     price_col: str = "close"
     weights: Optional[Dict[str, float]] = None
+    workers: int = 0              # >1 shards symbols across a process pool
+    chunk_size: int = 500         # symbols per pool task
+    max_chunk_mb: float = 256.0   # shared-memory budget per task
 
 def _list_to_df(points: List[PricePoint]) -> pd.DataFrame:
     df = pd.DataFrame([{"date": p.date, "close": p.close} for p in points])
@@ -47,8 +50,26 @@ def score(req: ScoreRequest):
 def batch(req: BatchRequest):
     assets = {item.symbol: _list_to_df(item.prices) for item in req.items}
     bench = _list_to_df(req.benchmark) if req.benchmark else None
-    df = rs.batch_score(assets, benchmark=bench, price_col=req.price_col, rf=req.rf, freq=req.freq, weights=req.weights)
+    try:
+        df = rs.batch_score(assets, benchmark=bench, price_col=req.price_col, rf=req.rf, freq=req.freq, weights=req.weights,
+                            workers=req.workers, chunk_size=req.chunk_size, max_chunk_mb=req.max_chunk_mb)
+    except ValueError as e:
+        # a single symbol larger than the per-chunk memory budget
+        raise HTTPException(status_code=413, detail=str(e))
     return {"results": df.to_dict(orient="records")}
 
+@app.get("/risk_scoring/states")
+def states(region: str = "us", symbols: Optional[str] = None):
+    """Scores from the persisted streaming state (tools/update_risk_state.py) — no history
+    is re-read. `symbols`: optional comma-separated filter."""
+    st = risk_stream.load_states(risk_stream.state_path(region))
+    if not st:
+        raise HTTPException(status_code=404, detail=f"no risk state for region '{region}'")
+    if symbols:
+        want = {s.strip().upper() for s in symbols.split(",") if s.strip()}
+        st = {k: v for k, v in st.items() if k.upper() in want}
+    df = risk_stream.score_states(st)
+    return {"region": region, "results": df.astype(object).where(df.notna(), None).to_dict(orient="records")}
+
 # To run standalone:
 # uvicorn src.services.http_gateway.risk_scoring_endpoint:app --host 0.0.0.0 --port 8080
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Backtest the A/B scanner rules (gate, "Buy Today", "Buy in 2–3 days") over the local
+price store and print hit rate, expectancy and R-multiples per rule variant.
+See src/engine/backtest.py for the entry / stop / target model.
+
+Usage:
+  python tools/backtest_rules.py --region us --years 10
+  python tools/backtest_rules.py --region us --hold 10 --target-r 2 --entry next_open --out data/vega/backtest_us.csv
+"""
+
+import os, argparse, sys, time
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("VEGA_EOD_ROOT", os.path.join(ROOT, "data", "eod"))
+from src.engine import backtest
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--region", type=str, default="us", help="Price-store region (us, ca, mx, latam)")
+    ap.add_argument("--years", type=float, default=10, help="History used (the first 200 bars are warm-up)")
+    ap.add_argument("--hold", type=int, default=20, help="Max bars in a trade")
+    ap.add_argument("--target-r", type=float, default=3.0, help="Target in multiples of the initial risk")
+    ap.add_argument("--entry", choices=["close", "next_open"], default="close")
+    ap.add_argument("--all-days", action="store_true", help="Trade every signal day, not only the first of a run")
+    ap.add_argument("--chunk", type=int, default=500, help="Symbols per vectorized chunk")
+    ap.add_argument("--out", type=str, default="", help="Optional CSV path for the report")
+    args = ap.parse_args()
+
+    t0 = time.time()
+    start = pd.Timestamp.today().normalize() - pd.DateOffset(days=int(args.years * 365.25))
+    panels = backtest.load_panels(args.region, start=start)
+    print(f"Loaded {panels['Close'].shape[1]} symbols x {panels['Close'].shape[0]} days ({time.time() - t0:.1f}s)")
+    report = backtest.run(panels, hold=args.hold, target_r=args.target_r, entry=args.entry,
+                          fresh_only=not args.all_days, chunk=args.chunk)
+    with pd.option_context("display.width", 200, "display.max_columns", 20, "display.float_format", "{:.3f}".format):
+        print(report)
+    if args.out:
+        report.to_csv(args.out)
+        print(f"→ {args.out}")
+    print(f"Done in {time.time() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
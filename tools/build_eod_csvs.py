@@ -4,6 +4,7 @@ Build (or refresh) EOD CSVs used by compute_from_df() for VectorVest metrics.
 
 Writes one file per symbol to data/eod/us/<SYMBOL>.csv with columns:
 Date, Open, High, Low, Close, Volume
+and refreshes the weekly/monthly bars in data/eod/us/W and data/eod/us/M.
 """
 
 import os, argparse, sys
@@ -16,6 +17,9 @@ except Exception:
     yf = None
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("VEGA_EOD_ROOT", os.path.join(ROOT, "data", "eod"))
+from src.engine import price_store
 OUT_DIR = os.path.join(ROOT, "data", "eod", "us")
 os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -47,6 +51,8 @@ def fetch(symbol: str, years: int = 5) -> pd.DataFrame:
 def save_csv(symbol: str, df: pd.DataFrame):
     out = os.path.join(OUT_DIR, f"{symbol}.csv")
     df.to_csv(out, index=False)
+    # the daily history was rewritten (re-adjusted for splits / dividends) -> rebuild W/M from scratch
+    price_store.update_higher(symbol, "us", full=True)
     return out
 
 def main():
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rebuild the latest-bar feature table after EOD.
+
+Reads daily bars from the local price store (data/eod/<region>/) and writes one row per
+symbol to data/vega/features/<region>.parquet (see src/engine/feature_table.py).
+
+Usage:
+  python tools/build_feature_table.py --region us
+  python tools/build_feature_table.py --region us,ca,mx
+"""
+
+import os, argparse, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("VEGA_EOD_ROOT", os.path.join(ROOT, "data", "eod"))
+os.environ.setdefault("VEGA_FEATURE_ROOT", os.path.join(ROOT, "data", "vega", "features"))
+from src.engine import feature_table
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--region", type=str, default="us", help="Comma-separated price-store regions (us, ca, mx, latam)")
+    args = ap.parse_args()
+    for region in [r.strip().lower() for r in args.region.split(",") if r.strip()]:
+        t0 = time.time()
+        df = feature_table.refresh(region)
+        print(f"✓ {region}: {len(df)} symbols -> {feature_table.table_path(region)} ({time.time() - t0:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Refresh the local price store of each region from EODHD before the EOD jobs run.
+
+Appends the latest bar to every stored symbol (one bulk call per exchange) and backfills
+history for liquid symbol-master names the store doesn't have yet (a capped number per
+run). See regions.refresh_bars. Needs EODHD_API_TOKEN (or --token).
+
+Usage:
+  python tools/refresh_region_bars.py --region us,ca,mx,latam
+  python tools/refresh_region_bars.py --region ca --backfill 500 --years 3
+"""
+
+import os, argparse, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("VEGA_EOD_ROOT", os.path.join(ROOT, "data", "eod"))
+from src.engine import regions
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--region", type=str, default="us", help="Comma-separated regions (us, ca, mx, latam) or 'all'")
+    ap.add_argument("--backfill", type=int, default=200, help="Max new symbols given full history per region and run")
+    ap.add_argument("--years", type=float, default=2.0, help="History fetched for a backfilled symbol")
+    ap.add_argument("--token", type=str, default=os.getenv("EODHD_API_TOKEN", ""), help="EODHD API token")
+    args = ap.parse_args()
+    if not args.token:
+        sys.exit("EODHD token missing — set EODHD_API_TOKEN or pass --token.")
+    keys = list(regions.REGIONS) if args.region.strip().lower() == "all" else \
+        [r.strip().lower() for r in args.region.split(",") if r.strip()]
+    for region in keys:
+        t0 = time.time()
+        out = regions.refresh_bars(region, args.token, backfill=args.backfill, years=args.years)
+        print(f"✓ {region}: {out['appended']} appended, {out['backfilled']} backfilled, "
+              f"benchmark {out['benchmark']} bars ({time.time() - t0:.1f}s)")
+
+if __name__ == "__main__":
+    main()
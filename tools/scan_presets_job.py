@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Precompute the scan presets after EOD and store versioned snapshots.
+
+The universe of each region is its EODHD symbol master when EODHD_API_TOKEN (or --token)
+is set, otherwise only what the local price store holds; either way bars come from the
+store, which tools/refresh_region_bars.py keeps current (master symbols it has no bars
+for yet are reported as stage-1 "no_local_bars").
+
+Reads daily bars from the local price store (data/eod/<region>/), evaluates every
+preset in src/engine/scan_presets.py in one pass per symbol (one worker process per
+region, see src/engine/multi_region.py) and writes
+data/vega/scans/<preset>/<YYYYmmdd_HHMMSS>.csv (+ .json meta), plus the delta against
+the previous snapshot to data/alerts/scan_delta_<preset>_<version>.csv. The scanner
+pages open on the latest snapshot and only re-run live when asked.
+
+Usage:
+  python tools/scan_presets_job.py --region us
+  python tools/scan_presets_job.py --region us --presets long_a,short_b --keep 10
+  python tools/scan_presets_job.py --region all      # + combined all_<preset> snapshots
+"""
+
+import os, argparse, sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("VEGA_EOD_ROOT", os.path.join(ROOT, "data", "eod"))
+os.environ.setdefault("VEGA_SCAN_ROOT", os.path.join(ROOT, "data", "vega", "scans"))
+os.environ.setdefault("VEGA_ALERTS_DIR", os.path.join(ROOT, "data", "alerts"))
+from src.engine import price_store, scan_snapshots, scan_diff, multi_region
+from src.engine.scan_presets import PRESETS
+
+def save(key, results, reasons, processed, params, keep):
+    v = scan_snapshots.save_snapshot(key, results, reasons, processed, params, keep_last=keep)
+    delta, _, _ = scan_diff.diff_latest(key, v)
+    path = scan_diff.export_delta(delta, key, v)
+    moves = ", ".join(f"{n} {c}" for c, n in scan_diff.summarize(delta).items()) or "no changes"
+    print(f"✓ {key}: {len(results)} matches / {processed} symbols -> {v} ({moves}){' -> ' + path if path else ''}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--region", type=str, default="us", help="Price-store region(s): us, ca, mx, latam, comma-separated or 'all'")
+    ap.add_argument("--presets", type=str, default=",".join(PRESETS), help="Comma-separated preset keys")
+    ap.add_argument("--lookback", type=int, default=420, help="Bars evaluated per symbol")
+    ap.add_argument("--keep", type=int, default=scan_snapshots.KEEP_LAST, help="Snapshots kept per preset")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per region)")
+    ap.add_argument("--no-smart-money", action="store_true", help="Skip the Smart Money gate on A/B presets")
+    ap.add_argument("--token", type=str, default=os.getenv("EODHD_API_TOKEN", ""),
+                    help="EODHD token for the symbol masters (empty = local price store only)")
+    args = ap.parse_args()
+
+    keys = [k.strip() for k in args.presets.split(",") if k.strip() in PRESETS]
+    region_keys = list(multi_region.ALL_REGIONS) if args.region.strip().lower() == "all" else \
+        [r.strip().lower() for r in args.region.split(",") if r.strip()]
+    for region in region_keys:
+        print(f"Scanning {'the symbol master' if args.token else 'the local store'} of {region} "
+              f"({len(price_store.list_symbols(region))} symbols with bars in {price_store.region_dir(region)}) for: {', '.join(keys)}")
+    run = multi_region.scan_all(region_keys, keys, lookback=args.lookback, smart_money=not args.no_smart_money,
+                                workers=args.workers, token=args.token)
+    for region, res in run["regions"].items():
+        if "error" in res:
+            print(f"✗ {region}: {res['error']}")
+            continue
+        params = {"region": region, "lookback": args.lookback, "smart_money": not args.no_smart_money}
+        for k in keys:
+            save(k if region == "us" else f"{region}_{k}", res["results"][k], res["reasons"][k], res["processed"], params, args.keep)
+    if len(region_keys) > 1:
+        # one combined, region-tagged snapshot per preset
+        processed = sum(r.get("processed", 0) for r in run["regions"].values())
+        params = {"region": ",".join(region_keys), "lookback": args.lookback, "smart_money": not args.no_smart_money}
+        for k in keys:
+            save(f"all_{k}", run["combined"][k], multi_region.reasons_total(run["regions"], k), processed, params, args.keep)
+    print(f"Done in {run['seconds']}s (" + ", ".join(f"{r}: {x.get('seconds', '—')}s" for r, x in run["regions"].items()) + ")")
+
+if __name__ == "__main__":
+    main()
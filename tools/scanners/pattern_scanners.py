@@ -1,11 +1,64 @@
-import os,glob,pandas as pd
+import os, glob
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
 from src.engine.vector_metrics import compute_from_df
+from src.engine.price_store import _normalize
+from src.engine.scan_rules import to_title, compute_indicators
+from src.engine.scan_presets import evaluate
+from src.scanner.patterns import best_wedge
 
-def run_scan(data_dir, kind="rising_wedge", limit=50):
-    rec=[]
-    for p in sorted(glob.glob(os.path.join(data_dir,"*.csv"))):
-        sym=os.path.splitext(os.path.basename(p))[0]
-        df=pd.read_csv(p)
-        m=compute_from_df(df)
-        rec.append({"symbol":sym,"close":float(df.iloc[-1]['close']),"score":1.0,**m})
-    return pd.DataFrame(rec).head(limit)
+KINDS = ("rising_wedge", "falling_wedge", "vega_smart_today")
+COLS = ["symbol", "close", "score", "signal", "RT", "RV", "RS", "CI", "VST"]
+
+# (path, kind) -> (mtime, size, row or None). Lives as long as the process (i.e. across
+# Streamlit reruns), so a rescan only re-reads files whose mtime or size changed.
+_CACHE = {}
+
+def _scan_file(path, kind):
+    sym = os.path.splitext(os.path.basename(path))[0]
+    df = to_title(_normalize(pd.read_csv(path)))
+    if df.empty or "Close" not in df.columns:
+        return None
+    if kind in ("rising_wedge", "falling_wedge"):
+        w = best_wedge(df, "Rising Wedge" if kind == "rising_wedge" else "Falling Wedge")
+        if w is None:
+            return None
+        score, signal = float(w["score"]), f"{w['window']}-bar wedge"
+    else:
+        row, _ = evaluate("long_a", sym, compute_indicators(df).tail(420))
+        if row is None:
+            return None
+        score, signal = float(row["VST"]), row["Buy Today"]
+    m = compute_from_df(df)
+    return {"symbol": sym, "close": float(df["Close"].iloc[-1]), "score": round(score, 4), "signal": signal, **m}
+
+def _cached(path, kind):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), kind)
+    hit = _CACHE.get(key)
+    if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+        return hit[2]
+    try:
+        row = _scan_file(path, kind)
+    except Exception:
+        row = None
+    _CACHE[key] = (st.st_mtime_ns, st.st_size, row)
+    return row
+
+def run_scan(data_dir, kind="rising_wedge", limit=50, workers=None):
+    """Scan every <SYMBOL>.csv in data_dir for `kind` (rising_wedge, falling_wedge,
+    vega_smart_today) in parallel; unchanged files are served from the per-file cache."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown scan kind: {kind}")
+    paths = sorted(glob.glob(os.path.join(data_dir, "*.csv")))
+    if not paths:
+        return pd.DataFrame(columns=COLS)
+    workers = workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        rec = [r for r in ex.map(lambda p: _cached(p, kind), paths) if r is not None]
+    if not rec:
+        return pd.DataFrame(columns=COLS)
+    return pd.DataFrame(rec)[COLS].sort_values("score", ascending=False).reset_index(drop=True).head(limit)
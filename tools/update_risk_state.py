@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Advance the streaming risk state after EOD.
+
+Feeds each symbol's daily bars from the local price store (data/eod/<region>/) into its
+persisted accumulators (src/engine/risk_stream.py) — only bars newer than the last one
+consumed — and writes data/vega/risk_state_<region>.json. The risk endpoint serves
+scores straight from these files (GET /risk_scoring/states). A symbol whose bars fail
+keeps its previous state and is listed; the other symbols are still saved. Exits
+non-zero when a region could not be updated at all.
+
+Usage:
+  python tools/update_risk_state.py --region us
+  python tools/update_risk_state.py --region us,ca,mx,latam --rf 0.04
+"""
+
+import os, argparse, sys, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("VEGA_EOD_ROOT", os.path.join(ROOT, "data", "eod"))
+from src.engine import price_store, regions, risk_stream
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--region", type=str, default="us", help="Comma-separated price-store regions (us, ca, mx, latam)")
+    ap.add_argument("--rf", type=float, default=0.0, help="Annual risk-free rate (a change rebuilds every state)")
+    args = ap.parse_args()
+    failed_regions = []
+    for region in [r.strip().lower() for r in args.region.split(",") if r.strip()]:
+        t0 = time.time()
+        path = risk_stream.state_path(region)
+        states = risk_stream.load_states(path)
+        before = {s: st.ret.n for s, st in states.items()}
+        bench = regions.benchmark_bars(region)
+        frames = price_store.load_many(price_store.list_symbols(region), region)
+        errors = {}
+        try:
+            risk_stream.update_states(states, frames, benchmark=bench if not bench.empty else None, rf=args.rf, errors=errors)
+        except ValueError as e:
+            print(f"✗ {region}: {e}")
+            failed_regions.append(region)
+            continue
+        risk_stream.save_states(states, path)
+        fed = sum(max(st.ret.n - before.get(s, 0), 0) for s, st in states.items())
+        print(f"✓ {region}: {len(states)} symbols, {fed} new returns -> {path} ({time.time() - t0:.1f}s)")
+        if errors:
+            print(f"  ✗ {len(errors)} symbols failed: " + "; ".join(f"{s} ({m})" for s, m in list(errors.items())[:10])
+                  + (" …" if len(errors) > 10 else ""))
+    if failed_regions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()